@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AutologConfig(AppConfig):
     name = 'autolog'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,525 @@
+import hashlib
+import json
+import posixpath
+import tempfile
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timezone
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max
+
+from .models import DeletedRecord, FuelEntry, MaintenanceEntry, OtherExpense, Vehicle, VehicleImage
+
+INDENT = '  '
+
+
+def serialize_date(d):
+    """Convert date to string format"""
+    return d.strftime('%Y-%m-%d') if d else None
+
+
+def serialize_decimal(d):
+    """Convert Decimal to string"""
+    return str(d) if d else None
+
+
+def serialize_vehicle(vehicle):
+    """Vehicle fields in export order, without entries or financing info"""
+    return {
+        'year': vehicle.year,
+        'make': vehicle.make,
+        'model': vehicle.model,
+        'color': vehicle.color or None,
+        'vinNumber': vehicle.vin_number or None,
+        'licensePlateNumber': vehicle.license_plate_number or None,
+        'registrationNumber': vehicle.registration_number or None,
+        'state': vehicle.state or None,
+        'purchasedDate': serialize_date(vehicle.purchased_date),
+        'purchasedPrice': serialize_decimal(vehicle.purchased_price),
+        'purchasedOdometer': vehicle.purchased_odometer,
+        'dealerName': vehicle.dealer_name or None,
+        'soldDate': serialize_date(vehicle.sold_date),
+        'soldPrice': serialize_decimal(vehicle.sold_price),
+        'soldOdometer': vehicle.sold_odometer,
+        'currentValue': serialize_decimal(vehicle.current_value),
+        'currentValueDate': serialize_date(vehicle.current_value_date),
+        'fuelType': vehicle.fuel_type,
+        'financingType': vehicle.financing_type,
+        'downPayment': serialize_decimal(vehicle.down_payment),
+    }
+
+
+def serialize_financing(vehicle):
+    """Return the (key, data) financing blocks that apply to this vehicle"""
+    blocks = []
+
+    if vehicle.financing_type == 'loan' and vehicle.loan_start_date:
+        blocks.append(('loanInfo', {
+            'loanStartDate': serialize_date(vehicle.loan_start_date),
+            'loanAmount': serialize_decimal(vehicle.loan_amount),
+            'loanInterestRate': serialize_decimal(vehicle.loan_interest_rate),
+            'loanTermMonths': vehicle.loan_term_months,
+            'loanPaymentDay': vehicle.loan_payment_day,
+            'loanAutoPayment': vehicle.loan_auto_payment
+        }))
+
+    if vehicle.financing_type == 'lease' and vehicle.lease_start_date:
+        blocks.append(('leaseInfo', {
+            'leaseStartDate': serialize_date(vehicle.lease_start_date),
+            'leasePaymentAmount': serialize_decimal(vehicle.lease_payment_amount),
+            'leaseTermMonths': vehicle.lease_term_months,
+            'leasePaymentDay': vehicle.lease_payment_day,
+            'leaseAutoPayment': vehicle.lease_auto_payment
+        }))
+
+    return blocks
+
+
+def serialize_fuel_entry(fuel_entry, is_electric):
+    if is_electric:
+        return {
+            'date': serialize_date(fuel_entry.date),
+            'odometer': fuel_entry.odometer,
+            'kwhPerMile': serialize_decimal(fuel_entry.kwh_per_mile),
+            'costPerKwh': serialize_decimal(fuel_entry.cost_per_kwh),
+            'costPerGallonReference': serialize_decimal(fuel_entry.cost_per_gallon_reference)
+        }
+    return {
+        'date': serialize_date(fuel_entry.date),
+        'odometer': fuel_entry.odometer,
+        'gallons': serialize_decimal(fuel_entry.gallons),
+        'cost': serialize_decimal(fuel_entry.cost)
+    }
+
+
+def serialize_maintenance_entry(maint_entry):
+    return {
+        'date': serialize_date(maint_entry.date),
+        'odometer': maint_entry.odometer,
+        'category': maint_entry.category,
+        'cost': serialize_decimal(maint_entry.cost),
+        'notes': maint_entry.notes or None
+    }
+
+
+def serialize_other_expense(expense):
+    return {
+        'date': serialize_date(expense.date),
+        'expenseType': expense.expense_type,
+        'cost': serialize_decimal(expense.cost),
+        'notes': expense.notes or None
+    }
+
+
+def vehicle_entry_lists(vehicle, chunk_size, since=None):
+    """
+    The (key, serialized entries) lists of one vehicle, in export order. Entries are
+    read with .iterator() so a vehicle's history is never loaded whole. With `since`,
+    only entries created or changed after it are included.
+    """
+    is_electric = vehicle.fuel_type == 'electric'
+
+    def entries(model):
+        queryset = model.objects.filter(vehicle=vehicle)
+        if since is not None:
+            queryset = queryset.filter(updated_at__gt=since)
+        return queryset.iterator(chunk_size=chunk_size)
+
+    return [
+        ('fuelEntries', (serialize_fuel_entry(entry, is_electric) for entry in entries(FuelEntry))),
+        ('maintenanceEntries', (serialize_maintenance_entry(entry) for entry in entries(MaintenanceEntry))),
+        ('otherExpenses', (serialize_other_expense(expense) for expense in entries(OtherExpense))),
+    ]
+
+
+def changed_vehicle_ids(user, since):
+    """Ids of the user's vehicles that changed, or have entries that changed, after `since`"""
+    ids = set(Vehicle.objects.filter(user=user, updated_at__gt=since).values_list('id', flat=True))
+    for model in (FuelEntry, MaintenanceEntry, OtherExpense):
+        ids.update(
+            model.objects.filter(vehicle__user=user, updated_at__gt=since)
+            .values_list('vehicle_id', flat=True).distinct()
+        )
+    return ids
+
+
+# Bump when the export layout changes so archives cached by older code are not reused
+EXPORT_CACHE_VERSION = 2
+EXPORT_CACHE_DIR = 'exports'
+
+
+def export_fingerprint(user, kind):
+    """
+    Cheap version stamp for one kind of export ('json', 'ndjson' or 'images'): the row
+    count and latest updated_at of every table the export reads. Any insert, edit or
+    delete changes at least one of them.
+    """
+    querysets = [Vehicle.objects.filter(user=user)]
+    if kind == 'images':
+        querysets.append(VehicleImage.objects.filter(vehicle__user=user))
+    else:
+        querysets.extend(model.objects.filter(vehicle__user=user) for model in (FuelEntry, MaintenanceEntry, OtherExpense))
+
+    parts = [kind, str(EXPORT_CACHE_VERSION)]
+    for queryset in querysets:
+        stamp = queryset.aggregate(count=Count('id'), latest=Max('updated_at'))
+        parts.append(f"{stamp['count']}:{stamp['latest'].isoformat() if stamp['latest'] else ''}")
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+
+def cached_export_path(user, kind, fingerprint, extension):
+    """Storage path of the archive generated for a fingerprint"""
+    return f'{EXPORT_CACHE_DIR}/user_{user.id}/{kind}_{fingerprint}.{extension}'
+
+
+def open_cached_export(path):
+    """Open a previously generated archive, or return None if there is none"""
+    try:
+        return default_storage.open(path, 'rb')
+    except (FileNotFoundError, OSError):
+        return None
+
+
+def iter_file(file):
+    """Stream an open storage file in chunks, closing it at the end"""
+    with file:
+        yield from file.chunks()
+
+
+def iter_cached_export(chunks, path, keep=None):
+    """
+    Pass an export stream through unchanged while spooling it to a temporary file.
+    Once the stream completes, the file is saved to storage at `path` and the user's
+    older archives of the same kind are removed. Nothing is saved if the client
+    disconnects part way or `keep()` returns False (e.g. some images failed to read).
+    """
+    with tempfile.TemporaryFile() as spool:
+        for chunk in chunks:
+            spool.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            yield chunk
+
+        if keep is not None and not keep():
+            return
+        if not default_storage.exists(path):
+            spool.seek(0)
+            default_storage.save(path, File(spool))
+
+    directory, name = posixpath.split(path)
+    kind = name.split('_', 1)[0]
+    for stale in default_storage.listdir(directory)[1]:
+        if stale != name and stale.startswith(f'{kind}_'):
+            default_storage.delete(posixpath.join(directory, stale))
+
+
+def vehicle_natural_key(vehicle):
+    """Export fields that identify a vehicle on import (see conversion.importing)"""
+    return {
+        'vinNumber': vehicle.vin_number or None,
+        'year': vehicle.year,
+        'make': vehicle.make,
+        'model': vehicle.model,
+        'purchasedDate': serialize_date(vehicle.purchased_date),
+    }
+
+
+def vehicle_match_key(vehicle):
+    """
+    The key imports match a vehicle on (see conversion.importing.vehicle_natural_key):
+    the VIN when there is one, otherwise year, make, model and purchase date
+    """
+    vin = (vehicle.vin_number or '').strip().upper()
+    if vin:
+        return ('vin', vin)
+    return ('ymm', vehicle.year, vehicle.make.strip().lower(), vehicle.model.strip().lower(), vehicle.purchased_date)
+
+
+def entry_natural_key(instance):
+    """(record type, key) identifying an entry on import (see conversion.importing)"""
+    if isinstance(instance, FuelEntry):
+        return 'fuel', {'date': serialize_date(instance.date), 'odometer': instance.odometer}
+    if isinstance(instance, MaintenanceEntry):
+        return 'maintenance', {
+            'category': instance.category,
+            'date': serialize_date(instance.date),
+            'cost': serialize_decimal(instance.cost),
+        }
+    return 'expense', {
+        'expenseType': instance.expense_type,
+        'date': serialize_date(instance.date),
+        'cost': serialize_decimal(instance.cost),
+    }
+
+
+def record_deletion(instance):
+    """Write a tombstone for a vehicle or entry that is about to be deleted"""
+    if isinstance(instance, Vehicle):
+        vehicle = instance
+        record_type, key = 'vehicle', {}
+    else:
+        vehicle = instance.vehicle
+        record_type, key = entry_natural_key(instance)
+
+    return DeletedRecord.objects.create(
+        user_id=vehicle.user_id,
+        record_type=record_type,
+        object_id=instance.pk,
+        vehicle_key=vehicle_natural_key(vehicle),
+        key=key,
+    )
+
+
+def serialize_deleted_record(record):
+    return {
+        'type': record.record_type,
+        'vehicle': record.vehicle_key,
+        'key': record.key,
+        'deletedAt': serialize_cursor(record.deleted_at),
+    }
+
+
+def serialize_cursor(moment):
+    """Render a timezone-aware datetime as a URL-safe UTC cursor"""
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _dumps_at(obj, level):
+    """json.dumps(obj, indent=2) as it appears nested `level` levels deep"""
+    # JSON strings never contain a raw newline, so this only touches structural line breaks
+    return json.dumps(obj, indent=2).replace('\n', '\n' + INDENT * level)
+
+
+def _iter_json_list(items, level, chunk_size):
+    """Stream a list at nesting `level`, yielding one string per `chunk_size` items"""
+    prefix = '[\n' + INDENT * (level + 1)
+    separator = ',\n' + INDENT * (level + 1)
+    parts = []
+    count = 0
+
+    for item in items:
+        parts.append(prefix if count == 0 else separator)
+        parts.append(_dumps_at(item, level + 1))
+        count += 1
+        if count % chunk_size == 0:
+            yield ''.join(parts)
+            parts = []
+
+    if count == 0:
+        yield '[]'
+    else:
+        parts.append('\n' + INDENT * level + ']')
+        yield ''.join(parts)
+
+
+def iter_vehicle_json(vehicle, chunk_size, level=2, since=None):
+    """Stream one vehicle object exactly as json.dumps(indent=2) would render it at `level`"""
+    head = _dumps_at(serialize_vehicle(vehicle), level)
+    # Drop the closing brace; entry lists and financing blocks follow
+    yield head[:-len('\n' + INDENT * level + '}')]
+
+    key_prefix = ',\n' + INDENT * (level + 1)
+    for key, entries in vehicle_entry_lists(vehicle, chunk_size, since):
+        yield f'{key_prefix}"{key}": '
+        yield from _iter_json_list(entries, level + 1, chunk_size)
+
+    for key, data in serialize_financing(vehicle):
+        yield f'{key_prefix}"{key}": {_dumps_at(data, level + 1)}'
+
+    yield '\n' + INDENT * level + '}'
+
+
+def export_header(export_format, meta=None):
+    """
+    The start of an export up to exportDate and any `meta` keys. Cached archives are
+    stored without it, so a cached export is still served with today's exportDate.
+    """
+    if export_format == 'ndjson':
+        return _ndjson_line('export', {'exportDate': serialize_date(date.today()), **(meta or {})})
+    return '{\n' + INDENT + '"exportDate": ' + json.dumps(serialize_date(date.today())) + ''.join(
+        f',\n{INDENT}"{key}": {json.dumps(value)}' for key, value in (meta or {}).items()
+    )
+
+
+def iter_export_json(vehicles, chunk_size, since=None, meta=None, deleted=None, header=True):
+    """
+    Stream the export document one vehicle and one entry chunk at a time.
+    The full export is byte-for-byte what json.dumps(export_data, indent=2) produced.
+
+    For an incremental export, `since` limits entries to those changed after it,
+    `meta` adds top-level keys after exportDate and `deleted` streams tombstones.
+    With header=False the export_header() part is left out.
+    """
+    if header:
+        yield export_header('json', meta)
+    yield ',\n' + INDENT + '"vehicles": '
+
+    count = 0
+    for vehicle in vehicles:
+        yield ('[\n' if count == 0 else ',\n') + INDENT * 2
+        yield from iter_vehicle_json(vehicle, chunk_size, since=since)
+        count += 1
+
+    yield '\n' + INDENT + ']' if count else '[]'
+
+    if deleted is not None:
+        yield ',\n' + INDENT + '"deleted": '
+        yield from _iter_json_list(deleted, 1, chunk_size)
+
+    yield '\n}'
+
+
+# NDJSON record type for each entry list of a vehicle
+NDJSON_ENTRY_TYPES = {
+    'fuelEntries': 'fuelEntry',
+    'maintenanceEntries': 'maintenanceEntry',
+    'otherExpenses': 'otherExpense',
+}
+
+
+def _ndjson_line(record_type, data):
+    return json.dumps({'type': record_type, **data}, separators=(',', ':')) + '\n'
+
+
+def iter_export_ndjson(vehicles, chunk_size, since=None, meta=None, deleted=None, header=True):
+    """
+    Stream the export as NDJSON: an "export" header line, then per vehicle a "vehicle"
+    line followed by one line per entry, then any "deleted" tombstones, which carry
+    the deleted record's type as recordType. Arguments are the same as iter_export_json.
+    """
+    if header:
+        yield export_header('ndjson', meta)
+
+    for vehicle in vehicles:
+        vehicle_data = serialize_vehicle(vehicle)
+        vehicle_data.update(serialize_financing(vehicle))
+        parts = [_ndjson_line('vehicle', vehicle_data)]
+
+        for key, entries in vehicle_entry_lists(vehicle, chunk_size, since):
+            for entry in entries:
+                parts.append(_ndjson_line(NDJSON_ENTRY_TYPES[key], entry))
+                if len(parts) >= chunk_size:
+                    yield ''.join(parts)
+                    parts = []
+        yield ''.join(parts)
+
+    for record in deleted or ():
+        # "type" marks the line as a tombstone, so the deleted record's own type moves to recordType
+        record = dict(record)
+        yield _ndjson_line('deleted', {'recordType': record.pop('type'), **record})
+
+
+def iter_gzip(chunks):
+    """
+    Gzip a stream of text chunks on the fly. Each call writes one gzip member; members
+    can be concatenated and decompress as one file.
+    """
+    # wbits=31 selects the gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def image_export_members(vehicles):
+    """(archive name, image) pairs for the image ZIP, one folder per vehicle"""
+    members = []
+    for vehicle in vehicles:
+        # Create folder name for this vehicle
+        vehicle_folder = f"{vehicle.year}_{vehicle.make}_{vehicle.model}".replace(' ', '_')
+
+        for idx, image in enumerate(vehicle.images.all(), 1):
+            # Get file extension
+            file_ext = image.image.name.split('.')[-1] if '.' in image.image.name else 'jpg'
+
+            # Create filename with vehicle info
+            if image.caption:
+                # Sanitize caption for filename
+                safe_caption = "".join(c for c in image.caption if c.isalnum() or c in (' ', '-', '_')).strip()
+                filename = f"{vehicle_folder}/{idx:02d}_{safe_caption[:50]}.{file_ext}"
+            else:
+                filename = f"{vehicle_folder}/{idx:02d}_image.{file_ext}"
+
+            members.append((filename, image))
+    return members
+
+
+def read_vehicle_image(image):
+    # Open through the storage rather than the shared FieldFile so reads are thread-safe
+    with image.image.storage.open(image.image.name, 'rb') as image_file:
+        return image_file.read()
+
+
+# Formats that are already compressed; deflating them costs CPU and saves nothing
+STORED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp', 'gif', 'heic', 'avif'}
+
+
+class ZipStream:
+    """
+    Write-only, unseekable file object for zipfile. Everything written is buffered
+    until drain() hands it to the response generator. zipfile detects the missing
+    tell()/seek() and writes data descriptors instead of seeking back.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip_stream(members, fetch, max_workers, on_error=None):
+    """
+    Stream a ZIP archive of `members`, an iterable of (arcname, source) pairs.
+
+    `fetch(source)` returns the file bytes and runs on a bounded thread pool, so storage
+    latency overlaps with compression and sending. At most 2 * max_workers files are in
+    memory at once and archive order follows `members`. A member whose fetch fails is
+    skipped and reported to on_error(source, exc).
+    """
+    stream = ZipStream()
+    members = iter(members)
+    pending = deque()
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def fill():
+        while len(pending) < max_workers * 2:
+            member = next(members, None)
+            if member is None:
+                return
+            pending.append((member, pool.submit(fetch, member[1])))
+
+    try:
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            fill()
+            while pending:
+                (arcname, source), future = pending.popleft()
+                fill()
+                try:
+                    data = future.result()
+                except Exception as e:
+                    if on_error:
+                        on_error(source, e)
+                    continue
+
+                extension = arcname.rsplit('.', 1)[-1].lower()
+                compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                zip_file.writestr(arcname, data, compress_type=compress_type)
+                yield stream.drain()
+        # Central directory, written when the archive is closed
+        yield stream.drain()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,373 @@
+import hashlib
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .models import VehicleImage, VehicleImageRendition, file_reference_count, tombstone_files
+
+logger = logging.getLogger(__name__)
+
+# Formats kept when re-encoding; anything else (HEIC, MPO, BMP...) becomes JPEG
+OUTPUT_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif', 'AVIF': 'avif'}
+
+# Encoder settings per format; WebP and AVIF qualities are roughly on par with JPEG 85
+ENCODE_OPTIONS = {
+    'JPEG': {'optimize': True, 'quality': 85},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 4},
+    'AVIF': {'quality': 60, 'speed': 6},
+    'GIF': {'optimize': True},
+}
+
+
+# Pillow's own decompression-bomb guard; check_image_pixels() enforces the same limit
+# on the header alone, before anything is decoded
+Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+
+# Integer reduce() stops once the image is within this factor of the target size, so
+# the final LANCZOS pass always has enough pixels to resample from
+REDUCING_GAP = 2
+
+
+def check_image_pixels(img):
+    """Raise ValueError if an opened (not yet decoded) image exceeds MAX_IMAGE_PIXELS"""
+    if img.width * img.height > settings.MAX_IMAGE_PIXELS:
+        raise ValueError(
+            f'Image is {img.width}x{img.height}; the limit is {settings.MAX_IMAGE_PIXELS:,} pixels'
+        )
+
+
+def store_uploaded_images(vehicle, files):
+    """
+    Write uploaded files to storage on a thread pool, then insert their VehicleImage
+    rows in one bulk_create. The threads make no database queries; the upload path
+    is built from the vehicle's ids. If any write fails, the files already stored are
+    removed and the error is raised.
+
+    Files carrying a sha256 (see autolog.uploads.HashedImageUpload) are deduplicated:
+    one already on this vehicle is skipped, and one matching a processed image on
+    another of the user's vehicles shares that image's files instead of being stored
+    and resized again. Returns (created images, names of the skipped duplicates).
+    """
+    hashes = {getattr(f, 'sha256', '') for f in files} - {''}
+    on_vehicle, sources = set(), {}
+    for match in VehicleImage.objects.filter(
+        vehicle__user_id=vehicle.user_id, content_hash__in=hashes
+    ).prefetch_related('renditions').order_by('uploaded_at'):
+        if match.vehicle_id == vehicle.pk:
+            # A failed copy does not block uploading the photo again
+            if match.processing_status != 'failed':
+                on_vehicle.add(match.content_hash)
+        elif match.processing_status == 'ready':
+            sources.setdefault(match.content_hash, match)
+
+    to_store, shared, duplicates = [], [], []
+    for uploaded_file in files:
+        content_hash = getattr(uploaded_file, 'sha256', '')
+        if content_hash in on_vehicle:
+            duplicates.append(uploaded_file.name)
+            continue
+        if content_hash:
+            on_vehicle.add(content_hash)
+        image = VehicleImage(vehicle=vehicle, content_hash=content_hash)
+        if content_hash in sources:
+            image.image = sources[content_hash].image.name
+            image.processing_status = 'ready'
+            shared.append(image)
+        else:
+            to_store.append((image, uploaded_file))
+
+    def store(image, uploaded_file):
+        image.image.save(uploaded_file.name, uploaded_file, save=False)
+
+    with ThreadPoolExecutor(max_workers=settings.IMAGE_UPLOAD_STORAGE_WORKERS) as pool:
+        futures = [pool.submit(store, image, uploaded_file) for image, uploaded_file in to_store]
+    errors = [future.exception() for future in futures if future.exception()]
+
+    if errors:
+        for image, _ in to_store:
+            if image.image and image.image._committed:
+                image.image.delete(save=False)
+        raise errors[0]
+
+    with transaction.atomic():
+        created = VehicleImage.objects.bulk_create([image for image, _ in to_store] + shared)
+        VehicleImageRendition.objects.bulk_create([
+            rendition
+            for image in shared
+            for rendition in copy_renditions(sources[image.content_hash], image)
+        ])
+    return created, duplicates
+
+
+def copy_renditions(source, image):
+    """Unsaved renditions for `image` pointing at the files of `source`'s renditions"""
+    return [
+        VehicleImageRendition(
+            image=image, size=rendition.size, format=rendition.format, file=rendition.file.name,
+            width=rendition.width, height=rendition.height,
+        )
+        for rendition in source.renditions.all()
+    ]
+
+
+def file_sha256(field_file):
+    """SHA-256 of a stored file, read in chunks"""
+    digest = hashlib.sha256()
+    with field_file.storage.open(field_file.name, 'rb') as stored:
+        for chunk in iter(lambda: stored.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def duplicate_source(image):
+    """
+    A processed image of the same user with identical content but its own stored
+    file, or None
+    """
+    if not image.content_hash:
+        return None
+    return (
+        VehicleImage.objects.filter(
+            vehicle__user_id=image.vehicle.user_id, content_hash=image.content_hash, processing_status='ready'
+        )
+        .exclude(pk=image.pk)
+        .exclude(image=image.image.name)
+        .prefetch_related('renditions')
+        .order_by('uploaded_at')
+        .first()
+    )
+
+
+def share_stored_image(image, source):
+    """
+    Point `image` at the stored original and renditions of `source`, an identical
+    processed image, and release the files it had of its own
+    """
+    with transaction.atomic():
+        # The deleted renditions' files are queued by the post_delete signal
+        image.renditions.all().delete()
+        VehicleImageRendition.objects.bulk_create(copy_renditions(source, image))
+        tombstone_files([image.image.name])
+        image.image = source.image.name
+        image.processing_status = 'ready'
+        image.save(update_fields=['image', 'content_hash', 'processing_status', 'updated_at'])
+
+
+def fitted_size(size, max_size):
+    """(width, height) scaled down so neither side exceeds max_size"""
+    width, height = size
+    scale = min(max_size / width, max_size / height, 1)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def open_downscaled(source, max_size):
+    """
+    Open an image and decode it at roughly the size it will be resized to.
+
+    JPEGs are decoded by libjpeg at 1/2, 1/4 or 1/8 scale (draft mode), so a 48 MP
+    photo never exists at full size in memory. Whatever is still much larger than the
+    target is then shrunk with a cheap integer reduce(). Returns (image, source format,
+    original size); the image still needs a final resample with fit_within().
+    """
+    img = Image.open(source)
+    check_image_pixels(img)
+    img_format = img.format
+    original_size = img.size
+
+    if img_format == 'JPEG':
+        # draft() picks the largest scale that stays at or above the requested size
+        img.draft(img.mode, fitted_size(img.size, max_size))
+
+    # Apply the EXIF orientation; re-encoded copies do not keep the EXIF block
+    img = ImageOps.exif_transpose(img)
+
+    factor = max(img.size) // (max_size * REDUCING_GAP)
+    if factor > 1:
+        img = img.reduce(factor)
+    return img, img_format, original_size
+
+
+def fit_within(img, max_size):
+    """Scale `img` down with LANCZOS so neither side exceeds max_size"""
+    size = fitted_size(img.size, max_size)
+    if size == img.size:
+        return img
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def encode_image(img, img_format):
+    """Encode an image for storage and return (BytesIO, file extension)"""
+    if img_format not in OUTPUT_FORMATS:
+        img_format = 'JPEG'
+    if img_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    elif img_format in ('WEBP', 'AVIF') and img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if has_alpha(img) else 'RGB')
+
+    output = BytesIO()
+    img.save(output, format=img_format, **ENCODE_OPTIONS[img_format])
+    output.seek(0)
+    return output, OUTPUT_FORMATS[img_format]
+
+
+def has_alpha(img):
+    return img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+
+
+def rendition_format(img, img_format):
+    """
+    Format of the rendition every browser can show: PNG for PNG sources and anything
+    with transparency, JPEG otherwise
+    """
+    return 'PNG' if img_format == 'PNG' or has_alpha(img) else 'JPEG'
+
+
+def alternate_formats():
+    """IMAGE_ALTERNATE_FORMATS this Pillow build can encode"""
+    return [img_format for img_format in settings.IMAGE_ALTERNATE_FORMATS if features.check(img_format.lower())]
+
+
+def process_vehicle_image(image):
+    """
+    Cap the stored original at MAX_IMAGE_RESOLUTION and (re)generate every rendition in
+    IMAGE_RENDITION_SIZES. Sizes the image already fits within share the files of the
+    next larger size. Runs in the process_vehicle_images worker, not the request.
+    """
+    # Uploads that were not hashed on the way in (direct to S3) are checked for a
+    # duplicate here, before any resizing
+    if not image.content_hash:
+        image.content_hash = file_sha256(image.image)
+        image.save(update_fields=['content_hash', 'updated_at'])
+    duplicate = duplicate_source(image)
+    if duplicate is not None:
+        share_stored_image(image, duplicate)
+        return
+
+    max_size = settings.MAX_IMAGE_RESOLUTION
+    with image.image.storage.open(image.image.name, 'rb') as source:
+        img, img_format, original_size = open_downscaled(source, max_size)
+
+    stem = posixpath.splitext(posixpath.basename(image.image.name))[0]
+
+    if max(original_size) > max_size:
+        img = fit_within(img, max_size)
+        output, ext = encode_image(img, img_format)
+        original_name = image.image.name
+        image.image.save(f'{stem}.{ext}', File(output), save=False)
+        if image.image.name != original_name:
+            tombstone_files([original_name])
+
+    existing = {(rendition.size, rendition.format): rendition for rendition in image.renditions.all()}
+
+    def save_rendition(size, ext, dimensions, output=None, shared_name=None):
+        """Store `output` for one size and format, or point it at `shared_name`; returns the file name"""
+        rendition = existing.pop((size, ext), None) or VehicleImageRendition(image=image, size=size, format=ext)
+        if rendition.file and rendition.file.name != shared_name and file_reference_count(rendition.file.name) == 1:
+            rendition.file.delete(save=False)
+        if shared_name:
+            rendition.file = shared_name
+        else:
+            rendition.file.save(f'{stem}_{size}.{ext}', File(output), save=False)
+        rendition.width, rendition.height = dimensions
+        rendition.save()
+        return rendition.file.name
+
+    # Largest first, each rendition resampled from the previous one
+    copy, previous_size, previous_files = img, None, {}
+    for size, size_px in sorted(settings.IMAGE_RENDITION_SIZES.items(), key=lambda item: -item[1]):
+        copy = fit_within(copy, size_px)
+        if copy.size == previous_size:
+            # The image already fits this size; reuse the larger size's files rather than encode them again
+            for ext, name in previous_files.items():
+                save_rendition(size, ext, copy.size, shared_name=name)
+            continue
+
+        output, ext = encode_image(copy, rendition_format(copy, img_format))
+        files = {ext: save_rendition(size, ext, copy.size, output)}
+
+        # Alternates are only worth serving when they beat the JPEG/PNG
+        for alternate_format in alternate_formats():
+            alternate, alternate_ext = encode_image(copy, alternate_format)
+            if alternate.getbuffer().nbytes < output.getbuffer().nbytes:
+                files[alternate_ext] = save_rendition(size, alternate_ext, copy.size, alternate)
+        previous_size, previous_files = copy.size, files
+
+    # Sizes and formats no longer produced
+    for rendition in existing.values():
+        rendition.delete()
+
+    image.processing_status = 'ready'
+    image.save(update_fields=['image', 'processing_status', 'updated_at'])
+
+
+def claim_vehicle_images(limit=1):
+    """
+    Mark up to `limit` of the oldest pending images as processing and return them.
+    Rows locked by another worker are skipped.
+    """
+    with transaction.atomic():
+        images = list(
+            VehicleImage.objects.select_for_update(skip_locked=True)
+            .filter(processing_status='pending')
+            .order_by('uploaded_at')[:limit]
+        )
+        VehicleImage.objects.filter(pk__in=[image.pk for image in images]).update(
+            processing_status='processing', updated_at=timezone.now()
+        )
+    for image in images:
+        image.processing_status = 'processing'
+    return images
+
+
+def run_vehicle_image(image):
+    """Process a claimed image, marking it failed instead of raising"""
+    try:
+        process_vehicle_image(image)
+    except Exception:
+        logger.exception("Processing vehicle image %s failed", image.pk)
+        image.processing_status = 'failed'
+        image.save(update_fields=['processing_status', 'updated_at'])
+    return image
+
+
+def images_missing_renditions():
+    """Images without a JPEG/PNG rendition for every size in IMAGE_RENDITION_SIZES"""
+    sizes = list(settings.IMAGE_RENDITION_SIZES)
+    return VehicleImage.objects.annotate(
+        rendition_count=Count('renditions', filter=Q(renditions__size__in=sizes) & ~Q(
+            renditions__format__in=list(VehicleImageRendition.ALTERNATE_FORMATS)
+        ))
+    ).filter(rendition_count__lt=len(sizes))
+
+
+def process_image_by_id(pk):
+    """Process-pool entry point for process_vehicle_images --workers"""
+    image = VehicleImage.objects.get(pk=pk)
+    run_vehicle_image(image)
+    return image.processing_status
+
+
+def claim_image(image):
+    """Mark a specific image as processing unless a worker already has it"""
+    claimed = VehicleImage.objects.filter(pk=image.pk).exclude(processing_status='processing').update(
+        processing_status='processing', updated_at=timezone.now()
+    )
+    return bool(claimed)
+
+
+def requeue_stale_images():
+    """Queue again images left in processing by a worker that died"""
+    cutoff = timezone.now() - timedelta(minutes=settings.IMAGE_PROCESSING_TIMEOUT_MINUTES)
+    return VehicleImage.objects.filter(processing_status='processing', updated_at__lt=cutoff).update(
+        processing_status='pending', updated_at=timezone.now()
+    )
@@ -0,0 +1,125 @@
+import logging
+import tempfile
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .exports import (
+    image_export_members, iter_export_json, iter_export_ndjson, iter_gzip, iter_zip_stream, read_vehicle_image,
+)
+from .models import ExportJob, Vehicle
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_SALT = 'autolog.export-job'
+
+EXPORT_JOB_FILENAMES = {
+    'json': 'jautolog_export_{:%Y%m%d}.json',
+    'ndjson': 'jautolog_export_{:%Y%m%d}.ndjson.gz',
+    'images': 'jautolog_images_{:%Y%m%d}.zip',
+}
+
+
+def export_job_token(job):
+    """Signed token for a finished job's download link"""
+    return signing.dumps(job.pk, salt=EXPORT_JOB_SALT)
+
+
+def export_job_from_token(token):
+    """Job id from a download token; raises signing.BadSignature if invalid or expired"""
+    return signing.loads(token, salt=EXPORT_JOB_SALT, max_age=settings.EXPORT_JOB_LINK_MAX_AGE)
+
+
+def claim_export_job():
+    """
+    Mark the oldest pending job as running and return it, or None if there is none.
+    Rows locked by another worker are skipped, so several workers can run side by side.
+    """
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def iter_export_job_content(job):
+    """The same byte or text stream the matching export view would send"""
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    vehicles = Vehicle.objects.filter(user=job.user)
+
+    if job.kind == 'images':
+        members = image_export_members(vehicles.prefetch_related('images'))
+
+        def on_error(image, error):
+            logger.warning("Export job %s skipped image %s: %s", job.pk, image.id, error)
+
+        return iter_zip_stream(members, read_vehicle_image, settings.EXPORT_IMAGE_FETCH_WORKERS, on_error)
+
+    if job.kind == 'ndjson':
+        return iter_gzip(iter_export_ndjson(vehicles.iterator(chunk_size=chunk_size), chunk_size))
+    return iter_export_json(vehicles.iterator(chunk_size=chunk_size), chunk_size)
+
+
+def run_export_job(job):
+    """Generate a claimed job's archive into a temp file and save it to the default storage"""
+    try:
+        with tempfile.TemporaryFile() as spool:
+            for chunk in iter_export_job_content(job):
+                spool.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            spool.seek(0)
+            job.file.save(EXPORT_JOB_FILENAMES[job.kind].format(date.today()), File(spool), save=False)
+    except Exception as e:
+        logger.exception("Export job %s failed", job.pk)
+        job.status = 'failed'
+        job.error = str(e)
+    else:
+        job.status = 'done'
+    job.finished_at = timezone.now()
+
+    # fail_stale_export_jobs may have given up on this job meanwhile; leave that result alone
+    finished = ExportJob.objects.filter(pk=job.pk, status='running').update(
+        status=job.status, file=job.file.name, error=job.error, finished_at=job.finished_at
+    )
+    if not finished:
+        logger.warning("Export job %s finished after it was failed as stale", job.pk)
+        if job.file:
+            job.file.delete(save=False)
+        job.refresh_from_db()
+    return job
+
+
+def fail_stale_export_jobs():
+    """
+    Fail jobs left running past EXPORT_JOB_STALE_MINUTES by a worker that died, so they
+    stop blocking new exports of that kind and the user can retry
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(minutes=settings.EXPORT_JOB_STALE_MINUTES)
+    return ExportJob.objects.filter(status='running', started_at__lt=cutoff).update(
+        status='failed', error='The export worker stopped before finishing.', finished_at=now
+    )
+
+
+def purge_expired_export_jobs():
+    """Delete finished jobs past EXPORT_JOB_RETENTION_HOURS together with their files"""
+    cutoff = timezone.now() - timedelta(hours=settings.EXPORT_JOB_RETENTION_HOURS)
+    expired = ExportJob.objects.filter(finished_at__lt=cutoff)
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from autolog.images import claim_image, images_missing_renditions, run_vehicle_image
+from autolog.models import VehicleImage
+
+
+class Command(BaseCommand):
+    help = "Generate missing renditions for existing vehicle images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate renditions for every image, e.g. after changing IMAGE_RENDITION_SIZES',
+        )
+        parser.add_argument('--user', type=int, help='Only images belonging to this user id')
+        parser.add_argument('--limit', type=int, help='Stop after this many images')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the images that need renditions')
+
+    def handle(self, *args, **options):
+        images = VehicleImage.objects.all() if options['all'] else images_missing_renditions()
+        if options['user']:
+            images = images.filter(vehicle__user_id=options['user'])
+        images = images.order_by('pk')
+        if options['limit']:
+            images = images[:options['limit']]
+
+        if options['dry_run']:
+            self.stdout.write(f"{images.count()} image(s) need renditions")
+            return
+
+        done = failed = skipped = 0
+        for image in images.iterator(chunk_size=100):
+            # Images a worker is processing right now are left to it
+            if not claim_image(image):
+                skipped += 1
+                continue
+            run_vehicle_image(image)
+            if image.processing_status == 'ready':
+                done += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated renditions for {done} image(s); {failed} failed, {skipped} skipped"
+        ))
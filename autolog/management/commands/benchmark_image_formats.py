@@ -0,0 +1,123 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.heic', '.avif')
+
+
+def _make_photo(path):
+    """Write a 12 MP photo-like JPEG: smooth gradients, shapes and mild sensor noise"""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    size = (4000, 3000)
+    img = Image.merge('RGB', (
+        Image.linear_gradient('L').resize(size),
+        Image.radial_gradient('L').resize(size),
+        Image.linear_gradient('L').rotate(90).resize(size),
+    ))
+    draw = ImageDraw.Draw(img)
+    for i in range(40):
+        x, y = (i * 397) % size[0], (i * 271) % size[1]
+        draw.ellipse((x, y, x + 300 + i * 7, y + 200 + i * 5), fill=(i * 6 % 256, 120, 255 - i * 6 % 256))
+    img = img.filter(ImageFilter.GaussianBlur(6))
+    noise = Image.effect_noise(size, 12).convert('RGB')
+    Image.blend(img, noise, 0.08).save(path, 'JPEG', quality=92)
+
+
+def _make_screenshot(path):
+    """Write a 2560x1440 screenshot-like PNG: flat panels and lines of text"""
+    from PIL import Image, ImageDraw
+
+    img = Image.new('RGB', (2560, 1440), (245, 246, 248))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 2560, 90), fill=(33, 37, 41))
+    draw.rectangle((0, 90, 420, 1440), fill=(230, 232, 236))
+    for row in range(60):
+        y = 130 + row * 21
+        draw.text((460, y), f"2024-{row % 12 + 1:02d}-14  Fuel  {row * 37 % 400 + 20:>4} mi  ${row * 3.17 % 90:6.2f}", fill=(20, 20, 20))
+        draw.text((1500, y), "Maintenance: oil change, tire rotation, inspection", fill=(90, 90, 90))
+    img.save(path, 'PNG')
+
+
+def _corpus(paths):
+    """Expand directories in `paths` into the image files they contain"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+class Command(BaseCommand):
+    help = "Compare rendition size and encode time of JPEG/PNG against the AVIF and WebP alternates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Image files or directories (default: a generated photo and screenshot)')
+
+    def handle(self, *args, **options):
+        from autolog.images import alternate_formats, encode_image, fit_within, open_downscaled, rendition_format
+
+        sizes = sorted(settings.IMAGE_RENDITION_SIZES.values(), reverse=True)
+        formats = alternate_formats()
+        if not formats:
+            self.stdout.write(self.style.WARNING("This Pillow build cannot encode any of IMAGE_ALTERNATE_FORMATS"))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = options['paths']
+            if not paths:
+                self.stdout.write("Generating sample photo and screenshot...")
+                paths = [os.path.join(tmpdir, 'photo.jpg'), os.path.join(tmpdir, 'screenshot.png')]
+                _make_photo(paths[0])
+                _make_screenshot(paths[1])
+
+            # format -> [bytes, seconds] over every rendition of every file
+            totals = {}
+            served = 0
+            self.stdout.write(f"\nRenditions at {', '.join(f'{size}px' for size in sizes)}:\n")
+            self.stdout.write(f"{'file':<28}{'format':<10}{'bytes':>12}{'encode (ms)':>14}{'vs fallback':>14}")
+            for path in _corpus(paths):
+                with open(path, 'rb') as source:
+                    img, img_format, _ = open_downscaled(source, sizes[0])
+
+                # Encode each size in every format, resampling largest-first like the worker
+                results = {}
+                copy = img
+                for size in sizes:
+                    copy = fit_within(copy, size)
+                    fallback = rendition_format(copy, img_format)
+                    smallest = None
+                    for label, output_format in [('fallback', fallback)] + [(f, f) for f in formats]:
+                        started = time.perf_counter()
+                        output, _ = encode_image(copy, output_format)
+                        elapsed = time.perf_counter() - started
+                        nbytes = output.getbuffer().nbytes
+                        entry = results.setdefault(label, [output_format, 0, 0.0])
+                        entry[1] += nbytes
+                        entry[2] += elapsed
+                        smallest = nbytes if smallest is None else min(smallest, nbytes)
+                    served += smallest
+
+                fallback_bytes = results['fallback'][1]
+                for label, (output_format, nbytes, elapsed) in results.items():
+                    name = output_format if label != 'fallback' else f'{output_format}*'
+                    saved = f"{nbytes / fallback_bytes - 1:+.0%}" if label != 'fallback' else ''
+                    self.stdout.write(
+                        f"{os.path.basename(path):<28}{name:<10}{nbytes:>12,}{elapsed * 1000:>14.1f}{saved:>14}"
+                    )
+                    total = totals.setdefault(label, [0, 0.0])
+                    total[0] += nbytes
+                    total[1] += elapsed
+
+            fallback_total = totals['fallback'][0]
+            self.stdout.write("\nTotals (* = JPEG/PNG fallback):")
+            for label, (nbytes, elapsed) in totals.items():
+                self.stdout.write(f"  {label:<10}{nbytes:>12,} bytes{elapsed * 1000:>10.1f} ms")
+            self.stdout.write(self.style.SUCCESS(
+                f"Serving the smallest format saves {fallback_total - served:,} bytes "
+                f"({1 - served / fallback_total:.0%}) over JPEG/PNG alone"
+            ))
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Megapixel sizes of the generated sample photos (4:3)
+SAMPLE_MEGAPIXELS = [12, 24, 48]
+
+
+def _make_sample(path, megapixels):
+    """Write a noisy 4:3 JPEG, which compresses and decodes like a real photo"""
+    from PIL import Image
+
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    noise = Image.effect_noise((width, height), 48)
+    img = Image.merge('RGB', (noise, noise.rotate(90, expand=False), noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    img.save(path, 'JPEG', quality=90)
+
+
+def _resize_full_decode(path, max_size):
+    """The previous approach: decode at full size, then one LANCZOS resize"""
+    from PIL import Image
+
+    img = Image.open(path)
+    img.load()
+    return img.resize((max_size, max_size * img.height // img.width), Image.Resampling.LANCZOS)
+
+
+def _resize_downscaled(path, max_size):
+    from autolog.images import fit_within, open_downscaled
+
+    with open(path, 'rb') as source:
+        img, _, _ = open_downscaled(source, max_size)
+    return fit_within(img, max_size)
+
+
+def _peak_rss_kb():
+    """Peak RSS of this process in KB"""
+    # VmHWM belongs to the current address space; ru_maxrss on Linux is carried over
+    # from the parent across fork/exec and would report the parent's peak instead
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(method, path, max_size):
+    """Run one resize in a fresh process; returns (seconds, peak RSS growth in MB)"""
+    import django
+    django.setup()
+
+    resize = _resize_full_decode if method == 'full' else _resize_downscaled
+    baseline = _peak_rss_kb()
+    started = time.perf_counter()
+    resize(path, max_size)
+    elapsed = time.perf_counter() - started
+    return elapsed, (_peak_rss_kb() - baseline) / 1024
+
+
+class Command(BaseCommand):
+    help = "Compare time and peak memory of full-decode and draft/reduce image resizing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='JPEG files to test (default: generated 12, 24 and 48 MP samples)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per file and method; the best time is reported')
+
+    def handle(self, *args, **options):
+        max_size = settings.MAX_IMAGE_RESOLUTION
+        context = multiprocessing.get_context('spawn')
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = options['files']
+            if not files:
+                for megapixels in SAMPLE_MEGAPIXELS:
+                    path = os.path.join(tmpdir, f'sample_{megapixels}mp.jpg')
+                    self.stdout.write(f"Generating {megapixels} MP sample...")
+                    _make_sample(path, megapixels)
+                    files.append(path)
+
+            self.stdout.write(f"\nResize to {max_size}px, best of {options['repeat']} run(s):\n")
+            self.stdout.write(f"{'file':<28}{'method':<14}{'time (s)':>10}{'peak RSS (MB)':>16}")
+            for path in files:
+                for method in ('full', 'downscaled'):
+                    runs = []
+                    for _ in range(options['repeat']):
+                        # A fresh process per run, so peak RSS is not inherited from earlier runs
+                        with context.Pool(1) as pool:
+                            runs.append(pool.apply(_measure, (method, path, max_size)))
+                    elapsed = min(run[0] for run in runs)
+                    peak_mb = max(run[1] for run in runs)
+                    self.stdout.write(f"{os.path.basename(path):<28}{method:<14}{elapsed:>10.3f}{peak_mb:>16.1f}")
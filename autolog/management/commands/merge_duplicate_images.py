@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from autolog.images import file_sha256, share_stored_image
+from autolog.models import VehicleImage
+
+
+class Command(BaseCommand):
+    help = "Find identical vehicle images and merge them onto one stored copy"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only images belonging to this user id')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the duplicates that would be merged')
+
+    def handle(self, *args, **options):
+        images = VehicleImage.objects.all()
+        if options['user']:
+            images = images.filter(vehicle__user_id=options['user'])
+        dry_run = options['dry_run']
+
+        # Images uploaded before hashing get the hash of their stored file
+        hashed = 0
+        for image in images.filter(content_hash='').exclude(image='').iterator(chunk_size=100):
+            try:
+                content_hash = file_sha256(image.image)
+            except OSError as e:
+                self.stderr.write(f"Vehicle image {image.pk}: cannot read {image.image.name} ({e})")
+                continue
+            if not dry_run:
+                VehicleImage.objects.filter(pk=image.pk).update(content_hash=content_hash)
+            hashed += 1
+
+        # The same photo twice on one vehicle: keep the primary (or oldest) copy
+        removed = 0
+        groups = (
+            images.exclude(content_hash='').values('vehicle_id', 'content_hash')
+            .annotate(copies=Count('id')).filter(copies__gt=1).order_by()
+        )
+        for group in groups:
+            keep, *extra = images.filter(**group_filter(group)).order_by('-is_primary', 'uploaded_at')
+            for image in extra:
+                self.stdout.write(f"Vehicle {keep.vehicle_id}: image {image.pk} duplicates {keep.pk}")
+                if dry_run:
+                    continue
+                if image.caption and not keep.caption:
+                    keep.caption = image.caption
+                    keep.save(update_fields=['caption', 'updated_at'])
+                image.delete()
+            removed += len(extra)
+
+        # The same photo on several of a user's vehicles: share the oldest stored copy
+        shared = 0
+        groups = (
+            images.filter(processing_status='ready').exclude(content_hash='')
+            .values('vehicle__user_id', 'content_hash')
+            .annotate(files=Count('image', distinct=True)).filter(files__gt=1).order_by()
+        )
+        for group in groups:
+            keep, *others = (
+                images.filter(processing_status='ready', **group_filter(group))
+                .prefetch_related('renditions').order_by('uploaded_at')
+            )
+            for image in others:
+                if image.image.name == keep.image.name:
+                    continue
+                self.stdout.write(f"Vehicle image {image.pk}: sharing the files of image {keep.pk}")
+                if not dry_run:
+                    share_stored_image(image, keep)
+                shared += 1
+
+        prefix = "Would merge" if dry_run else "Merged"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: hashed {hashed} image(s), removed {removed} duplicate(s), "
+            f"{shared} image(s) now sharing stored files"
+        ))
+
+
+def group_filter(group):
+    """Queryset filter for one values() group, dropping the annotated count"""
+    return {key: value for key, value in group.items() if key not in ('copies', 'files')}
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from autolog.jobs import claim_export_job, fail_stale_export_jobs, purge_expired_export_jobs, run_export_job
+
+
+class Command(BaseCommand):
+    help = "Run pending background export jobs and remove expired export files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, checking for new jobs every EXPORT_JOB_POLL_SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stale = fail_stale_export_jobs()
+            if stale:
+                self.stdout.write(f"Failed {stale} stale export job(s)")
+
+            purged = purge_expired_export_jobs()
+            if purged:
+                self.stdout.write(f"Removed {purged} expired export job(s)")
+
+            while (job := claim_export_job()) is not None:
+                run_export_job(job)
+                self.stdout.write(f"Export job {job.pk} ({job.kind}) for user {job.user_id}: {job.status}")
+
+            if not options['loop']:
+                break
+            time.sleep(settings.EXPORT_JOB_POLL_SECONDS)
@@ -0,0 +1,58 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from autolog.images import claim_vehicle_images, process_image_by_id, requeue_stale_images, run_vehicle_image
+
+
+class Command(BaseCommand):
+    help = "Resize newly uploaded vehicle images and generate their renditions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, checking for new uploads every IMAGE_PROCESSING_POLL_SECONDS',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.IMAGE_PROCESSING_WORKERS,
+            help='Processes resizing images in parallel (default: IMAGE_PROCESSING_WORKERS)',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        pool = None
+        if workers > 1:
+            # spawn rather than fork so workers never share the parent's database connections
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+
+        try:
+            while True:
+                requeued = requeue_stale_images()
+                if requeued:
+                    self.stdout.write(f"Queued {requeued} stalled image(s) again")
+
+                while images := claim_vehicle_images(limit=workers):
+                    if pool is None:
+                        statuses = [run_vehicle_image(image).processing_status for image in images]
+                    else:
+                        statuses = list(pool.map(process_image_by_id, [image.pk for image in images]))
+                    for image, status in zip(images, statuses):
+                        self.stdout.write(f"Vehicle image {image.pk}: {status}")
+
+                if not options['loop']:
+                    break
+                time.sleep(settings.IMAGE_PROCESSING_POLL_SECONDS)
+        finally:
+            if pool is not None:
+                pool.shutdown()
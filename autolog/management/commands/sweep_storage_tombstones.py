@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from autolog.tombstones import reconcile_storage, sweep_storage_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete the stored files of removed vehicle images in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconcile',
+            action='store_true',
+            help='First list vehicle media in storage and queue files no image references',
+        )
+        parser.add_argument('--user', type=int, help='With --reconcile, only list this user id\'s files')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['reconcile']:
+            orphans = reconcile_storage(user_id=options['user'], dry_run=options['dry_run'])
+            for name in orphans:
+                self.stdout.write(f"Orphaned: {name}")
+            self.stdout.write(f"{len(orphans)} orphaned file(s) queued for deletion")
+
+        deleted, referenced, failed = sweep_storage_tombstones(dry_run=options['dry_run'])
+        prefix = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {deleted} file(s); {referenced} still in use, {failed} failed"
+        ))
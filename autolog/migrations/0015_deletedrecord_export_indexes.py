@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-18 23:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autolog', '0014_vehicle_loan_monthly_payment_override_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_type', models.CharField(choices=[('vehicle', 'Vehicle'), ('fuel', 'Fuel Entry'), ('maintenance', 'Maintenance Entry'), ('expense', 'Other Expense')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('vehicle_key', models.JSONField(default=dict, help_text='Natural key of the vehicle the record belonged to')),
+                ('key', models.JSONField(default=dict, help_text='Natural key of the deleted record')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['deleted_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['vehicle', 'updated_at'], name='autolog_fue_vehicle_efb98b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenanceentry',
+            index=models.Index(fields=['vehicle', 'updated_at'], name='autolog_mai_vehicle_e6ea02_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otherexpense',
+            index=models.Index(fields=['vehicle', 'updated_at'], name='autolog_oth_vehicle_525e85_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['user', 'updated_at'], name='autolog_veh_user_id_88f40e_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletedrecord',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_records', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='deletedrecord',
+            index=models.Index(fields=['user', 'deleted_at'], name='autolog_del_user_id_bc9c78_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 23:11
+
+import autolog.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autolog', '0017_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.CharField(max_length=20)),
+                ('file', models.ImageField(upload_to=autolog.models.vehicle_image_rendition_path)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+            ],
+            options={
+                'ordering': ['width'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vehicleimage',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='vehicleimage',
+            index=models.Index(fields=['processing_status', 'uploaded_at'], name='autolog_veh_process_39c94f_idx'),
+        ),
+        migrations.AddField(
+            model_name='vehicleimagerendition',
+            name='image',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='autolog.vehicleimage'),
+        ),
+        migrations.AddConstraint(
+            model_name='vehicleimagerendition',
+            constraint=models.UniqueConstraint(fields=('image', 'size'), name='unique_vehicle_image_rendition'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 23:20
+
+from django.db import migrations
+
+RENAMED_SIZES = {'thumbnail': 'small', 'gallery': 'medium'}
+
+
+def rename_sizes(apps, schema_editor):
+    """Rename the first rendition sizes to the small/medium/large scheme"""
+    VehicleImageRendition = apps.get_model('autolog', 'VehicleImageRendition')
+    for old, new in RENAMED_SIZES.items():
+        VehicleImageRendition.objects.filter(size=old).update(size=new)
+
+
+def restore_sizes(apps, schema_editor):
+    """Reverse the rename"""
+    VehicleImageRendition = apps.get_model('autolog', 'VehicleImageRendition')
+    for old, new in RENAMED_SIZES.items():
+        VehicleImageRendition.objects.filter(size=new).update(size=old)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autolog', '0018_vehicleimage_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_sizes, restore_sizes),
+    ]
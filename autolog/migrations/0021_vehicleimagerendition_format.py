@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+def set_formats(apps, schema_editor):
+    """Existing renditions were encoded in their source's format; read it from the extension"""
+    VehicleImageRendition = apps.get_model('autolog', 'VehicleImageRendition')
+    for ext in ('png', 'webp', 'gif', 'avif'):
+        VehicleImageRendition.objects.filter(file__iendswith=f'.{ext}').update(format=ext)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('autolog', '0020_vehicleimage_content_hash'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='vehicleimagerendition',
+            name='unique_vehicle_image_rendition',
+        ),
+        migrations.AddField(
+            model_name='vehicleimagerendition',
+            name='format',
+            field=models.CharField(default='jpg', help_text='File extension of the encoded format', max_length=10),
+        ),
+        migrations.RunPython(set_formats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vehicleimagerendition',
+            constraint=models.UniqueConstraint(fields=('image', 'size', 'format'), name='unique_vehicle_image_rendition_format'),
+        ),
+    ]
@@ -1,8 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.conf import settings
-from PIL import Image
-from io import BytesIO
+import posixpath
+import uuid
 
 
 class Vehicle(models.Model):
@@ -63,6 +62,10 @@ class Vehicle(models.Model):
 
     class Meta:
         ordering = ['-year', 'make', 'model']
+        indexes = [
+            # Incremental exports select rows changed since a cursor
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.year} {self.make} {self.model}"
@@ -226,6 +229,34 @@ class Vehicle(models.Model):
 
         return round(vehicle_cost, 2)
 
+    def delete_with_related(self):
+        """
+        Delete the vehicle with one DELETE per child table instead of the collector
+        loading every entry and image first. Image and rendition files are queued as
+        storage tombstones for the sweeper rather than deleted here.
+
+        Returns:
+            dict: Rows removed per table, e.g. {'fuel_entries': 120, ...}
+        """
+        renditions = VehicleImageRendition.objects.filter(image__vehicle=self)
+        images = VehicleImage.objects.filter(vehicle=self)
+
+        with transaction.atomic():
+            tombstone_files(
+                list(images.values_list('image', flat=True)) + list(renditions.values_list('file', flat=True))
+            )
+            counts = {
+                'image_renditions': delete_tombstoned(renditions),
+                'images': delete_tombstoned(images),
+            }
+            # No signals or dependents, so each is a single set-based DELETE
+            counts['fuel_entries'] = self.fuel_entries.all().delete()[0]
+            counts['maintenance_entries'] = self.maintenance_entries.all().delete()[0]
+            counts['other_expenses'] = self.other_expenses.all().delete()[0]
+            # Nothing references the vehicle any more, so this is a single DELETE too
+            Vehicle.objects.filter(pk=self.pk).delete()
+        return counts
+
 
 class FuelEntry(models.Model):
     # Relationships
@@ -288,6 +319,9 @@ class FuelEntry(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         verbose_name_plural = "Fuel entries"
+        indexes = [
+            models.Index(fields=['vehicle', 'updated_at']),
+        ]
 
     def __str__(self):
         if self.mpg:
@@ -330,6 +364,9 @@ class MaintenanceEntry(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         verbose_name_plural = "Maintenance entries"
+        indexes = [
+            models.Index(fields=['vehicle', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.vehicle} - {self.get_category_display()} - {self.date}"
@@ -362,21 +399,66 @@ class OtherExpense(models.Model):
     class Meta:
         ordering = ['-date', '-created_at']
         verbose_name_plural = "Other expenses"
+        indexes = [
+            models.Index(fields=['vehicle', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.vehicle} - {self.get_expense_type_display()} - {self.date}"
 
 
+class DeletedRecord(models.Model):
+    """
+    Tombstone for a deleted vehicle or entry, so incremental exports can tell sync
+    clients what to remove. Exports carry no database ids, so the record is identified
+    by its natural key in export format.
+    """
+    RECORD_TYPE_CHOICES = [
+        ('vehicle', 'Vehicle'),
+        ('fuel', 'Fuel Entry'),
+        ('maintenance', 'Maintenance Entry'),
+        ('expense', 'Other Expense'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deleted_records')
+    record_type = models.CharField(max_length=20, choices=RECORD_TYPE_CHOICES)
+    object_id = models.BigIntegerField()
+    vehicle_key = models.JSONField(default=dict, help_text="Natural key of the vehicle the record belonged to")
+    key = models.JSONField(default=dict, help_text="Natural key of the deleted record")
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_record_type_display()} {self.object_id} deleted {self.deleted_at}"
+
+
 def vehicle_image_upload_path(instance, filename):
     """
     Generate hierarchical upload path for vehicle images.
     Returns: vehicles/user_{user_id}/vehicle_{vehicle_id}/{filename}
     """
-    return f'vehicles/user_{instance.vehicle.user.id}/vehicle_{instance.vehicle.id}/{filename}'
+    # Only ids: following instance.vehicle.user would cost a query per file
+    return f'vehicles/user_{instance.vehicle.user_id}/vehicle_{instance.vehicle_id}/{filename}'
 
 
 class VehicleImage(models.Model):
-    """Model for storing vehicle images with automatic resizing"""
+    """
+    Model for storing vehicle images. Uploads are stored as-is; the
+    process_vehicle_images worker caps the original at MAX_IMAGE_RESOLUTION and
+    generates the smaller renditions (see autolog.images).
+    """
+    PROCESSING_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     vehicle = models.ForeignKey(
         Vehicle,
         on_delete=models.CASCADE,
@@ -385,59 +467,199 @@ class VehicleImage(models.Model):
     image = models.ImageField(upload_to=vehicle_image_upload_path)
     caption = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_primary = models.BooleanField(default=False, help_text="Primary image shown first")
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_STATUS_CHOICES, default='pending')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
 
     class Meta:
         ordering = ['-is_primary', '-uploaded_at']
+        indexes = [
+            models.Index(fields=['processing_status', 'uploaded_at']),
+        ]
 
     def __str__(self):
         return f"{self.vehicle} - Image {self.id}"
 
     def save(self, *args, **kwargs):
-        """Override save to resize image if needed - works with local and S3 storage"""
-        # Process image BEFORE saving to storage
-        if self.image:
-            # Open the uploaded image file
-            img = Image.open(self.image)
-
-            # Get max resolution from settings
-            max_size = settings.MAX_IMAGE_RESOLUTION
-
-            # Check if image needs resizing
-            if img.width > max_size or img.height > max_size:
-                # Calculate new dimensions maintaining aspect ratio
-                if img.width > img.height:
-                    new_width = max_size
-                    new_height = int((max_size / img.width) * img.height)
-                else:
-                    new_height = max_size
-                    new_width = int((max_size / img.height) * img.width)
-
-                # Resize image
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-                # Save resized image to BytesIO
-                output = BytesIO()
-
-                # Preserve format (JPEG, PNG, etc.)
-                img_format = img.format or 'JPEG'
-                img.save(output, format=img_format, optimize=True, quality=85)
-                output.seek(0)
-
-                # Replace the image field with resized version
-                from django.core.files import File
-                self.image.save(
-                    self.image.name,
-                    File(output),
-                    save=False
-                )
-
-        # Now save to storage (local or S3)
+        """Queue a newly assigned file for processing; metadata edits leave it alone"""
+        if self.image and not self.image._committed:
+            self.processing_status = 'pending'
         super().save(*args, **kwargs)
 
-    def delete(self, *args, **kwargs):
-        """Override delete to remove image file - works with local and S3 storage"""
-        if self.image:
-            # Delete file from storage backend (local or S3)
-            self.image.delete(save=False)
-        super().delete(*args, **kwargs)
+    @property
+    def is_processing(self):
+        return self.processing_status in ('pending', 'processing')
+
+    def rendition_url(self, size):
+        """URL of a rendition, falling back to the original until it has been generated"""
+        for rendition in self.renditions.all():
+            if rendition.size == size and not rendition.is_alternate:
+                return rendition.file.url
+        return self.image.url
+
+    @property
+    def small_url(self):
+        return self.rendition_url('small')
+
+    @property
+    def medium_url(self):
+        return self.rendition_url('medium')
+
+    @property
+    def srcset(self):
+        """srcset candidates for the JPEG/PNG renditions every browser can show"""
+        return _srcset(rendition for rendition in self.renditions.all() if not rendition.is_alternate)
+
+    @property
+    def alternate_sources(self):
+        """
+        (MIME type, srcset) for each smaller format the renditions were also encoded
+        in, best first, for <source> elements inside a <picture>
+        """
+        sources = []
+        for ext, content_type in VehicleImageRendition.ALTERNATE_FORMATS.items():
+            srcset = _srcset(rendition for rendition in self.renditions.all() if rendition.format == ext)
+            if srcset:
+                sources.append((content_type, srcset))
+        return sources
+
+
+def _srcset(renditions):
+    """
+    srcset candidates, smallest first. Renditions of a small original can share a
+    width; only the first of each width is listed.
+    """
+    candidates = {}
+    for rendition in renditions:
+        # Only sign a URL for widths not listed yet
+        if rendition.width not in candidates:
+            candidates[rendition.width] = rendition.file.url
+    return ', '.join(f'{url} {width}w' for width, url in sorted(candidates.items()))
+
+
+def vehicle_image_rendition_path(instance, filename):
+    """
+    Renditions sit next to the original image.
+    Returns: vehicles/user_{user_id}/vehicle_{vehicle_id}/renditions/{filename}
+    """
+    return posixpath.join(posixpath.dirname(instance.image.image.name), 'renditions', filename)
+
+
+class VehicleImageRendition(models.Model):
+    """
+    A resized copy of a VehicleImage. Every size in IMAGE_RENDITION_SIZES has a JPEG
+    or PNG rendition, plus AVIF/WebP alternates where those came out smaller.
+    """
+    # Alternate formats offered through <picture>, best first -> MIME type
+    ALTERNATE_FORMATS = {
+        'avif': 'image/avif',
+        'webp': 'image/webp',
+    }
+
+    image = models.ForeignKey(VehicleImage, on_delete=models.CASCADE, related_name='renditions')
+    size = models.CharField(max_length=20)
+    format = models.CharField(max_length=10, default='jpg', help_text="File extension of the encoded format")
+    file = models.ImageField(upload_to=vehicle_image_rendition_path)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['width']
+        constraints = [
+            models.UniqueConstraint(fields=['image', 'size', 'format'], name='unique_vehicle_image_rendition_format'),
+        ]
+
+    def __str__(self):
+        return f"{self.image} - {self.size} {self.format} ({self.width}x{self.height})"
+
+    @property
+    def is_alternate(self):
+        return self.format in self.ALTERNATE_FORMATS
+
+
+def file_reference_count(name):
+    """How many images and renditions use a stored file"""
+    return (
+        VehicleImage.objects.filter(image=name).count()
+        + VehicleImageRendition.objects.filter(file=name).count()
+    )
+
+
+class StorageTombstone(models.Model):
+    """
+    A stored file queued for deletion. Deleting an image or rendition row (directly
+    or through a vehicle's cascade) only records its file here; the
+    sweep_storage_tombstones command removes the files in batches, skipping any that
+    another row still references.
+    """
+    name = models.CharField(max_length=500)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.name
+
+
+def tombstone_files(names):
+    """Queue stored files for deletion by the storage sweeper"""
+    StorageTombstone.objects.bulk_create([StorageTombstone(name=name) for name in names if name])
+
+
+def delete_tombstoned(queryset):
+    """
+    Delete image or rendition rows whose files the caller already queued with
+    tombstone_files. The post_delete receivers skip deletions started here.
+
+    Returns:
+        int: Rows deleted from the queryset's own table
+    """
+    queryset.files_tombstoned = True
+    return queryset.delete()[1].get(queryset.model._meta.label, 0)
+
+
+def export_job_upload_path(instance, filename):
+    """Returns: exports/user_{user_id}/jobs/{random}/{filename}"""
+    # The random directory keeps archive URLs unguessable where media is served without auth
+    return f'exports/user_{instance.user_id}/jobs/{uuid.uuid4().hex}/{filename}'
+
+
+class ExportJob(models.Model):
+    """
+    An export generated in the background by the process_export_jobs command. The
+    finished archive is written to the default storage and downloaded through a
+    short-lived signed link.
+    """
+    KIND_CHOICES = [
+        ('json', 'Data (JSON)'),
+        ('ndjson', 'Data (compressed NDJSON)'),
+        ('images', 'Images (ZIP)'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to=export_job_upload_path, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} export - {self.get_status_display()}"
+
+    @property
+    def is_active(self):
+        return self.status in ('pending', 'running')
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .exports import entry_natural_key, record_deletion, vehicle_match_key
+from .models import (
+    FuelEntry, MaintenanceEntry, OtherExpense, Vehicle, VehicleImage, VehicleImageRendition, tombstone_files,
+)
+
+
+@receiver(post_delete, sender=VehicleImage)
+def tombstone_vehicle_image(sender, instance, origin=None, **kwargs):
+    """Queue the original of a deleted image, including one removed by a vehicle's cascade"""
+    # delete_tombstoned callers have queued the files in bulk already
+    if not getattr(origin, 'files_tombstoned', False):
+        tombstone_files([instance.image.name])
+
+
+@receiver(post_delete, sender=VehicleImageRendition)
+def tombstone_vehicle_image_rendition(sender, instance, origin=None, **kwargs):
+    if not getattr(origin, 'files_tombstoned', False):
+        tombstone_files([instance.file.name])
+
+
+@receiver(pre_save, sender=FuelEntry)
+@receiver(pre_save, sender=MaintenanceEntry)
+@receiver(pre_save, sender=OtherExpense)
+def tombstone_changed_entry_key(sender, instance, raw=False, **kwargs):
+    """
+    An edit that changes an entry's natural key removes the entry under its old key for
+    anyone syncing by natural key, so record a deletion of the old key
+    """
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.select_related('vehicle').filter(pk=instance.pk).first()
+    if previous is not None and entry_natural_key(previous) != entry_natural_key(instance):
+        record_deletion(previous)
+
+
+@receiver(pre_save, sender=Vehicle)
+def tombstone_changed_vehicle_key(sender, instance, raw=False, **kwargs):
+    """
+    An edit that changes a vehicle's natural key removes it under the old key, so record
+    a deletion of the old key. Its entries are touched so the next incremental export
+    sends them all again under the new key.
+    """
+    if raw or instance.pk is None:
+        return
+    previous = Vehicle.objects.filter(pk=instance.pk).first()
+    if previous is not None and vehicle_match_key(previous) != vehicle_match_key(instance):
+        record_deletion(previous)
+        now = timezone.now()
+        for model in (FuelEntry, MaintenanceEntry, OtherExpense):
+            model.objects.filter(vehicle_id=instance.pk).update(updated_at=now)
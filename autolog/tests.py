@@ -1,3 +1,458 @@
-from django.test import TestCase
+import gzip
+import json
+import posixpath
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+from PIL import Image
+from storages.backends.s3 import S3Storage
+
+from config.storage import StableURLS3Storage
+from conversion.importing import iter_ndjson_vehicles
+from conversion.reports import ImportErrorCollector
+
+from .exports import (
+    serialize_cursor, serialize_financing, serialize_fuel_entry, serialize_maintenance_entry, serialize_other_expense,
+    serialize_vehicle,
+)
+from .images import process_vehicle_image
+from .jobs import claim_export_job, fail_stale_export_jobs, run_export_job
+from .uploads import HEADER_BYTES, ImageUploadHandler
+from .models import (
+    DeletedRecord, ExportJob, FuelEntry, MaintenanceEntry, OtherExpense, StorageTombstone, Vehicle, VehicleImage,
+    VehicleImageRendition, vehicle_image_upload_path,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_file(name, shade):
+    """A small JPEG; a distinct shade keeps it from being deduplicated against earlier uploads"""
+    output = BytesIO()
+    Image.new('RGB', (64, 48), (shade, 80, 160)).save(output, 'JPEG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, USE_S3_MEDIA=False)
+class VehicleImageUploadQueryTests(TestCase):
+    """Image uploads must not cost extra queries per file"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user('driver', password='password')
+        self.client.force_login(self.user)
+        self.shades = iter(range(0, 256, 8))
+
+    def create_vehicle(self):
+        return Vehicle.objects.create(
+            user=self.user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=100, purchased_date='2020-01-01',
+        )
+
+    def upload(self, vehicle, count):
+        """POST `count` images to the vehicle and return the number of queries it took"""
+        files = [jpeg_file(f'photo_{n}.jpg', next(self.shades)) for n in range(count)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('vehicle_images', args=[vehicle.pk]), {'images': files})
+        self.assertRedirects(response, reverse('vehicle_images', args=[vehicle.pk]), fetch_redirect_response=False)
+        self.assertEqual(vehicle.images.count(), count)
+        return len(queries)
+
+    def test_upload_path_uses_ids_only(self):
+        vehicle = Vehicle.objects.get(pk=self.create_vehicle().pk)
+        image = VehicleImage(vehicle=vehicle)
+        with self.assertNumQueries(0):
+            path = vehicle_image_upload_path(image, 'photo.jpg')
+        self.assertEqual(path, f'vehicles/user_{self.user.pk}/vehicle_{vehicle.pk}/photo.jpg')
+
+    def test_batch_upload_query_count_is_constant(self):
+        self.assertEqual(self.upload(self.create_vehicle(), 1), self.upload(self.create_vehicle(), 5))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, USE_S3_MEDIA=False)
+class ImageUploadHandlerTests(TestCase):
+    """Rejected uploads are skipped and their spooled data freed straight away"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_reject_closes_file(self):
+        handler = ImageUploadHandler()
+        handler.new_file('images', 'notes.txt', 'text/plain', None)
+        spool = handler.file
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(b'x' * HEADER_BYTES, 0)
+        self.assertTrue(spool.closed)
+        self.assertFalse(hasattr(handler, 'file'))
+        self.assertEqual(handler.rejected, ['notes.txt'])
+
+    def test_rejected_file_among_images(self):
+        user = User.objects.create_user('driver', password='password')
+        self.client.force_login(user)
+        vehicle = Vehicle.objects.create(
+            user=user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=100, purchased_date=date(2020, 1, 1),
+        )
+        files = [
+            SimpleUploadedFile('notes.txt', b'x' * (HEADER_BYTES + 1), content_type='text/plain'),
+            jpeg_file('photo.jpg', 10),
+        ]
+        response = self.client.post(reverse('vehicle_images', args=[vehicle.pk]), {'images': files})
+        errors = [str(message) for message in response.context['messages']]
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('Not a supported image'))
+        self.assertTrue(errors[0].endswith(': notes.txt'))
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT, USE_S3_MEDIA=False,
+    IMAGE_RENDITION_SIZES={'small': 320, 'medium': 800, 'large': 1280}, IMAGE_ALTERNATE_FORMATS=[],
+)
+class ImageRenditionTests(TestCase):
+    """Sizes at or above the original's dimensions reuse one rendition instead of re-encoding it"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def process(self, width, height):
+        user = User.objects.create_user('driver', password='password')
+        vehicle = Vehicle.objects.create(
+            user=user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=100, purchased_date=date(2020, 1, 1),
+        )
+        output = BytesIO()
+        Image.new('RGB', (width, height), (40, 80, 160)).save(output, 'JPEG')
+        image = VehicleImage(vehicle=vehicle)
+        image.image.save('photo.jpg', SimpleUploadedFile('photo.jpg', output.getvalue()), save=False)
+        image.save()
+        process_vehicle_image(image)
+        return VehicleImage.objects.prefetch_related('renditions').get(pk=image.pk)
+
+    def test_small_original_shares_one_file(self):
+        image = self.process(500, 375)
+        renditions = {rendition.size: rendition for rendition in image.renditions.all()}
+        self.assertEqual(set(renditions), {'small', 'medium', 'large'})
+        self.assertEqual(renditions['medium'].file.name, renditions['large'].file.name)
+        self.assertNotEqual(renditions['small'].file.name, renditions['large'].file.name)
+        self.assertEqual([candidate.split()[-1] for candidate in image.srcset.split(', ')], ['320w', '500w'])
+
+        # Reprocessing keeps the shared file
+        process_vehicle_image(image)
+        large = image.renditions.get(size='large')
+        self.assertTrue(large.file.storage.exists(large.file.name))
+        self.assertEqual(image.renditions.get(size='medium').file.name, large.file.name)
+
+
+@override_settings(MEDIA_URL_MIN_VALIDITY=600, MEDIA_URL_MEMO_SIZE=100)
+class StableMediaURLTests(TestCase):
+    """Signed media URLs are identical across processes within a time bucket"""
+
+    def storage(self):
+        # A fresh instance per call stands in for a separate gunicorn worker
+        return StableURLS3Storage(
+            access_key='AKIDEXAMPLE', secret_key='secret', bucket_name='media',
+            region_name='us-east-1', signature_version='s3v4', querystring_expire=3600,
+        )
+
+    def url_at(self, timestamp, name='vehicles/user_1/vehicle_1/photo.jpg'):
+        with mock.patch('config.storage.time.time', return_value=timestamp):
+            return self.storage().url(name)
+
+    def test_same_url_within_bucket(self):
+        # Buckets are 3000s long; 30000 starts one
+        self.assertEqual(self.url_at(30000), self.url_at(32999))
+        self.assertNotEqual(self.url_at(32999), self.url_at(33000))
+
+    def test_signature_matches_botocore(self):
+        signed_at = datetime.fromtimestamp(30000, timezone.utc).replace(tzinfo=None)
+        with mock.patch('botocore.auth.get_current_datetime', return_value=signed_at):
+            expected = self.storage().url('vehicles/user_1/vehicle_1/photo.jpg', expire=3600)
+        self.assertEqual(self.url_at(31234), expected)
+
+    def test_repeat_urls_are_memoized(self):
+        storage = self.storage()
+        with mock.patch('config.storage.time.time', return_value=30000), \
+                mock.patch.object(S3Storage, 'url', autospec=True, side_effect=S3Storage.url) as sign:
+            first = storage.url('vehicles/user_1/vehicle_1/photo.jpg')
+            self.assertEqual(storage.url('vehicles/user_1/vehicle_1/photo.jpg'), first)
+        self.assertEqual(sign.call_count, 1)
+
+
+class VehicleDeleteTests(TestCase):
+    """delete_with_related removes every row, reports accurate counts and queues each file once"""
+
+    def test_counts_and_tombstones(self):
+        user = User.objects.create_user('driver', password='password')
+        vehicle = Vehicle.objects.create(
+            user=user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=100, purchased_date=date(2020, 1, 1),
+        )
+        for n in range(2):
+            image = VehicleImage.objects.create(vehicle=vehicle, image=f'vehicles/photo_{n}.jpg')
+            for size in ('thumb', 'medium'):
+                VehicleImageRendition.objects.create(
+                    image=image, size=size, file=f'vehicles/photo_{n}_{size}.jpg', width=100, height=75,
+                )
+        for day in range(1, 4):
+            FuelEntry.objects.create(vehicle=vehicle, date=date(2024, 5, day), odometer=100 + day * 300, gallons=10, cost=35)
+
+        counts = vehicle.delete_with_related()
+        self.assertEqual(counts, {
+            'image_renditions': 4, 'images': 2, 'fuel_entries': 3, 'maintenance_entries': 0, 'other_expenses': 0,
+        })
+        self.assertFalse(Vehicle.objects.exists())
+        self.assertFalse(VehicleImage.objects.exists())
+        self.assertFalse(VehicleImageRendition.objects.exists())
+        self.assertFalse(FuelEntry.objects.exists())
+        self.assertEqual(StorageTombstone.objects.count(), 6)
+        self.assertEqual(StorageTombstone.objects.values('name').distinct().count(), 6)
+
+
+class EntryKeyTombstoneTests(TestCase):
+    """Changing a vehicle's or entry's natural key tombstones the old key for incremental exports"""
+
+    def setUp(self):
+        user = User.objects.create_user('driver', password='password')
+        self.vehicle = Vehicle.objects.create(
+            user=user, year=2020, make='Honda', model='Civic', vin_number='1HGBH41JXMN109186',
+            purchased_odometer=100, purchased_date=date(2020, 1, 1),
+        )
+        self.entry = FuelEntry.objects.create(vehicle=self.vehicle, date=date(2024, 5, 1), odometer=400, gallons=10, cost=35)
+
+    def test_key_change_records_old_key(self):
+        self.entry.odometer = 450
+        self.entry.save()
+        record = DeletedRecord.objects.get()
+        self.assertEqual((record.record_type, record.object_id), ('fuel', self.entry.pk))
+        self.assertEqual(record.key, {'date': '2024-05-01', 'odometer': 400})
+
+    def test_vehicle_key_change_records_old_key(self):
+        touched = self.entry.updated_at
+        self.vehicle.vin_number = '2HGBH41JXMN109187'
+        self.vehicle.save()
+        record = DeletedRecord.objects.get()
+        self.assertEqual((record.record_type, record.object_id), ('vehicle', self.vehicle.pk))
+        self.assertEqual(record.vehicle_key['vinNumber'], '1HGBH41JXMN109186')
+        # Entries are sent again under the new vehicle key
+        self.entry.refresh_from_db()
+        self.assertGreater(self.entry.updated_at, touched)
+
+    def test_other_edits_record_nothing(self):
+        self.entry.gallons = 11
+        self.entry.save()
+        # With a VIN, year/make/model are not part of the key
+        self.vehicle.year = 2021
+        self.vehicle.save()
+        self.assertFalse(DeletedRecord.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, USE_S3_MEDIA=False)
+class ExportTests(TestCase):
+    """The JSON and NDJSON data exports"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user('driver', password='password')
+        self.client.force_login(self.user)
+        self.vehicle = Vehicle.objects.create(
+            user=self.user, year=2020, make='Honda', model='Civic', vin_number='1HGBH41JXMN109186',
+            purchased_odometer=100, purchased_date=date(2020, 1, 1),
+        )
+        self.fuel = FuelEntry.objects.create(
+            vehicle=self.vehicle, date=date(2024, 5, 1), odometer=400, gallons=10, cost=35,
+        )
+
+    def add_every_entry_type(self):
+        """A loan-financed and a leased electric vehicle with every kind of entry, plus one with none"""
+        Vehicle.objects.filter(pk=self.vehicle.pk).update(
+            financing_type='loan', loan_start_date=date(2020, 1, 1), loan_amount=15000,
+            loan_interest_rate='4.250', loan_term_months=60, loan_payment_day=5, color='Blue',
+        )
+        FuelEntry.objects.create(vehicle=self.vehicle, date=date(2024, 5, 9), odometer=700, gallons='9.875', cost='33.10')
+        MaintenanceEntry.objects.create(
+            vehicle=self.vehicle, date=date(2024, 6, 1), odometer=800, category='oil', cost=49, notes='Synthetic – 5W-30',
+        )
+        OtherExpense.objects.create(vehicle=self.vehicle, date=date(2024, 6, 2), expense_type='insurance', cost=600)
+
+        electric = Vehicle.objects.create(
+            user=self.user, year=2023, make='Tesla', model='Model 3', fuel_type='electric',
+            purchased_odometer=10, purchased_date=date(2023, 3, 1), financing_type='lease',
+            lease_start_date=date(2023, 3, 1), lease_payment_amount=450, lease_term_months=36, lease_payment_day=1,
+        )
+        FuelEntry.objects.create(
+            vehicle=electric, date=date(2024, 5, 3), odometer=1200, cost=12,
+            kwh_per_mile='0.250', cost_per_kwh='0.150', cost_per_gallon_reference='3.500',
+        )
+        Vehicle.objects.create(user=self.user, year=2010, make='Ford', model='Focus', purchased_odometer=0)
+
+    def reference_export(self):
+        """The document the export view built in memory before it was streamed"""
+        vehicles = []
+        for vehicle in Vehicle.objects.filter(user=self.user):
+            is_electric = vehicle.fuel_type == 'electric'
+            vehicle_data = serialize_vehicle(vehicle)
+            vehicle_data['fuelEntries'] = [serialize_fuel_entry(entry, is_electric) for entry in vehicle.fuel_entries.all()]
+            vehicle_data['maintenanceEntries'] = [serialize_maintenance_entry(entry) for entry in vehicle.maintenance_entries.all()]
+            vehicle_data['otherExpenses'] = [serialize_other_expense(expense) for expense in vehicle.other_expenses.all()]
+            vehicle_data.update(serialize_financing(vehicle))
+            vehicles.append(vehicle_data)
+        return json.dumps({'exportDate': date.today().strftime('%Y-%m-%d'), 'vehicles': vehicles}, indent=2)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_all_data'), params)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def test_ndjson_delta_tombstones_read_back(self):
+        since = serialize_cursor(django_timezone.now() - timedelta(minutes=1))
+        self.client.post(reverse('fuel_entry_delete', args=[self.fuel.pk]))
+
+        _, body = self.export(since=since, format='ndjson')
+        lines = gzip.decompress(body).decode().splitlines()
+        tombstone = json.loads(lines[-1])
+        self.assertEqual((tombstone['type'], tombstone['recordType']), ('deleted', 'fuel'))
+        self.assertEqual(tombstone['key'], {'date': '2024-05-01', 'odometer': 400})
+
+        errors = ImportErrorCollector()
+        list(iter_ndjson_vehicles(lines, errors))
+        self.assertFalse(errors)
+
+    def test_json_matches_in_memory_document(self):
+        self.add_every_entry_type()
+        with override_settings(EXPORT_CHUNK_SIZE=1):
+            _, body = self.export()
+        self.assertEqual(body.decode(), self.reference_export())
+
+        # Served from the cached archive the second time
+        _, cached = self.export()
+        self.assertEqual(cached, body)
+
+    def test_empty_export_matches_in_memory_document(self):
+        Vehicle.objects.all().delete()
+        _, body = self.export()
+        self.assertEqual(body.decode(), self.reference_export())
+
+    def test_etag_answers_not_modified(self):
+        response, _ = self.export()
+        etag = response['ETag']
+        not_modified = self.client.get(reverse('export_all_data'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+        ndjson, _ = self.export(format='ndjson')
+        self.assertNotEqual(ndjson['ETag'], etag)
+
+    def test_edit_invalidates_cached_export(self):
+        response, body = self.export()
+        self.fuel.cost = 41
+        self.fuel.save()
+
+        changed = self.client.get(reverse('export_all_data'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+        fresh = b''.join(changed.streaming_content)
+        changed.close()
+        self.assertEqual(json.loads(fresh)['vehicles'][0]['fuelEntries'][0]['cost'], '41.00')
+        self.assertEqual(fresh.decode(), self.reference_export())
+
+
+class QueryBudgetTests(TestCase):
+    """RequestLoggingMiddleware warns about requests over the query budget or repeating a query"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('driver', password='password')
+        self.client.force_login(self.user)
+        for n in range(4):
+            vehicle = Vehicle.objects.create(
+                user=self.user, year=2020, make='Honda', model=f'Civic {n}',
+                purchased_odometer=100, purchased_date=date(2020, 1, 1),
+            )
+            FuelEntry.objects.create(vehicle=vehicle, date=date(2024, 5, 1), odometer=400, gallons=10, cost=35)
+
+    def warnings(self, logs):
+        return [
+            json.loads(record.getMessage()) for record in logs.records
+            if record.levelname == 'WARNING' and 'Excessive database queries' in record.getMessage()
+        ]
+
+    @override_settings(QUERY_BUDGET_PER_REQUEST=1)
+    def test_over_budget_is_logged(self):
+        with self.assertLogs('page', 'WARNING') as logs:
+            self.client.get(reverse('vehicle_list'))
+        [warning] = self.warnings(logs)
+        self.assertGreater(warning['db_query_count'], 1)
+        self.assertEqual(warning['db_query_budget'], 1)
+
+    @override_settings(QUERY_BUDGET_PER_REQUEST=1000, QUERY_REPEAT_THRESHOLD=3)
+    def test_repeated_query_in_streamed_export_is_logged(self):
+        with self.assertLogs('page', 'WARNING') as logs:
+            response = self.client.get(reverse('export_all_data'))
+            # Checked once the body has streamed, since that is when the export queries run
+            self.assertEqual(self.warnings(logs), [])
+            b''.join(response.streaming_content)
+            response.close()
+        [warning] = self.warnings(logs)
+        # One fuel, maintenance and expense query per vehicle
+        self.assertEqual([query['count'] for query in warning['repeated_queries']], [4, 4, 4])
+        self.assertTrue(any('autolog_fuelentry' in query['sql'] for query in warning['repeated_queries']))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, USE_S3_MEDIA=False)
+class ExportJobTests(TestCase):
+    """Background export archives are unguessable and never overwrite a stale failure"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user('driver', password='password')
+        Vehicle.objects.create(
+            user=self.user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=100, purchased_date=date(2020, 1, 1),
+        )
+
+    def claim(self):
+        ExportJob.objects.create(user=self.user, kind='json')
+        return claim_export_job()
+
+    def test_archive_path_is_random(self):
+        first, second = run_export_job(self.claim()), run_export_job(self.claim())
+        self.assertEqual((first.status, second.status), ('done', 'done'))
+        self.assertTrue(first.file.name.startswith(f'exports/user_{self.user.pk}/jobs/'))
+        self.assertNotEqual(posixpath.dirname(first.file.name), posixpath.dirname(second.file.name))
+        self.assertEqual(posixpath.basename(first.file.name), posixpath.basename(second.file.name))
+
+    def test_stale_failure_is_kept(self):
+        job = self.claim()
+        ExportJob.objects.filter(pk=job.pk).update(started_at=django_timezone.now() - timedelta(days=1))
+        self.assertEqual(fail_stale_export_jobs(), 1)
+
+        job = run_export_job(job)
+        self.assertEqual(job.status, 'failed')
+        self.assertFalse(job.file)
@@ -0,0 +1,126 @@
+import logging
+import posixpath
+from datetime import timedelta
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+from .models import StorageTombstone, VehicleImage, VehicleImageRendition, tombstone_files
+
+logger = logging.getLogger(__name__)
+
+# Vehicle images and their renditions all live under vehicles/user_{user_id}/
+VEHICLE_MEDIA_PREFIX = 'vehicles'
+
+# S3 DeleteObjects takes at most 1000 keys per request
+S3_DELETE_MAX_KEYS = 1000
+
+
+def delete_stored_files(names, storage=default_storage):
+    """
+    Delete files from storage and return the names that could not be deleted. On S3
+    each batch of up to 1000 files is one DeleteObjects request; other backends
+    delete file by file.
+    """
+    failed = set()
+    if isinstance(storage, S3Storage):
+        for start in range(0, len(names), S3_DELETE_MAX_KEYS):
+            batch = names[start:start + S3_DELETE_MAX_KEYS]
+            keys = {storage._normalize_name(clean_name(name)): name for name in batch}
+            try:
+                response = storage.bucket.delete_objects(
+                    Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+                )
+            except (BotoCoreError, ClientError):
+                logger.exception("Deleting %s file(s) from S3 failed", len(batch))
+                failed.update(batch)
+                continue
+            for error in response.get('Errors', []):
+                logger.warning("Could not delete %s from S3: %s", error['Key'], error.get('Message'))
+                failed.add(keys.get(error['Key'], error['Key']))
+    else:
+        for name in names:
+            try:
+                storage.delete(name)
+            except OSError:
+                logger.exception("Could not delete %s", name)
+                failed.add(name)
+    return failed
+
+
+def referenced_names(names):
+    """The subset of `names` that an image or rendition row still uses"""
+    return (
+        set(VehicleImage.objects.filter(image__in=names).values_list('image', flat=True))
+        | set(VehicleImageRendition.objects.filter(file__in=names).values_list('file', flat=True))
+    )
+
+
+def sweep_storage_tombstones(dry_run=False):
+    """
+    Delete the files of tombstones older than STORAGE_TOMBSTONE_GRACE_MINUTES, in
+    batches of STORAGE_SWEEP_BATCH_SIZE. Files that a row references again (a shared
+    duplicate, or a direct upload that completed) are kept. Tombstones whose file
+    could not be deleted stay queued for the next sweep.
+    Returns (deleted, still referenced, failed) counts.
+    """
+    cutoff = timezone.now() - timedelta(minutes=settings.STORAGE_TOMBSTONE_GRACE_MINUTES)
+    deleted = referenced = failed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            StorageTombstone.objects.filter(created_at__lt=cutoff, pk__gt=last_pk)
+            .order_by('pk')[:settings.STORAGE_SWEEP_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+
+        names = {tombstone.name for tombstone in batch}
+        in_use = referenced_names(names)
+        orphaned = sorted(names - in_use)
+        failures = set() if dry_run else delete_stored_files(orphaned)
+        if not dry_run:
+            StorageTombstone.objects.filter(
+                pk__in=[tombstone.pk for tombstone in batch if tombstone.name not in failures]
+            ).delete()
+
+        deleted += len(orphaned) - len(failures)
+        referenced += len(in_use)
+        failed += len(failures)
+    return deleted, referenced, failed
+
+
+def iter_stored_files(prefix, storage=default_storage):
+    """Names of all files under a storage prefix, recursively"""
+    try:
+        directories, files = storage.listdir(prefix)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield posixpath.join(prefix, name)
+    for directory in directories:
+        yield from iter_stored_files(posixpath.join(prefix, directory), storage)
+
+
+def reconcile_storage(user_id=None, dry_run=False):
+    """
+    Tombstone vehicle media that no image or rendition row references, e.g. files
+    left behind by vehicles deleted before tombstones existed. Lists one user's prefix,
+    or every user's. The files go through the normal grace period, which also spares
+    uploads still in flight. Returns the orphaned names.
+    """
+    prefix = f'{VEHICLE_MEDIA_PREFIX}/user_{user_id}' if user_id else VEHICLE_MEDIA_PREFIX
+    known = (
+        set(VehicleImage.objects.filter(image__startswith=f'{prefix}/').values_list('image', flat=True))
+        | set(VehicleImageRendition.objects.filter(file__startswith=f'{prefix}/').values_list('file', flat=True))
+        | set(StorageTombstone.objects.filter(name__startswith=f'{prefix}/').values_list('name', flat=True))
+    )
+    orphans = [name for name in iter_stored_files(prefix) if name not in known]
+    if not dry_run:
+        tombstone_files(orphans)
+    return orphans
@@ -0,0 +1,183 @@
+import hashlib
+import tempfile
+import uuid
+from io import BytesIO
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.utils.text import get_valid_filename
+from PIL import Image
+
+from .images import check_image_pixels
+from .models import VehicleImage, vehicle_image_upload_path
+
+DIRECT_UPLOAD_SALT = 'autolog.direct-upload'
+
+# Enough of the file to identify the format and read the dimensions, even behind a
+# large EXIF block
+HEADER_BYTES = 256 * 1024
+
+
+def direct_uploads_enabled():
+    """Browser-to-bucket uploads need S3 (or an S3-compatible endpoint) for media"""
+    return settings.USE_S3_MEDIA
+
+
+def _client():
+    return default_storage.connection.meta.client
+
+
+def presign_image_upload(vehicle, filename, content_type):
+    """
+    Presigned POST letting the browser upload one image straight to the bucket.
+    Returns {'url', 'fields', 'token'}; the token is handed back on completion and
+    proves which storage name this server issued for which vehicle.
+    """
+    # A random prefix keeps concurrent uploads of the same filename apart
+    name = vehicle_image_upload_path(
+        VehicleImage(vehicle=vehicle), f'{uuid.uuid4().hex[:8]}_{get_valid_filename(filename)}'
+    )
+    fields = {'Content-Type': content_type}
+    cache_control = default_storage.object_parameters.get('CacheControl')
+    if cache_control:
+        fields['Cache-Control'] = cache_control
+
+    post = _client().generate_presigned_post(
+        Bucket=default_storage.bucket_name,
+        # Storage names are relative to AWS_LOCATION; the bucket key includes it
+        Key=default_storage._normalize_name(name),
+        Fields=fields,
+        Conditions=[{key: value} for key, value in fields.items()] + [
+            ['content-length-range', 1, settings.MAX_IMAGE_UPLOAD_BYTES],
+        ],
+        ExpiresIn=settings.IMAGE_DIRECT_UPLOAD_EXPIRE,
+    )
+    token = signing.dumps({'vehicle': vehicle.pk, 'name': name}, salt=DIRECT_UPLOAD_SALT)
+    return {'url': post['url'], 'fields': post['fields'], 'token': token}
+
+
+def verify_direct_upload(vehicle, token):
+    """
+    Check one completed browser upload and return its storage name. Only the start of
+    the object is fetched to confirm it is an image within MAX_IMAGE_PIXELS; anything
+    else is deleted from the bucket. Raises ValueError if the upload is not acceptable.
+    """
+    try:
+        data = signing.loads(token, salt=DIRECT_UPLOAD_SALT, max_age=settings.IMAGE_DIRECT_UPLOAD_EXPIRE * 2)
+    except signing.BadSignature:
+        raise ValueError('Upload link is invalid or has expired.')
+    if data['vehicle'] != vehicle.pk:
+        raise ValueError('Upload belongs to a different vehicle.')
+
+    name = data['name']
+    try:
+        response = _client().get_object(
+            Bucket=default_storage.bucket_name,
+            Key=default_storage._normalize_name(name),
+            Range=f'bytes=0-{HEADER_BYTES - 1}',
+        )
+        header = response['Body'].read()
+    except (ClientError, BotoCoreError):
+        raise ValueError('Uploaded file was not found.')
+
+    try:
+        check_image_pixels(Image.open(BytesIO(header)))
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        default_storage.delete(name)
+        raise ValueError('Not a supported image, or too large.')
+    return name
+
+
+class HashedImageUpload(UploadedFile):
+    """An uploaded image with its SHA-256 and the dimensions read from its header"""
+
+    def __init__(self, file, name, content_type, size, sha256, width, height, image_format):
+        super().__init__(file, name, content_type, size)
+        self.sha256 = sha256
+        self.width = width
+        self.height = height
+        self.image_format = image_format
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Upload handler for the vehicle image form. Each file is hashed while it streams in
+    and spooled to a temporary file once it outgrows FILE_UPLOAD_MAX_MEMORY_SIZE, so a
+    batch of large photos never sits in memory. The header is identified as soon as
+    enough of it has arrived; non-images, images over MAX_IMAGE_PIXELS and files over
+    MAX_IMAGE_UPLOAD_BYTES are skipped without buffering the rest of the file, and
+    their names collected in `rejected`.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.rejected = []
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, dir=settings.FILE_UPLOAD_TEMP_DIR
+        )
+        self.sha256 = hashlib.sha256()
+        self.header = bytearray()
+        self.image = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.MAX_IMAGE_UPLOAD_BYTES:
+            self.reject()
+        if self.image is None and len(self.header) < HEADER_BYTES:
+            self.header += raw_data[:HEADER_BYTES - len(self.header)]
+            self.identify(final=len(self.header) >= HEADER_BYTES)
+
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.image is None:
+            # Smaller than HEADER_BYTES: the whole file is the header. The parser only
+            # honours SkipFile while data is streaming, so drop the file here instead.
+            try:
+                self.identify(final=True)
+            except SkipFile:
+                return None
+        self.file.seek(0)
+        return HashedImageUpload(
+            self.file, self.file_name, self.content_type, file_size, self.sha256.hexdigest(),
+            self.image.width, self.image.height, self.image.format,
+        )
+
+    def identify(self, final):
+        """
+        Read the image header received so far. A header that cannot be parsed yet may
+        just be incomplete, so the file is only rejected once `final` is set.
+        """
+        try:
+            image = Image.open(BytesIO(self.header))
+            check_image_pixels(image)
+        except (Image.DecompressionBombError, ValueError):
+            self.reject()
+        except (Image.UnidentifiedImageError, OSError):
+            if final:
+                self.reject()
+        else:
+            self.image = image
+
+    def reject(self):
+        self.rejected.append(self.file_name)
+        # Free the spooled data now rather than when the handler is collected. The
+        # attribute is removed, not set to None, since the parser closes any `file` it finds.
+        self.file.close()
+        del self.file
+        raise SkipFile()
+
+
+def rejected_image_uploads(request):
+    """Names of files ImageUploadHandler refused while parsing this request"""
+    return [
+        name for handler in request.upload_handlers
+        if isinstance(handler, ImageUploadHandler) for name in handler.rejected
+    ]
@@ -4,8 +4,8 @@ from .views import (
     fuel_entry_list, fuel_entry_create, fuel_entry_detail, fuel_entry_edit, fuel_entry_delete,
     maintenance_entry_list, maintenance_entry_create, maintenance_entry_edit, maintenance_entry_delete,
     other_expense_list, other_expense_create, other_expense_edit, other_expense_delete,
-    vehicle_images, vehicle_image_delete, vehicle_image_set_primary, vehicle_image_update_caption,
-    export_all_data, export_images
+    vehicle_images, vehicle_image_presign, vehicle_image_upload_complete, vehicle_image_delete, vehicle_image_set_primary, vehicle_image_update_caption,
+    export_all_data, export_images, export_jobs, export_job_download
 )
 
 urlpatterns = [
@@ -20,6 +20,8 @@ urlpatterns = [
     path("vehicles/<int:pk>/delete/", vehicle_delete, name="vehicle_delete"),
     path("export/", export_all_data, name="export_all_data"),
     path("export/images/", export_images, name="export_images"),
+    path("export/jobs/", export_jobs, name="export_jobs"),
+    path("export/jobs/download/<str:token>/", export_job_download, name="export_job_download"),
 
     # Fuel entry URLs
     path("vehicles/<int:vehicle_pk>/fuel/", fuel_entry_list, name="fuel_entry_list"),
@@ -42,6 +44,8 @@ urlpatterns = [
 
     # Vehicle image URLs
     path("vehicles/<int:vehicle_pk>/images/", vehicle_images, name="vehicle_images"),
+    path("vehicles/<int:vehicle_pk>/images/presign/", vehicle_image_presign, name="vehicle_image_presign"),
+    path("vehicles/<int:vehicle_pk>/images/complete/", vehicle_image_upload_complete, name="vehicle_image_upload_complete"),
     path("images/<int:pk>/delete/", vehicle_image_delete, name="vehicle_image_delete"),
     path("images/<int:pk>/set-primary/", vehicle_image_set_primary, name="vehicle_image_set_primary"),
     path("images/<int:pk>/update-caption/", vehicle_image_update_caption, name="vehicle_image_update_caption"),
@@ -3,7 +3,13 @@ from django.conf import settings
 from django.contrib import messages
 from config.logging_utils import log_event
 from django.contrib.auth.decorators import login_required
-from .models import Vehicle, FuelEntry, MaintenanceEntry, OtherExpense, VehicleImage
+from django.db import transaction
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.utils import timezone
+from .models import Vehicle, FuelEntry, MaintenanceEntry, OtherExpense, VehicleImage, tombstone_files
+from .exports import record_deletion
+from .images import store_uploaded_images
+from .uploads import ImageUploadHandler, direct_uploads_enabled, rejected_image_uploads
 from .forms import VehicleForm, GasolineFuelForm, ElectricFuelForm, MaintenanceEntryForm, OtherExpenseForm, MultipleImageUploadForm
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
@@ -1044,15 +1050,24 @@ def vehicle_delete(request, pk):
     vehicle = get_object_or_404(Vehicle, pk=pk, user=request.user)
 
     if request.method == 'POST':
+        vehicle_id = vehicle.id
+        with transaction.atomic():
+            record_deletion(vehicle)
+            counts = vehicle.delete_with_related()
         log_event(
             request=request,
             event="Vehicle deleted",
             level="INFO",
-            vehicle_id=vehicle.id,
-            vehicle=str(vehicle)
+            vehicle_id=vehicle_id,
+            vehicle=str(vehicle),
+            **counts
+        )
+        messages.success(
+            request,
+            f'Vehicle "{vehicle}" has been deleted successfully, along with {counts["fuel_entries"]} fuel entries, '
+            f'{counts["maintenance_entries"]} maintenance entries, {counts["other_expenses"]} expenses '
+            f'and {counts["images"]} images.'
         )
-        vehicle.delete()
-        messages.success(request, f'Vehicle "{vehicle}" has been deleted successfully.')
         return redirect('vehicle_list')
 
     log_event(
@@ -1279,7 +1294,9 @@ def fuel_entry_delete(request, pk):
             vehicle_id=vehicle.id,
             fuel_entry_id=fuel_entry.id
         )
-        fuel_entry.delete()
+        with transaction.atomic():
+            record_deletion(fuel_entry)
+            fuel_entry.delete()
         return redirect('vehicle_detail', pk=vehicle.pk)
 
     log_event(
@@ -1445,7 +1462,9 @@ def maintenance_entry_delete(request, pk):
             entry_id=entry.id,
             category=entry.category
         )
-        entry.delete()
+        with transaction.atomic():
+            record_deletion(entry)
+            entry.delete()
         return redirect('maintenance_entry_list', vehicle_pk=vehicle.pk)
 
     log_event(
@@ -1611,7 +1630,9 @@ def other_expense_delete(request, pk):
             expense_id=expense.id,
             expense_type=expense.expense_type
         )
-        expense.delete()
+        with transaction.atomic():
+            record_deletion(expense)
+            expense.delete()
         return redirect('other_expense_list', vehicle_pk=vehicle.pk)
 
     log_event(
@@ -1628,42 +1649,56 @@ def other_expense_delete(request, pk):
 
 # Vehicle Image Views
 @login_required
+@csrf_exempt
 def vehicle_images(request, vehicle_pk):
     """View and manage images for a vehicle"""
+    # Uploads are hashed, spooled to disk and checked while they stream in. The handler
+    # must be in place before anything reads request.POST, which the CSRF check would,
+    # so CSRF is checked by _vehicle_images instead.
+    request.upload_handlers = [ImageUploadHandler(request)]
+    return _vehicle_images(request, vehicle_pk)
+
+
+@csrf_protect
+def _vehicle_images(request, vehicle_pk):
     vehicle = get_object_or_404(Vehicle, pk=vehicle_pk, user=request.user)
-    images = vehicle.images.all()
+    images = vehicle.images.prefetch_related('renditions')
     
     # Handle image upload
     if request.method == 'POST':
         try:
             files = request.FILES.getlist('images')
+            # Files the upload handler refused from their headers; decoding and resizing
+            # happen later in the image worker
+            invalid = rejected_image_uploads(request)
 
-            if not files:
+            if not files and not invalid:
                 messages.error(request, 'Please select at least one image to upload.')
             else:
                 # Check total image count
                 current_count = images.count()
                 max_images = settings.MAX_VEHICLE_IMAGES
 
-                if current_count + len(files) > max_images:
-                    messages.error(request, f'Cannot upload {len(files)} images. Maximum {max_images} images per vehicle. You currently have {current_count} images.')
+                if current_count + len(files) + len(invalid) > max_images:
+                    messages.error(request, f'Cannot upload {len(files) + len(invalid)} images. Maximum {max_images} images per vehicle. You currently have {current_count} images.')
+                elif invalid:
+                    messages.error(request, f'Not a supported image, larger than {settings.MAX_IMAGE_UPLOAD_BYTES // (1024 * 1024)} MB or larger than {settings.MAX_IMAGE_PIXELS // 1_000_000} megapixels: {", ".join(invalid)}')
                 else:
-                    uploaded_count = 0
-                    for f in files:
-                        VehicleImage.objects.create(
-                            vehicle=vehicle,
-                            image=f
-                        )
-                        uploaded_count += 1
+                    created, duplicates = store_uploaded_images(vehicle, files)
+                    uploaded_count = len(created)
 
-                    messages.success(request, f'Successfully uploaded {uploaded_count} image(s).')
+                    if uploaded_count:
+                        messages.success(request, f'Successfully uploaded {uploaded_count} image(s). They will be resized in the background.')
+                    if duplicates:
+                        messages.info(request, f'Already uploaded for this vehicle, skipped: {", ".join(duplicates)}')
 
                     log_event(
                         request=request,
                         event="Vehicle images uploaded",
                         level="INFO",
                         vehicle_id=vehicle.id,
-                        count=uploaded_count
+                        count=uploaded_count,
+                        duplicates=len(duplicates)
                     )
 
                     return redirect('vehicle_images', vehicle_pk=vehicle.pk)
@@ -1694,6 +1729,7 @@ def vehicle_images(request, vehicle_pk):
 
     return render(request, "autolog/vehicle_images.html", {
         'vehicle': vehicle,
+        'direct_upload': direct_uploads_enabled(),
         'images': images,
         'form': form,
         'max_images': max_images,
@@ -1702,6 +1738,112 @@ def vehicle_images(request, vehicle_pk):
     })
 
 
+@login_required
+def vehicle_image_presign(request, vehicle_pk):
+    """
+    Start a direct upload: validate the selected files and return a presigned POST
+    for each, so the browser sends the images straight to the bucket.
+    Expects JSON {"files": [{"name", "type", "size"}, ...]}.
+    """
+    import json
+    from django.http import JsonResponse
+    from .uploads import direct_uploads_enabled, presign_image_upload
+
+    vehicle = get_object_or_404(Vehicle, pk=vehicle_pk, user=request.user)
+    if request.method != 'POST' or not direct_uploads_enabled():
+        return JsonResponse({'error': 'Direct uploads are not available.'}, status=404)
+
+    try:
+        files = json.loads(request.body)['files']
+        specs = [(str(f['name']), str(f['type']), int(f['size'])) for f in files]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Invalid request.'}, status=400)
+
+    current_count = vehicle.images.count()
+    max_images = settings.MAX_VEHICLE_IMAGES
+    max_mb = settings.MAX_IMAGE_UPLOAD_BYTES // (1024 * 1024)
+    if not specs:
+        return JsonResponse({'error': 'Please select at least one image to upload.'}, status=400)
+    if current_count + len(specs) > max_images:
+        return JsonResponse({'error': f'Cannot upload {len(specs)} images. Maximum {max_images} images per vehicle. You currently have {current_count} images.'}, status=400)
+    invalid = [name for name, content_type, size in specs if not content_type.startswith('image/') or not 0 < size <= settings.MAX_IMAGE_UPLOAD_BYTES]
+    if invalid:
+        return JsonResponse({'error': f'Not an image, or larger than {max_mb} MB: {", ".join(invalid)}'}, status=400)
+
+    uploads = [presign_image_upload(vehicle, name, content_type) for name, content_type, _ in specs]
+
+    log_event(
+        request=request,
+        event="Vehicle image direct upload started",
+        level="DEBUG",
+        vehicle_id=vehicle.id,
+        count=len(uploads)
+    )
+
+    return JsonResponse({'uploads': uploads})
+
+
+@login_required
+def vehicle_image_upload_complete(request, vehicle_pk):
+    """
+    Finish a direct upload: check each uploaded object and create its VehicleImage row,
+    queued for the image worker. Expects JSON {"tokens": [...]} from the presign step.
+    """
+    import json
+    from django.http import JsonResponse
+    from .uploads import direct_uploads_enabled, verify_direct_upload
+
+    vehicle = get_object_or_404(Vehicle, pk=vehicle_pk, user=request.user)
+    if request.method != 'POST' or not direct_uploads_enabled():
+        return JsonResponse({'error': 'Direct uploads are not available.'}, status=404)
+
+    try:
+        tokens = [str(token) for token in json.loads(request.body)['tokens']]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Invalid request.'}, status=400)
+
+    names, errors = [], []
+    for token in tokens:
+        try:
+            names.append(verify_direct_upload(vehicle, token))
+        except ValueError as e:
+            errors.append(str(e))
+
+    with transaction.atomic():
+        # Lock the vehicle so parallel completions count each other's images
+        Vehicle.objects.select_for_update().filter(pk=vehicle.pk).first()
+        # A retried completion must not create the same image twice
+        existing = set(vehicle.images.filter(image__in=names).values_list('image', flat=True))
+        new_names = [name for name in dict.fromkeys(names) if name not in existing]
+
+        max_images = settings.MAX_VEHICLE_IMAGES
+        available = max(0, max_images - vehicle.images.count())
+        if len(new_names) > available:
+            # Already in the bucket; the storage sweep removes them
+            tombstone_files(new_names[available:])
+            errors.append(f'{len(new_names) - available} image(s) were not added. Maximum {max_images} images per vehicle.')
+            new_names = new_names[:available]
+
+        created = VehicleImage.objects.bulk_create([VehicleImage(vehicle=vehicle, image=name) for name in new_names])
+
+    if created:
+        messages.success(request, f'Successfully uploaded {len(created)} image(s). They will be resized in the background.')
+    for error in errors:
+        messages.error(request, f'Error uploading images: {error}')
+
+    log_event(
+        request=request,
+        event="Vehicle images uploaded",
+        level="INFO" if not errors else "WARNING",
+        vehicle_id=vehicle.id,
+        count=len(created),
+        failed=len(errors),
+        direct=True
+    )
+
+    return JsonResponse({'created': len(created), 'errors': errors})
+
+
 @login_required
 def vehicle_image_delete(request, pk):
     """Delete a vehicle image"""
@@ -1734,12 +1876,13 @@ def vehicle_image_set_primary(request, pk):
     image = get_object_or_404(VehicleImage, pk=pk, vehicle__user=request.user)
     vehicle = image.vehicle
     
-    # Unset all other primary images for this vehicle
-    vehicle.images.update(is_primary=False)
+    # Unset all other primary images for this vehicle (update() skips auto_now, so
+    # stamp updated_at to keep the image export fingerprint accurate)
+    vehicle.images.update(is_primary=False, updated_at=timezone.now())
     
     # Set this image as primary
     image.is_primary = True
-    image.save()
+    image.save(update_fields=['is_primary', 'updated_at'])
     
     messages.success(request, 'Primary image updated.')
     
@@ -1763,7 +1906,7 @@ def vehicle_image_update_caption(request, pk):
     if request.method == 'POST':
         caption = request.POST.get('caption', '').strip()
         image.caption = caption
-        image.save()
+        image.save(update_fields=['caption', 'updated_at'])
         
         messages.success(request, 'Caption updated.')
         
@@ -1782,133 +1925,123 @@ def vehicle_image_update_caption(request, pk):
 
 @login_required
 def export_all_data(request):
-    """Export all vehicles and related data to JSON"""
-    import json
-    from django.http import JsonResponse, HttpResponse
-    from decimal import Decimal
-
-    vehicles = Vehicle.objects.filter(user=request.user).prefetch_related(
-        'fuel_entries',
-        'maintenance_entries',
-        'other_expenses'
+    """
+    Export all vehicles and related data to JSON, streamed one vehicle at a time.
+
+    With ?since=<cursor> only vehicles and entries changed after the cursor are
+    exported, plus tombstones for deletions, and the response carries a new cursor
+    to pass next time. With ?format=ndjson the export is gzip-compressed NDJSON, one
+    record per line.
+
+    Full exports carry an ETag fingerprinting the user's data, answer a matching
+    If-None-Match with 304, and are served from the last generated archive while the
+    data is unchanged. The archive is cached without its header, which is rebuilt on
+    every download so exportDate is always today.
+    """
+    from itertools import chain
+    from django.http import StreamingHttpResponse, HttpResponseBadRequest, HttpResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from django.utils.dateparse import parse_datetime
+    from django.utils.http import quote_etag
+    from .exports import (
+        iter_export_json, iter_export_ndjson, iter_gzip, iter_cached_export, changed_vehicle_ids,
+        serialize_cursor, serialize_deleted_record, export_fingerprint, cached_export_path,
+        open_cached_export, export_header, iter_file,
     )
+    from .models import DeletedRecord
 
-    def serialize_date(d):
-        """Convert date to string format"""
-        return d.strftime('%Y-%m-%d') if d else None
-
-    def serialize_decimal(d):
-        """Convert Decimal to string"""
-        return str(d) if d else None
-
-    export_data = {
-        'exportDate': serialize_date(date.today()),
-        'vehicles': []
-    }
-
-    for vehicle in vehicles:
-        vehicle_data = {
-            'year': vehicle.year,
-            'make': vehicle.make,
-            'model': vehicle.model,
-            'color': vehicle.color or None,
-            'vinNumber': vehicle.vin_number or None,
-            'licensePlateNumber': vehicle.license_plate_number or None,
-            'registrationNumber': vehicle.registration_number or None,
-            'state': vehicle.state or None,
-            'purchasedDate': serialize_date(vehicle.purchased_date),
-            'purchasedPrice': serialize_decimal(vehicle.purchased_price),
-            'purchasedOdometer': vehicle.purchased_odometer,
-            'dealerName': vehicle.dealer_name or None,
-            'soldDate': serialize_date(vehicle.sold_date),
-            'soldPrice': serialize_decimal(vehicle.sold_price),
-            'soldOdometer': vehicle.sold_odometer,
-            'currentValue': serialize_decimal(vehicle.current_value),
-            'currentValueDate': serialize_date(vehicle.current_value_date),
-            'fuelType': vehicle.fuel_type,
-            'financingType': vehicle.financing_type,
-            'downPayment': serialize_decimal(vehicle.down_payment),
-            'fuelEntries': [],
-            'maintenanceEntries': [],
-            'otherExpenses': []
-        }
-
-        # Add loan information if applicable
-        if vehicle.financing_type == 'loan' and vehicle.loan_start_date:
-            vehicle_data['loanInfo'] = {
-                'loanStartDate': serialize_date(vehicle.loan_start_date),
-                'loanAmount': serialize_decimal(vehicle.loan_amount),
-                'loanInterestRate': serialize_decimal(vehicle.loan_interest_rate),
-                'loanTermMonths': vehicle.loan_term_months,
-                'loanPaymentDay': vehicle.loan_payment_day,
-                'loanAutoPayment': vehicle.loan_auto_payment
-            }
-
-        # Add lease information if applicable
-        if vehicle.financing_type == 'lease' and vehicle.lease_start_date:
-            vehicle_data['leaseInfo'] = {
-                'leaseStartDate': serialize_date(vehicle.lease_start_date),
-                'leasePaymentAmount': serialize_decimal(vehicle.lease_payment_amount),
-                'leaseTermMonths': vehicle.lease_term_months,
-                'leasePaymentDay': vehicle.lease_payment_day,
-                'leaseAutoPayment': vehicle.lease_auto_payment
-            }
-
-        # Export fuel entries
-        for fuel_entry in vehicle.fuel_entries.all():
-            if vehicle.fuel_type == 'electric':
-                fuel_data = {
-                    'date': serialize_date(fuel_entry.date),
-                    'odometer': fuel_entry.odometer,
-                    'kwhPerMile': serialize_decimal(fuel_entry.kwh_per_mile),
-                    'costPerKwh': serialize_decimal(fuel_entry.cost_per_kwh),
-                    'costPerGallonReference': serialize_decimal(fuel_entry.cost_per_gallon_reference)
-                }
-            else:
-                fuel_data = {
-                    'date': serialize_date(fuel_entry.date),
-                    'odometer': fuel_entry.odometer,
-                    'gallons': serialize_decimal(fuel_entry.gallons),
-                    'cost': serialize_decimal(fuel_entry.cost)
-                }
-            vehicle_data['fuelEntries'].append(fuel_data)
-
-        # Export maintenance entries
-        for maint_entry in vehicle.maintenance_entries.all():
-            maint_data = {
-                'date': serialize_date(maint_entry.date),
-                'odometer': maint_entry.odometer,
-                'category': maint_entry.category,
-                'cost': serialize_decimal(maint_entry.cost),
-                'notes': maint_entry.notes or None
-            }
-            vehicle_data['maintenanceEntries'].append(maint_data)
-
-        # Export other expenses
-        for expense in vehicle.other_expenses.all():
-            expense_data = {
-                'date': serialize_date(expense.date),
-                'expenseType': expense.expense_type,
-                'cost': serialize_decimal(expense.cost),
-                'notes': expense.notes or None
-            }
-            vehicle_data['otherExpenses'].append(expense_data)
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    vehicles = Vehicle.objects.filter(user=request.user)
+    since_param = request.GET.get('since')
+    export_format = request.GET.get('format', 'json')
+
+    if export_format not in ('json', 'ndjson'):
+        return HttpResponseBadRequest('Unknown export format. Use json or ndjson.')
+    serialize = iter_export_ndjson if export_format == 'ndjson' else iter_export_json
+    extension = 'ndjson.gz' if export_format == 'ndjson' else 'json'
+    etag = cache_path = cached = None
+
+    if since_param is None:
+        etag = quote_etag(export_fingerprint(request.user, export_format))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            log_event(
+                request=request,
+                event="Data export not modified",
+                level="DEBUG",
+                format=export_format
+            )
+            return not_modified
+
+        vehicle_count = vehicles.count()
+        cache_path = cached_export_path(request.user, export_format, etag.strip('"'), extension)
+        cached = open_cached_export(cache_path)
+        if cached is None:
+            content = serialize(vehicles.iterator(chunk_size=chunk_size), chunk_size, header=False)
+        filename = f'jautolog_export_{date.today().strftime("%Y%m%d")}.{extension}'
+    else:
+        # A "+" in an unencoded offset arrives as a space
+        try:
+            since = parse_datetime(since_param.replace(' ', '+'))
+        except ValueError:
+            since = None
+        if since is None or timezone.is_naive(since):
+            return HttpResponseBadRequest('Invalid cursor. Use the cursor from a previous export.')
+
+        now = timezone.now()
+        retention_cutoff = now - timedelta(days=settings.EXPORT_TOMBSTONE_RETENTION_DAYS)
+        if since < retention_cutoff:
+            return HttpResponse('Cursor has expired. Run a full export to resync.', status=410)
+        DeletedRecord.objects.filter(user=request.user, deleted_at__lt=retention_cutoff).delete()
+
+        # Re-read a short window before the cursor so rows committed late are not missed;
+        # repeated rows are harmless because upsert imports are idempotent
+        window = since - timedelta(seconds=settings.EXPORT_CURSOR_OVERLAP_SECONDS)
+        vehicles = vehicles.filter(id__in=changed_vehicle_ids(request.user, window))
+        vehicle_count = vehicles.count()
+        deleted = DeletedRecord.objects.filter(user=request.user, deleted_at__gt=window)
+
+        content = serialize(
+            vehicles.iterator(chunk_size=chunk_size),
+            chunk_size,
+            since=window,
+            meta={'since': serialize_cursor(since), 'cursor': serialize_cursor(now)},
+            deleted=(serialize_deleted_record(record) for record in deleted.iterator(chunk_size=chunk_size)),
+        )
+        filename = f'jautolog_export_delta_{now.strftime("%Y%m%d_%H%M%S")}.{extension}'
 
-        export_data['vehicles'].append(vehicle_data)
+    # Served as a .gz file rather than with Content-Encoding, so it downloads compressed
+    content_type = 'application/gzip' if export_format == 'ndjson' else 'application/json'
 
-    # Create JSON response with file download
-    response = HttpResponse(
-        json.dumps(export_data, indent=2),
-        content_type='application/json'
-    )
-    filename = f'jautolog_export_{date.today().strftime("%Y%m%d")}.json'
+    # Create streaming response with file download
+    if cached is not None:
+        content = iter_file(cached)
+    else:
+        if export_format == 'ndjson':
+            content = iter_gzip(content)
+        if cache_path:
+            content = iter_cached_export(content, cache_path)
+    if cache_path:
+        # The header goes in front of the cached body; for NDJSON as its own gzip member
+        header = [export_header(export_format)]
+        content = chain(iter_gzip(header) if export_format == 'ndjson' else header, content)
+    response = StreamingHttpResponse(content, content_type=content_type)
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
+    if etag:
+        response['ETag'] = etag
+        # Let clients keep a copy but make them revalidate it every time
+        patch_cache_control(response, private=True, no_cache=True)
+
     log_event(
         request=request,
         event="Data exported",
         level="INFO",
-        vehicle_count=len(export_data['vehicles'])
+        vehicle_count=vehicle_count,
+        since=since_param,
+        format=export_format,
+        cached=cached is not None
     )
 
     return response
@@ -1916,70 +2049,167 @@ def export_all_data(request):
 
 @login_required
 def export_images(request):
-    """Export all vehicle images as a ZIP file"""
-    import zipfile
-    from io import BytesIO
-    from django.http import HttpResponse
+    """
+    Export all vehicle images as a ZIP file, streamed as it is built. Like the data
+    export, the response carries an ETag and the last archive is reused while the
+    user's vehicles and images are unchanged.
+    """
+    from django.http import FileResponse, StreamingHttpResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from django.utils.http import quote_etag
+    from .exports import (
+        iter_zip_stream, iter_cached_export, export_fingerprint, cached_export_path, open_cached_export,
+        image_export_members, read_vehicle_image,
+    )
+
+    fingerprint = export_fingerprint(request.user, 'images')
+    etag = quote_etag(fingerprint)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        log_event(
+            request=request,
+            event="Image export not modified",
+            level="DEBUG"
+        )
+        return not_modified
+
+    filename = f'jautolog_images_{date.today().strftime("%Y%m%d")}.zip'
+    cache_path = cached_export_path(request.user, 'images', fingerprint, 'zip')
+    cached = open_cached_export(cache_path)
+    if cached is not None:
+        response = FileResponse(cached, content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        log_event(
+            request=request,
+            event="Images exported",
+            level="INFO",
+            cached=True
+        )
+        return response
 
     # Get all vehicles for the user
-    vehicles = Vehicle.objects.filter(user=request.user).prefetch_related('images')
+    vehicles = list(Vehicle.objects.filter(user=request.user).prefetch_related('images'))
 
-    # Create ZIP file in memory
-    zip_buffer = BytesIO()
+    members = image_export_members(vehicles)
 
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        image_count = 0
+    failed = []
 
-        for vehicle in vehicles:
-            # Create folder name for this vehicle
-            vehicle_folder = f"{vehicle.year}_{vehicle.make}_{vehicle.model}".replace(' ', '_')
+    def on_error(image, error):
+        # Log error but continue with other images
+        failed.append(image.id)
+        log_event(
+            request=request,
+            event="Failed to export image",
+            level="WARNING",
+            vehicle_id=image.vehicle_id,
+            image_id=image.id,
+            error=str(error)
+        )
 
-            for idx, image in enumerate(vehicle.images.all(), 1):
-                try:
-                    # Read image file from storage (works with both S3 and local)
-                    image_file = image.image.open('rb')
-                    image_data = image_file.read()
-                    image_file.close()
-
-                    # Get file extension
-                    file_ext = image.image.name.split('.')[-1] if '.' in image.image.name else 'jpg'
-
-                    # Create filename with vehicle info
-                    if image.caption:
-                        # Sanitize caption for filename
-                        safe_caption = "".join(c for c in image.caption if c.isalnum() or c in (' ', '-', '_')).strip()
-                        filename = f"{vehicle_folder}/{idx:02d}_{safe_caption[:50]}.{file_ext}"
-                    else:
-                        filename = f"{vehicle_folder}/{idx:02d}_image.{file_ext}"
-
-                    # Add to ZIP
-                    zip_file.writestr(filename, image_data)
-                    image_count += 1
-
-                except Exception as e:
-                    # Log error but continue with other images
-                    log_event(
-                        request=request,
-                        event="Failed to export image",
-                        level="WARNING",
-                        vehicle_id=vehicle.id,
-                        image_id=image.id,
-                        error=str(e)
-                    )
-                    continue
+    def stream():
+        # Archives with missing images are not cached, so the next export retries them
+        yield from iter_cached_export(
+            iter_zip_stream(members, read_vehicle_image, settings.EXPORT_IMAGE_FETCH_WORKERS, on_error),
+            cache_path,
+            keep=lambda: not failed,
+        )
+        log_event(
+            request=request,
+            event="Images exported",
+            level="INFO",
+            image_count=len(members) - len(failed),
+            vehicle_count=len(vehicles)
+        )
 
     # Prepare response
-    zip_buffer.seek(0)
-    response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
-    filename = f'jautolog_images_{date.today().strftime("%Y%m%d")}.zip'
+    response = StreamingHttpResponse(stream(), content_type='application/zip')
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return response
+
+
+@login_required
+def export_jobs(request):
+    """
+    Background exports for very large accounts. POST queues a job for the
+    process_export_jobs worker; the page lists recent jobs with download links
+    for the finished ones.
+    """
+    from .jobs import export_job_token
+    from .models import ExportJob
+
+    jobs = ExportJob.objects.filter(user=request.user)
+
+    if request.method == 'POST':
+        kind = request.POST.get('kind')
+        if kind not in dict(ExportJob.KIND_CHOICES):
+            messages.error(request, 'Unknown export type.')
+            return redirect('export_jobs')
+
+        job = jobs.filter(kind=kind, status__in=['pending', 'running']).first()
+        if job is None:
+            job = ExportJob.objects.create(user=request.user, kind=kind)
+            messages.success(request, f'{job.get_kind_display()} export started. The download link will appear here when it is ready.')
+            log_event(
+                request=request,
+                event="Export job queued",
+                level="INFO",
+                job_id=job.id,
+                kind=kind
+            )
+        else:
+            messages.info(request, f'A {job.get_kind_display()} export is already in progress.')
+        return redirect('export_jobs')
+
+    jobs = list(jobs[:10])
+    for job in jobs:
+        job.download_token = export_job_token(job) if job.status == 'done' else None
+
+    context = {
+        'jobs': jobs,
+        'kinds': ExportJob.KIND_CHOICES,
+        'has_active': any(job.is_active for job in jobs),
+        'link_minutes': settings.EXPORT_JOB_LINK_MAX_AGE // 60,
+    }
+    return render(request, 'autolog/export_jobs.html', context)
+
+
+@login_required
+def export_job_download(request, token):
+    """Download a finished background export through its short-lived signed link"""
+    import posixpath
+    from django.core import signing
+    from django.http import FileResponse
+    from .jobs import export_job_from_token
+    from .models import ExportJob
+
+    try:
+        job_id = export_job_from_token(token)
+    except signing.BadSignature:
+        messages.error(request, 'This download link has expired. Reload the page for a new one.')
+        return redirect('export_jobs')
+
+    job = get_object_or_404(ExportJob, pk=job_id, user=request.user, status='done')
+    filename = posixpath.basename(job.file.name)
 
     log_event(
         request=request,
-        event="Images exported",
+        event="Export job downloaded",
         level="INFO",
-        image_count=image_count,
-        vehicle_count=vehicles.count()
+        job_id=job.id,
+        kind=job.kind
     )
 
-    return response
+    if settings.USE_S3_MEDIA:
+        # Hand the transfer to S3 with a pre-signed URL that expires with the link
+        return redirect(job.file.storage.url(
+            job.file.name,
+            parameters={'ResponseContentDisposition': f'attachment; filename="{filename}"'},
+            expire=settings.EXPORT_JOB_LINK_MAX_AGE,
+        ))
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=filename)
@@ -1,10 +1,56 @@
 import time
 import uuid
 import logging
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
 
 _mw_logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def capture_queries(query_stats):
+    """Run `query_stats` as an execute_wrapper on every database connection"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(query_stats))
+        yield
+
+
+class StreamingContentMetrics:
+    """
+    Wraps the content of a streaming response so queries run while it is iterated
+    count towards the request, and the request is only finished (`finish`) once the
+    content is exhausted or the response is closed.
+    """
+
+    def __init__(self, content, query_stats, finish):
+        self._iterator = self._capture(content, query_stats)
+        self._finish = finish
+        self._finished = False
+
+    @staticmethod
+    def _capture(content, query_stats):
+        with capture_queries(query_stats):
+            yield from content
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        self._iterator.close()
+        if not self._finished:
+            self._finished = True
+            self._finish()
+
+
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
         from config.otel_config import setup_otel
@@ -13,8 +59,8 @@ class RequestLoggingMiddleware:
 
     def __call__(self, request):
         from config.otel_config import (
-            _SKIP_PREFIXES, _endpoint_from_path,
-            log_request, log_response, _tracer, _page_visits,
+            _SKIP_PREFIXES, _endpoint_from_path, QueryStats, check_query_budget, record_request_metrics,
+            log_request, log_response, _tracer, _page_visits, _requests_in_flight,
         )
 
         transaction_id = str(uuid.uuid4())
@@ -39,38 +85,63 @@ class RequestLoggingMiddleware:
                 },
             )
 
+        in_flight = {"endpoint": endpoint, "method": request.method}
+        if _requests_in_flight is not None:
+            _requests_in_flight.add(1, in_flight)
+
+        query_stats = QueryStats()
         start = time.monotonic()
         try:
-            response = self.get_response(request)
+            with capture_queries(query_stats):
+                response = self.get_response(request)
         except Exception:
             if span is not None:
                 try:
                     span.end()
                 except Exception:
                     pass
+            record_request_metrics(endpoint, request.method, 500, time.monotonic() - start, query_stats)
+            if _requests_in_flight is not None:
+                _requests_in_flight.add(-1, in_flight)
             raise
 
-        duration = time.monotonic() - start
-        trace_id = span_id = None
-        if span is not None:
-            try:
-                span.set_attribute("http.status_code", response.status_code)
-                ctx = span.get_span_context()
-                if ctx and ctx.is_valid:
-                    trace_id = format(ctx.trace_id, "032x")
-                    span_id = format(ctx.span_id, "016x")
-                span.end()
-            except Exception:
-                pass
-
-        summary = getattr(request, "otel_page_summary", None)
-        log_response(request, transaction_id, endpoint, response.status_code, duration, summary, trace_id, span_id)
-
-        if _page_visits is not None:
-            _page_visits.add(1, {
-                "endpoint": endpoint,
-                "method": request.method,
-                "status": str(response.status_code),
-            })
+        def finish():
+            if _requests_in_flight is not None:
+                _requests_in_flight.add(-1, in_flight)
+
+            duration = time.monotonic() - start
+            record_request_metrics(endpoint, request.method, response.status_code, duration, query_stats)
+            trace_id = span_id = None
+            if span is not None:
+                try:
+                    span.set_attribute("http.status_code", response.status_code)
+                    span.set_attribute("db.query_count", query_stats.count)
+                    span.set_attribute("db.duration_ms", round(query_stats.duration * 1000, 3))
+                    span.set_attribute("db.max_repeated_query", query_stats.max_repeated)
+                    ctx = span.get_span_context()
+                    if ctx and ctx.is_valid:
+                        trace_id = format(ctx.trace_id, "032x")
+                        span_id = format(ctx.span_id, "016x")
+                    span.end()
+                except Exception:
+                    pass
+
+            summary = getattr(request, "otel_page_summary", None)
+            log_response(request, transaction_id, endpoint, response.status_code, duration, summary, trace_id,
+                         span_id, query_stats)
+            check_query_budget(request, query_stats)
+
+            if _page_visits is not None:
+                _page_visits.add(1, {
+                    "endpoint": endpoint,
+                    "method": request.method,
+                    "status": str(response.status_code),
+                })
+
+        if response.streaming and not getattr(response, "is_async", False):
+            # Exports do their queries and serialization while the body streams
+            response.streaming_content = StreamingContentMetrics(response.streaming_content, query_stats, finish)
+        else:
+            finish()
 
         return response
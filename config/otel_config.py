@@ -1,7 +1,10 @@
 import os
+import re
 import json
 import logging
 import socket
+import time
+from collections import Counter
 from datetime import datetime, timezone
 
 SERVICE = os.getenv("OTEL_SERVICE_NAME", "jAutolog")
@@ -10,15 +13,24 @@ HOSTNAME = socket.gethostname()
 
 _initialized = False
 _page_visits = None
+_request_duration = None
+_requests_in_flight = None
+_db_queries = None
+_db_duration = None
 _tracer = None
 
+# Histogram buckets; the SDK defaults are too coarse below 100 ms for useful p95/p99
+_DURATION_BUCKETS_MS = [5, 10, 25, 50, 75, 100, 150, 250, 500, 750, 1000, 2500, 5000, 10000]
+_DB_DURATION_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+_QUERY_COUNT_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500]
+
 _page_logger = logging.getLogger("page")
 
 _SKIP_PREFIXES = ("/admin/", "/accounts/", "/static/", "/health/", "/favicon")
 
 
 def setup_otel():
-    global _initialized, _page_visits, _tracer
+    global _initialized, _page_visits, _request_duration, _requests_in_flight, _db_queries, _db_duration, _tracer
     if _initialized:
         return
     _initialized = True
@@ -72,12 +84,105 @@ def setup_otel():
             description="Total page visits",
             unit="1",
         )
+        _request_duration = meter.create_histogram(
+            name="http.server.duration",
+            description="Time to serve a request",
+            unit="ms",
+            explicit_bucket_boundaries_advisory=_DURATION_BUCKETS_MS,
+        )
+        _requests_in_flight = meter.create_up_down_counter(
+            name="http.server.active_requests",
+            description="Requests being served right now",
+            unit="{request}",
+        )
+        _db_queries = meter.create_histogram(
+            name="db.client.queries_per_request",
+            description="Database queries run while serving a request",
+            unit="{query}",
+            explicit_bucket_boundaries_advisory=_QUERY_COUNT_BUCKETS,
+        )
+        _db_duration = meter.create_histogram(
+            name="db.client.duration_per_request",
+            description="Time spent in database queries while serving a request",
+            unit="ms",
+            explicit_bucket_boundaries_advisory=_DB_DURATION_BUCKETS_MS,
+        )
         _tracer = trace.get_tracer(SERVICE)
 
     except ImportError:
         _page_logger.warning("opentelemetry packages not installed; traces and metrics disabled")
 
 
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Query shape: parameters are already placeholders; IN lists of any length match"""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+
+
+class QueryStats:
+    """
+    Connection execute_wrapper counting and timing the queries of one request, and
+    how often each query shape ran. The same shape many times over is usually an N+1.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.monotonic() - start
+            self.count += 1
+            self.shapes[normalize_sql(sql)] += 1
+
+    @property
+    def max_repeated(self):
+        """Runs of the most repeated query shape"""
+        return max(self.shapes.values(), default=0)
+
+    def repeated(self, threshold):
+        """(shape, count) for shapes run more than `threshold` times, most repeated first"""
+        return [(sql, count) for sql, count in self.shapes.most_common() if count > threshold]
+
+
+def check_query_budget(request, query_stats):
+    """
+    Log a WARNING naming the view when a request ran more than QUERY_BUDGET_PER_REQUEST
+    queries, or one query shape more than QUERY_REPEAT_THRESHOLD times
+    """
+    from django.conf import settings
+    from config.logging_utils import log_event
+
+    repeated = query_stats.repeated(settings.QUERY_REPEAT_THRESHOLD)
+    if query_stats.count <= settings.QUERY_BUDGET_PER_REQUEST and not repeated:
+        return
+    log_event(
+        request=request,
+        event="Excessive database queries",
+        level="WARNING",
+        db_query_count=query_stats.count,
+        db_query_budget=settings.QUERY_BUDGET_PER_REQUEST,
+        db_duration_seconds=round(query_stats.duration, 6),
+        repeated_queries=[{"sql": sql[:500], "count": count} for sql, count in repeated[:5]],
+    )
+
+
+def record_request_metrics(endpoint, method, status, duration, query_stats):
+    if _request_duration is None:
+        return
+    attributes = {"endpoint": endpoint, "method": method, "status": str(status)}
+    _request_duration.record(duration * 1000, attributes)
+    _db_queries.record(query_stats.count, attributes)
+    _db_duration.record(query_stats.duration * 1000, attributes)
+
+
 def _remote_addr(request):
     forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
     return forwarded.split(",")[0].strip() if forwarded else request.META.get("REMOTE_ADDR", "")
@@ -113,7 +218,8 @@ def log_request(request, transaction_id, endpoint):
     _page_logger.info(json.dumps(payload))
 
 
-def log_response(request, transaction_id, endpoint, status, duration, response_body, trace_id=None, span_id=None):
+def log_response(request, transaction_id, endpoint, status, duration, response_body, trace_id=None, span_id=None,
+                 query_stats=None):
     level = "INFO" if status < 400 else "ERROR"
     payload = {
         "event": "Response",
@@ -130,6 +236,10 @@ def log_response(request, transaction_id, endpoint, status, duration, response_b
         "status": status,
         "response_body": response_body,
     }
+    if query_stats is not None:
+        payload["db_query_count"] = query_stats.count
+        payload["db_duration_seconds"] = round(query_stats.duration, 6)
+        payload["db_max_repeated_query"] = query_stats.max_repeated
     if trace_id:
         payload["trace_id"] = trace_id
     if span_id:
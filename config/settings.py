@@ -136,11 +136,43 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 # File upload settings
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB (for multiple large images)
-FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5 MB; larger uploads are spooled to a temporary file
 
 # Vehicle Image Settings
 MAX_VEHICLE_IMAGES = 20  # Maximum number of images per vehicle
 MAX_IMAGE_RESOLUTION = 1920  # Maximum width/height in pixels
+MAX_IMAGE_PIXELS = 100_000_000  # Uploads with more pixels are rejected before decoding (decompression bomb guard)
+MAX_IMAGE_UPLOAD_BYTES = 25 * 1024 * 1024  # Largest image file accepted, through the form or direct to S3
+IMAGE_RENDITION_SIZES = {  # Rendition name -> maximum width/height in pixels, offered to browsers via srcset
+    'small': 320,
+    'medium': 800,
+    'large': 1280,
+}
+IMAGE_ALTERNATE_FORMATS = ['AVIF', 'WEBP']  # Extra rendition formats served via <picture> when smaller; skipped if Pillow lacks the codec
+IMAGE_PROCESSING_POLL_SECONDS = 5  # How often process_vehicle_images --loop checks for new uploads
+IMAGE_PROCESSING_TIMEOUT_MINUTES = 30  # Images stuck in processing this long are queued again
+IMAGE_PROCESSING_WORKERS = env.int('IMAGE_PROCESSING_WORKERS', default=2)  # Processes resizing images in process_vehicle_images
+IMAGE_UPLOAD_STORAGE_WORKERS = 4  # Threads writing a multi-file upload to storage
+IMAGE_DIRECT_UPLOAD_EXPIRE = 900  # Seconds a presigned upload POST stays valid
+STORAGE_TOMBSTONE_GRACE_MINUTES = 60  # Deleted files are kept this long before sweep_storage_tombstones removes them
+STORAGE_SWEEP_BATCH_SIZE = 1000  # Files checked and deleted per batch (S3 deletes up to 1000 per request)
+
+# Import Settings
+IMPORT_ERROR_DISPLAY_LIMIT = 20  # Errors shown on the page; the full list is in the downloadable report
+IMPORT_REPORT_RETENTION_DAYS = 7  # Days to keep import error reports
+IMPORT_VALIDATION_WORKERS = env.int('IMPORT_VALIDATION_WORKERS', default=4)  # Processes for validate-only imports
+IMPORT_VALIDATION_PARALLEL_THRESHOLD = 20000  # Minimum entries before validation uses the worker pool; smaller files validate faster serially
+IMPORT_CSV_CHUNK_SIZE = 1000  # CSV rows parsed and written per batch
+
+# Export Settings
+EXPORT_CHUNK_SIZE = 500  # Rows fetched per query batch and serialized per streamed chunk
+EXPORT_IMAGE_FETCH_WORKERS = 4  # Threads reading images from storage during the ZIP export
+EXPORT_CURSOR_OVERLAP_SECONDS = 60  # Incremental exports re-read this much before the cursor
+EXPORT_TOMBSTONE_RETENTION_DAYS = 90  # Days deletions are kept for incremental exports
+EXPORT_JOB_LINK_MAX_AGE = 900  # Seconds a background export download link stays valid
+EXPORT_JOB_RETENTION_HOURS = 24  # Hours finished background exports are kept in storage
+EXPORT_JOB_STALE_MINUTES = 60  # Minutes a running export may go without finishing before it is failed
+EXPORT_JOB_POLL_SECONDS = 10  # How often process_export_jobs --loop checks for new jobs
 
 # Media files (User uploads)
 # Use S3 for media storage, with environment-specific folders
@@ -152,6 +184,8 @@ if USE_S3_MEDIA:
     AWS_SECRET_ACCESS_KEY = env('AWS_MEDIA_SECRET_ACCESS_KEY')
     AWS_STORAGE_BUCKET_NAME = env('AWS_MEDIA_BUCKET_NAME', default='jautolog-media')
     AWS_S3_REGION_NAME = env('AWS_DEFAULT_REGION', default='us-east-1')
+    # Set to use an S3-compatible service instead of AWS, e.g. a local MinIO for development
+    AWS_S3_ENDPOINT_URL = env('AWS_S3_ENDPOINT_URL', default=None)
 
     # Environment-based folder prefix (test/ or production/)
     ENVIRONMENT = env('DJANGO_ENV', default='development')
@@ -168,16 +202,20 @@ if USE_S3_MEDIA:
     AWS_QUERYSTRING_AUTH = True  # Generate signed URLs for private files
     AWS_QUERYSTRING_EXPIRE = 3600  # Signed URLs expire after 1 hour
     AWS_S3_SIGNATURE_VERSION = 's3v4'
+    MEDIA_URL_MIN_VALIDITY = 600  # Seconds a reused signed URL must still be valid when handed out
+    MEDIA_URL_MEMO_SIZE = 5000  # Signed URLs memoized per process for the current time bucket
 
     # Django 4.2+ storage configuration (STORAGES setting)
     STORAGES = {
         "default": {
-            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            # Reuses signed URLs within a time bucket so browsers can cache images
+            "BACKEND": "config.storage.StableURLS3Storage",
             "OPTIONS": {
                 "access_key": AWS_ACCESS_KEY_ID,
                 "secret_key": AWS_SECRET_ACCESS_KEY,
                 "bucket_name": AWS_STORAGE_BUCKET_NAME,
                 "region_name": AWS_S3_REGION_NAME,
+                "endpoint_url": AWS_S3_ENDPOINT_URL,
                 "location": AWS_LOCATION,
                 "default_acl": AWS_DEFAULT_ACL,
                 "file_overwrite": AWS_S3_FILE_OVERWRITE,
@@ -252,6 +290,10 @@ else:
 
 DEFAULT_FROM_EMAIL = "noreply@yourdomain.com"
 
+# Request query monitoring (see config.otel_config.check_query_budget)
+QUERY_BUDGET_PER_REQUEST = env.int('QUERY_BUDGET_PER_REQUEST', default=50)  # More queries than this in one request logs a WARNING
+QUERY_REPEAT_THRESHOLD = env.int('QUERY_REPEAT_THRESHOLD', default=10)  # Same query shape more often than this logs a WARNING (likely N+1)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import botocore.auth
+from django.conf import settings
+from storages.backends.s3 import S3Storage
+
+_signing_time = ContextVar('signing_time', default=None)
+_current_datetime = botocore.auth.get_current_datetime
+
+
+def _signing_datetime(remove_tzinfo=True):
+    """botocore's signing clock, pinned to `_signing_time` while `signed_at` is active in this context"""
+    signed_at = _signing_time.get()
+    if signed_at is None:
+        return _current_datetime(remove_tzinfo)
+    return signed_at.replace(tzinfo=None) if remove_tzinfo else signed_at
+
+
+botocore.auth.get_current_datetime = _signing_datetime
+
+
+@contextmanager
+def signed_at(moment):
+    """Make pre-signed URLs generated in this thread/task use `moment` as their signing time"""
+    token = _signing_time.set(moment)
+    try:
+        yield
+    finally:
+        _signing_time.reset(token)
+
+
+class StableURLS3Storage(S3Storage):
+    """
+    S3 storage whose pre-signed GET URLs stay the same for a while instead of changing
+    on every call, so browsers get cache hits on repeat page views.
+
+    Time is cut into buckets of (querystring_expire - MEDIA_URL_MIN_VALIDITY) seconds,
+    and URLs are signed as of the start of the current bucket. A signature depends only
+    on the key, credentials and signing time, so every process hands out the same URL for
+    a file within a bucket, and always with at least MEDIA_URL_MIN_VALIDITY seconds left.
+    URLs for the current bucket are memoized, so repeat renders don't sign again.
+    """
+
+    _url_memo = (None, {})
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        # Custom parameters or expiry (e.g. export downloads) are signed fresh
+        reuse_for = self.querystring_expire - settings.MEDIA_URL_MIN_VALIDITY
+        if parameters or expire is not None or http_method or not self.querystring_auth or reuse_for <= 0:
+            return super().url(name, parameters=parameters, expire=expire, http_method=http_method)
+
+        bucket_start = int(time.time() // reuse_for) * reuse_for
+        memo_bucket, memo = self._url_memo
+        if memo_bucket != bucket_start or len(memo) >= settings.MEDIA_URL_MEMO_SIZE:
+            memo = {}
+            self._url_memo = (bucket_start, memo)
+        url = memo.get(name)
+        if url is None:
+            with signed_at(datetime.fromtimestamp(bucket_start, timezone.utc)):
+                url = super().url(name, expire=self.querystring_expire)
+            memo[name] = url
+        return url
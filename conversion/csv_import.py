@@ -0,0 +1,248 @@
+import csv
+import io
+import re
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+from autolog.models import MaintenanceEntry, OtherExpense
+
+from .reports import ImportFieldError
+
+# Import fields per CSV record type, keyed like the JSON importers expect
+CSV_RECORD_FIELDS = {
+    'fuel': ['date', 'odometer', 'gallons', 'cost'],
+    'fuel_electric': ['date', 'odometer', 'kwhPerMile', 'costPerKwh', 'costPerGallonReference'],
+    'maintenance': ['category', 'date', 'odometer', 'cost', 'notes'],
+    'expenses': ['expenseType', 'date', 'cost', 'notes'],
+}
+
+CSV_OPTIONAL_FIELDS = ['notes']
+
+# Header names recognised for each field when no mapping is given (compared case-insensitively)
+CSV_FIELD_ALIASES = {
+    'date': ['date', 'fill date', 'fillup date', 'service date'],
+    'odometer': ['odometer', 'odo', 'mileage'],
+    'gallons': ['gallons', 'volume', 'quantity', 'fuel amount'],
+    'cost': ['cost', 'total cost', 'total', 'amount', 'price'],
+    'kwhPerMile': ['kwhpermile', 'kwh per mile', 'kwh/mile', 'kwh/mi'],
+    'costPerKwh': ['costperkwh', 'cost per kwh', 'price per kwh', '$/kwh'],
+    'costPerGallonReference': ['costpergallonreference', 'cost per gallon reference', 'gas price', 'price per gallon'],
+    'category': ['category', 'service', 'service type'],
+    'expenseType': ['expensetype', 'expense type', 'type'],
+    'notes': ['notes', 'note', 'description', 'comments'],
+}
+
+CSV_DATE_FORMATS = [
+    ('%Y-%m-%d', 'YYYY-MM-DD'),
+    ('%m/%d/%Y', 'MM/DD/YYYY'),
+    ('%d/%m/%Y', 'DD/MM/YYYY'),
+    ('%m/%d/%y', 'MM/DD/YY'),
+    ('%d.%m.%Y', 'DD.MM.YYYY'),
+]
+
+DECIMAL_FIELDS = ('gallons', 'cost', 'kwhPerMile', 'costPerKwh', 'costPerGallonReference')
+
+# Regex groups for the strptime directives used in CSV_DATE_FORMATS
+DATE_DIRECTIVES = {
+    '%Y': r'(?P<year>\d{4})',
+    '%y': r'(?P<short_year>\d{2})',
+    '%m': r'(?P<month>\d{1,2})',
+    '%d': r'(?P<day>\d{1,2})',
+}
+
+
+def csv_record_fields(record_type, vehicle):
+    """Import fields for a record type; fuel fields depend on the vehicle's fuel type"""
+    if record_type == 'fuel' and vehicle.fuel_type == 'electric':
+        return CSV_RECORD_FIELDS['fuel_electric']
+    return CSV_RECORD_FIELDS[record_type]
+
+
+def open_csv(uploaded_file):
+    """
+    Wrap an uploaded file in a streaming CSV reader and return (reader, headers).
+    Rows are decoded as they are read, so the file is never loaded whole.
+    """
+    stream = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(stream)
+    headers = [header.strip() for header in next(reader, [])]
+    return reader, headers
+
+
+def parse_column_mapping(text):
+    """Parse "field = CSV header" lines from the mapping textarea into a dict"""
+    mapping = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        field, sep, header = line.partition('=')
+        if not sep:
+            raise ValueError(f'Invalid column mapping line: "{line.strip()}". Use field = CSV header.')
+        mapping[field.strip()] = header.strip()
+    return mapping
+
+
+def resolve_column_mapping(headers, fields, mapping, defaults=None):
+    """
+    Work out which CSV column feeds each import field.
+
+    Explicit entries in `mapping` win; other fields are matched by header alias.
+    Fields with a value in `defaults` (e.g. a fixed category) may have no column.
+    Returns {field: column index} and raises ValueError if a required field has no source.
+    """
+    defaults = defaults or {}
+    lookup = {header.lower(): idx for idx, header in enumerate(headers)}
+    columns = {}
+
+    for field, header in mapping.items():
+        if field not in fields:
+            raise ValueError(f'Unknown field in column mapping: {field}')
+        if header.lower() not in lookup:
+            raise ValueError(f'Column "{header}" mapped to {field} is not in the CSV header')
+        columns[field] = lookup[header.lower()]
+
+    for field in fields:
+        if field in columns:
+            continue
+        for alias in [field.lower()] + CSV_FIELD_ALIASES.get(field, []):
+            if alias in lookup:
+                columns[field] = lookup[alias]
+                break
+        else:
+            if field not in CSV_OPTIONAL_FIELDS and not defaults.get(field):
+                raise ValueError(f'No CSV column found for {field}. Add it to the column mapping.')
+
+    return columns
+
+
+def _keep_failures(parse):
+    """
+    Column parser applying a single-value parser to every cell at once, falling back to
+    cell by cell only if one fails. Cells it rejects are kept as text so the importer
+    reports them with its usual error.
+    """
+    def parse_values(values):
+        try:
+            return [parse(value) for value in values]
+        except (ValueError, ArithmeticError, KeyError):
+            pass
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(parse(value))
+            except (ValueError, ArithmeticError, KeyError):
+                parsed.append(value)
+        return parsed
+    return parse_values
+
+
+def _choice_parser(choices):
+    """Accept either the stored value or the display label of a choice"""
+    lookup = {}
+    for value, label in choices:
+        lookup[value.lower()] = value
+        lookup[label.lower()] = value
+    return lambda values: [lookup.get(value.lower(), value) for value in values]
+
+
+def _decimal_parser(value):
+    # Tolerate currency symbols and thousands separators from spreadsheet exports
+    return Decimal(value.replace(',', '').replace('$', ''))
+
+
+def _int_parser(value):
+    return int(_decimal_parser(value))
+
+
+def _date_parser(date_format):
+    """
+    Column parser for dates in one of CSV_DATE_FORMATS. The format is compiled to a regex
+    once per column instead of running strptime per cell. Cells that don't match become
+    an ImportFieldError naming the selected format; there is no fallback to YYYY-MM-DD.
+    """
+    label = dict(CSV_DATE_FORMATS)[date_format]
+    pattern = re.compile(re.sub('%[Yymd]', lambda m: DATE_DIRECTIVES[m.group()], re.escape(date_format)))
+
+    def parse_values(values):
+        parsed = []
+        for value, match in zip(values, map(pattern.fullmatch, values)):
+            try:
+                if match is None:
+                    raise ValueError(value)
+                parts = match.groupdict()
+                if 'short_year' in parts:
+                    # strptime's %y pivot: 69-99 are 1900s, 00-68 are 2000s
+                    short_year = int(parts['short_year'])
+                    year = short_year + (1900 if short_year >= 69 else 2000)
+                else:
+                    year = int(parts['year'])
+                parsed.append(date(year, int(parts['month']), int(parts['day'])))
+            except ValueError:
+                parsed.append(ImportFieldError(
+                    f"Invalid date format for date: {value}. Use {label}.", field='date', code='invalid_date'
+                ))
+        return parsed
+    return parse_values
+
+
+def column_parser(field, date_format):
+    """Return the parser for a whole column of a field, or None to keep the text as-is"""
+    if field == 'date':
+        return _date_parser(date_format)
+    if field == 'odometer':
+        return _keep_failures(_int_parser)
+    if field in DECIMAL_FIELDS:
+        return _keep_failures(_decimal_parser)
+    if field == 'category':
+        return _choice_parser(MaintenanceEntry.CATEGORY_CHOICES)
+    if field == 'expenseType':
+        return _choice_parser(OtherExpense.EXPENSE_TYPE_CHOICES)
+    return None
+
+
+def parse_column(values, parse):
+    """
+    Parse one column of a chunk. The column's distinct cells are parsed together in one
+    call - dates, prices and categories repeat heavily in fuel logs - and mapped back to
+    the rows. Blank cells stay blank.
+    """
+    distinct = list(set(values) - {''})
+    parsed = dict(zip(distinct, parse(distinct)))
+    parsed[''] = ''
+    return [parsed[value] for value in values]
+
+
+def raise_invalid_cells(data):
+    """Raise the error a column parser left in place of a cell it could not read"""
+    for value in data.values():
+        if isinstance(value, ImportFieldError):
+            # A fresh error per row; the parsed one is shared by every row with that cell
+            raise ImportFieldError(str(value), field=value.field, code=value.code)
+
+
+def iter_csv_chunks(reader, columns, date_format, chunk_size, defaults=None):
+    """
+    Read the CSV in chunks of `chunk_size` rows and parse each chunk column by column.
+    Yields (first_row, entries) where entries are dicts keyed like the JSON importers
+    expect and first_row is the 1-based data row number of the chunk's first entry.
+    """
+    defaults = {field: value for field, value in (defaults or {}).items() if value and field not in columns}
+    parsers = {field: column_parser(field, date_format) for field in columns}
+    first_row = 1
+
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            break
+
+        parsed = {}
+        for field, idx in columns.items():
+            values = [row[idx].strip() if idx < len(row) else '' for row in rows]
+            parse = parsers[field]
+            parsed[field] = parse_column(values, parse) if parse else values
+
+        fields = list(parsed)
+        entries = [{**defaults, **dict(zip(fields, values))} for values in zip(*parsed.values())]
+        yield first_row, entries
+        first_row += len(rows)
@@ -0,0 +1,137 @@
+import gzip
+import io
+import json
+from bisect import bisect_left, insort
+
+
+def vehicle_natural_key(vin_number, year, make, model, purchased_date):
+    """
+    Natural key used to match imported vehicles against existing ones.
+    VIN wins when present, otherwise year/make/model/purchase date.
+    """
+    vin = (vin_number or '').strip().upper()
+    if vin:
+        return ('vin', vin)
+    return ('ymm', year, (make or '').strip().lower(), (model or '').strip().lower(), purchased_date)
+
+
+def vehicle_key(vehicle):
+    return vehicle_natural_key(vehicle.vin_number, vehicle.year, vehicle.make, vehicle.model, vehicle.purchased_date)
+
+
+def fuel_entry_key(entry):
+    return (entry.date, entry.odometer)
+
+
+def maintenance_entry_key(entry):
+    return (entry.category, entry.date, entry.cost)
+
+
+def other_expense_key(entry):
+    return (entry.expense_type, entry.date, entry.cost)
+
+
+def load_vehicle_index(user):
+    """Load the user's vehicles once, keyed by natural key"""
+    index = {}
+    for vehicle in user.vehicles.all():
+        index.setdefault(vehicle_key(vehicle), vehicle)
+    return index
+
+
+def load_existing_entries(queryset, key_func):
+    """Load existing entries of one table for one vehicle into a dict keyed by natural key"""
+    existing = {}
+    for entry in queryset:
+        existing.setdefault(key_func(entry), entry)
+    return existing
+
+
+def load_odometer_history(queryset):
+    """Load the (date, odometer) readings of existing fuel entries into an OdometerHistory"""
+    return OdometerHistory(queryset.values_list('date', 'odometer'))
+
+
+class OdometerHistory:
+    """
+    Sorted (date, odometer) readings for one vehicle, kept in memory so fuel entries
+    can be validated against entries that have not been written to the database yet.
+    Mirrors the "entry immediately before this one" query in create_fuel_entry_from_json.
+    """
+
+    def __init__(self, readings=()):
+        self._readings = sorted(readings)
+
+    def __len__(self):
+        return len(self._readings)
+
+    def previous(self, date, odometer):
+        """Return the odometer of the reading immediately before (date, odometer), or None"""
+        idx = bisect_left(self._readings, (date, odometer))
+        if idx == 0:
+            return None
+        return self._readings[idx - 1][1]
+
+    def add(self, date, odometer):
+        insort(self._readings, (date, odometer))
+
+
+# NDJSON record type -> entry list of the vehicle payload it belongs to
+NDJSON_ENTRY_LISTS = {
+    'fuelEntry': 'fuelEntries',
+    'maintenanceEntry': 'maintenanceEntries',
+    'otherExpense': 'otherExpenses',
+}
+
+
+def is_ndjson_upload(uploaded_file):
+    return uploaded_file.name.lower().endswith(('.ndjson', '.jsonl', '.ndjson.gz', '.jsonl.gz'))
+
+
+def open_ndjson(uploaded_file):
+    """Return a line iterator over an uploaded NDJSON file, decompressing .gz uploads as they are read"""
+    stream = uploaded_file
+    if uploaded_file.name.lower().endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=uploaded_file, mode='rb')
+    return io.TextIOWrapper(stream, encoding='utf-8')
+
+
+def iter_ndjson_vehicles(lines, errors):
+    """
+    Group NDJSON export lines into vehicle payloads shaped like the JSON export.
+
+    Each payload is yielded once the next vehicle line (or the end of the file) is
+    reached, so only one vehicle is held in memory. Malformed lines are recorded in
+    `errors` by line number and skipped; header and tombstone lines are ignored.
+    """
+    vehicle = None
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            errors.add(f"Invalid JSON: {e}", row=line_number, record='line')
+            continue
+        if not isinstance(record, dict):
+            errors.add("Each line must be a JSON object", row=line_number, record='line')
+            continue
+
+        record_type = record.pop('type', None)
+        if record_type == 'vehicle':
+            if vehicle is not None:
+                yield vehicle
+            vehicle = record
+        elif record_type in NDJSON_ENTRY_LISTS:
+            if vehicle is None:
+                errors.add(f"{record_type} line appears before any vehicle line", row=line_number, record='line')
+                continue
+            vehicle.setdefault(NDJSON_ENTRY_LISTS[record_type], []).append(record)
+        elif record_type not in ('export', 'deleted'):
+            errors.add(f"Unknown record type: {record_type}", row=line_number, record='line', field='type', code='invalid_choice')
+
+    if vehicle is not None:
+        yield vehicle
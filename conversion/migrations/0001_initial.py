@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 22:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('import_type', models.CharField(choices=[('vehicles', 'Vehicles'), ('fuel', 'Fuel Entries'), ('maintenance', 'Maintenance Entries'), ('expenses', 'Other Expenses')], max_length=20)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('error_counts', models.JSONField(default=dict, help_text='Error count keyed by error type')),
+                ('errors', models.JSONField(default=list, help_text='Full list of structured errors')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_reports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
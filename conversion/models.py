@@ -1,3 +1,44 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class ImportReport(models.Model):
+    """Structured error report for a single import run, kept server-side for download"""
+    IMPORT_TYPE_CHOICES = [
+        ('vehicles', 'Vehicles'),
+        ('fuel', 'Fuel Entries'),
+        ('maintenance', 'Maintenance Entries'),
+        ('expenses', 'Other Expenses'),
+    ]
+
+    ERROR_CODE_LABELS = {
+        'missing_field': 'Missing required field',
+        'invalid_date': 'Invalid date',
+        'invalid_number': 'Invalid number',
+        'invalid_choice': 'Invalid choice',
+        'out_of_range': 'Value out of range',
+        'odometer': 'Odometer sequence',
+        'invalid': 'Invalid data',
+        'unexpected': 'Unexpected error',
+    }
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_reports')
+    import_type = models.CharField(max_length=20, choices=IMPORT_TYPE_CHOICES)
+    error_count = models.PositiveIntegerField(default=0)
+    error_counts = models.JSONField(default=dict, help_text="Error count keyed by error type")
+    errors = models.JSONField(default=list, help_text="Full list of structured errors")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_import_type_display()} import - {self.error_count} error(s)"
+
+    def get_error_type_summary(self):
+        """Return (label, count) pairs sorted by count descending"""
+        return sorted(
+            ((self.ERROR_CODE_LABELS.get(code, code), count) for code, count in self.error_counts.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )
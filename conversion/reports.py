@@ -0,0 +1,76 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+
+class ImportFieldError(ValueError):
+    """ValueError raised by the JSON importers that remembers which field failed and why."""
+
+    def __init__(self, message, field='', code='invalid'):
+        super().__init__(message)
+        self.field = field
+        self.code = code
+
+
+class ImportErrorCollector:
+    """
+    Collects import errors as structured rows instead of flash messages.
+
+    Each error records the vehicle index (for nested imports), the record type,
+    the 1-based row index within that record list, the field and the reason.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.counts = Counter()
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __bool__(self):
+        return bool(self.errors)
+
+    def add(self, reason, row=None, record='', field='', code='invalid', vehicle=None):
+        self.errors.append({
+            'vehicle': vehicle,
+            'record': record,
+            'row': row,
+            'field': field,
+            'code': code,
+            'reason': str(reason),
+        })
+        self.counts[code] += 1
+
+    def add_exception(self, exc, row=None, record='', vehicle=None):
+        """Record an exception raised while importing a single row"""
+        if isinstance(exc, ImportFieldError):
+            self.add(exc, row=row, record=record, field=exc.field, code=exc.code, vehicle=vehicle)
+        elif isinstance(exc, ValueError):
+            self.add(exc, row=row, record=record, code='invalid', vehicle=vehicle)
+        else:
+            self.add(f"Unexpected error - {exc}", row=row, record=record, code='unexpected', vehicle=vehicle)
+
+    def extend(self, errors):
+        """Merge error rows collected elsewhere, e.g. by a validation worker"""
+        for error in errors:
+            self.errors.append(error)
+            self.counts[error['code']] += 1
+
+    def save(self, user, import_type):
+        """Persist the collected errors and prune this user's expired reports"""
+        from .models import ImportReport
+
+        if not self.errors:
+            return None
+
+        cutoff = timezone.now() - timedelta(days=settings.IMPORT_REPORT_RETENTION_DAYS)
+        ImportReport.objects.filter(user=user, created_at__lt=cutoff).delete()
+
+        return ImportReport.objects.create(
+            user=user,
+            import_type=import_type,
+            error_count=len(self.errors),
+            error_counts=dict(self.counts),
+            errors=self.errors,
+        )
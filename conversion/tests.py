@@ -1,3 +1,93 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+
+from autolog.models import Vehicle
+
+
+class ImportMatchingTests(TestCase):
+    """Imports only match rows against existing entries when upsert is asked for"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('driver', password='password')
+        self.client.force_login(self.user)
+
+    def import_fuel(self, vehicle, entries, **options):
+        data = {'json_data': json.dumps(entries), **{option: 'on' for option in options}}
+        self.client.post(reverse('fuel_entry_import', args=[vehicle.pk]), data)
+
+    def test_edited_row_without_upsert_is_added(self):
+        vehicle = Vehicle.objects.create(
+            user=self.user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=100, purchased_date='2020-01-01',
+        )
+        fill = {'date': '2024-05-01', 'odometer': 400, 'gallons': 10.0, 'cost': 35.0}
+        self.import_fuel(vehicle, [fill])
+        original = vehicle.fuel_entries.get()
+
+        self.import_fuel(vehicle, [dict(fill, gallons=12.0, cost=42.0)])
+        self.assertEqual(vehicle.fuel_entries.count(), 2)
+        original.refresh_from_db()
+        self.assertEqual((original.gallons, original.cost), (10, 35))
+
+        self.import_fuel(vehicle, [dict(fill, gallons=11.0)], upsert=True)
+        self.assertEqual(vehicle.fuel_entries.count(), 2)
+        self.assertEqual(vehicle.fuel_entries.filter(gallons=11).count(), 1)
+
+    def test_identical_rows_without_upsert_are_kept(self):
+        fee = {'expenseType': 'registration', 'date': '2024-05-01', 'cost': 12.0, 'notes': 'Plate fee'}
+        payload = {
+            'year': 2020, 'make': 'Honda', 'model': 'Civic',
+            'purchasedOdometer': 100, 'purchasedDate': '2020-01-01',
+            'otherExpenses': [fee, dict(fee)],
+        }
+        self.client.post(reverse('vehicle_import'), {'json_data': json.dumps(payload)})
+
+        vehicle = Vehicle.objects.get(user=self.user)
+        self.assertEqual(vehicle.other_expenses.count(), 2)
+
+
+class CSVImportTests(TestCase):
+    """CSV cells are parsed column by column in the selected formats"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('driver', password='password')
+        self.client.force_login(self.user)
+        self.vehicle = Vehicle.objects.create(
+            user=self.user, year=2020, make='Honda', model='Civic',
+            purchased_odometer=1100, purchased_date='2020-01-01',
+        )
+
+    def import_csv(self, text, **data):
+        upload = SimpleUploadedFile('log.csv', text.encode(), content_type='text/csv')
+        return self.client.post(
+            reverse('csv_import', args=[self.vehicle.pk]), {'csv_file': upload, 'record_type': 'fuel', **data},
+        )
+
+    def test_dates_only_parse_in_selected_format(self):
+        text = (
+            'Fill Date,Mileage,Volume,Total Cost\n'
+            '05/01/2024,"1,400",10.5,$31.50\n'
+            '2024-05-08,1700,10,30\n'
+            '13/45/2024,2000,10,30\n'
+            '05/20/24,2300,10,30\n'
+        )
+        response = self.import_csv(text, date_format='%m/%d/%Y', validate_only='on')
+        errors = response.context['report'].errors
+        self.assertEqual([(error['row'], error['field'], error['code']) for error in errors], [
+            (2, 'date', 'invalid_date'), (3, 'date', 'invalid_date'), (4, 'date', 'invalid_date'),
+        ])
+        self.assertEqual(errors[0]['reason'], 'Invalid date format for date: 2024-05-08. Use MM/DD/YYYY.')
+
+        self.import_csv(text, date_format='%m/%d/%Y')
+        entry = self.vehicle.fuel_entries.get()
+        self.assertEqual((entry.date, entry.odometer, entry.cost), (date(2024, 5, 1), 1400, Decimal('31.50')))
 
-# Create your tests here.
+    def test_two_digit_years(self):
+        self.import_csv('date,odometer,gallons,cost\n05/01/24,1400,10,35\n', date_format='%m/%d/%y')
+        self.assertEqual(self.vehicle.fuel_entries.get().date, date(2024, 5, 1))
@@ -1,5 +1,8 @@
 from django.urls import path
-from .views import conversion, vehicle_import, fuel_entry_import, maintenance_entry_import, other_expense_import
+from .views import (
+    conversion, vehicle_import, fuel_entry_import, maintenance_entry_import, other_expense_import,
+    csv_import, import_report_detail, import_report_download
+)
 
 urlpatterns = [
     path("", conversion, name="conversion"),
@@ -7,4 +10,7 @@ urlpatterns = [
     path("fuel/<int:vehicle_pk>/", fuel_entry_import, name="fuel_entry_import"),
     path("maintenance/<int:vehicle_pk>/", maintenance_entry_import, name="maintenance_entry_import"),
     path("expenses/<int:vehicle_pk>/", other_expense_import, name="other_expense_import"),
+    path("csv/<int:vehicle_pk>/", csv_import, name="csv_import"),
+    path("reports/<int:pk>/", import_report_detail, name="import_report_detail"),
+    path("reports/<int:pk>/download/", import_report_download, name="import_report_download"),
 ]
\ No newline at end of file
@@ -0,0 +1,121 @@
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Django is imported inside the functions below so worker processes can import this
+# module before django.setup() has run.
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def get_validation_pool():
+    """
+    The process-wide validation pool. It is started on first use and kept for later
+    imports, since spawning and setting up Django costs far more than validating.
+    """
+    global _pool
+    from django.conf import settings
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork so workers never share the parent's database connections
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMPORT_VALIDATION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def validate_vehicle_entries(vehicle, vehicle_data, vehicle_idx, snapshot, upsert):
+    """
+    Run every entry check for one vehicle without writing anything.
+    Returns (errors, stats) so the result can be sent back from a worker process.
+    """
+    from .reports import ImportErrorCollector
+    from .views import plan_vehicle_entries, tally_plan
+
+    errors = ImportErrorCollector()
+    stats = Counter()
+    for plan in plan_vehicle_entries(vehicle, vehicle_data, vehicle_idx, errors, stats, snapshot, upsert):
+        tally_plan(plan, stats)
+    return errors.errors, stats
+
+
+def validate_vehicle_payloads(vehicles_data, user, errors, stats, vehicle_index=None):
+    """
+    Validate-only counterpart of import_vehicle_payload for a whole import.
+
+    Vehicles are parsed and matched here, and the existing entries they could match are
+    loaded up front. The entry checks need no database access, so once a file has at
+    least IMPORT_VALIDATION_PARALLEL_THRESHOLD entries they are spread across the shared
+    process pool, one job per vehicle. Results are merged back in file order.
+    """
+    from django.conf import settings
+    from .importing import vehicle_key
+    from .views import changed_fields, load_entry_snapshot, resolve_vehicle, vehicle_import_fields
+
+    jobs = []
+    for idx, vehicle_data in enumerate(vehicles_data, 1):
+        try:
+            vehicle, existing_vehicle = resolve_vehicle(vehicle_data, user, vehicle_index)
+        except Exception as e:
+            errors.add_exception(e, row=idx, record='vehicle', vehicle=idx)
+            continue
+
+        if existing_vehicle is not None:
+            if changed_fields(vehicle, existing_vehicle, vehicle_import_fields(vehicle_data)):
+                stats['vehicle_updated'] += 1
+            else:
+                stats['vehicle_unchanged'] += 1
+            vehicle = existing_vehicle
+        else:
+            stats['vehicle_created'] += 1
+            if vehicle_index is not None:
+                vehicle_index[vehicle_key(vehicle)] = vehicle
+
+        # Vehicles that would be created by this import have nothing to match against
+        snapshot = load_entry_snapshot(vehicle, vehicle_data) if vehicle.pk else {}
+        jobs.append((vehicle, vehicle_data, idx, snapshot, vehicle_index is not None))
+
+    entry_count = sum(
+        len(data.get('fuelEntries') or []) + len(data.get('maintenanceEntries') or [])
+        + len(data.get('otherExpenses') or [])
+        for _, data, _, _, _ in jobs
+    )
+    workers = min(settings.IMPORT_VALIDATION_WORKERS, len(jobs))
+
+    results = None
+    if workers > 1 and entry_count >= settings.IMPORT_VALIDATION_PARALLEL_THRESHOLD:
+        pool = get_validation_pool()
+        try:
+            results = list(pool.map(validate_vehicle_entries, *zip(*jobs)))
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time and validate this file here
+            _discard_pool(pool)
+    if results is None:
+        results = [validate_vehicle_entries(*job) for job in jobs]
+
+    for job_errors, job_stats in results:
+        errors.extend(job_errors)
+        stats.update(job_stats)
+
+    # Vehicle-level errors were collected first; restore file order
+    errors.errors.sort(key=lambda error: error['vehicle'] or 0)
@@ -1,12 +1,70 @@
+import csv
 import json
+from collections import Counter
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from autolog.models import Vehicle, FuelEntry, MaintenanceEntry, OtherExpense
 from autolog.forms import get_previous_odometer
 from config.logging_utils import log_event
+from .csv_import import (
+    CSV_DATE_FORMATS, csv_record_fields, iter_csv_chunks, open_csv, parse_column_mapping, raise_invalid_cells,
+    resolve_column_mapping,
+)
+from .importing import (
+    OdometerHistory, fuel_entry_key, is_ndjson_upload, iter_ndjson_vehicles, load_existing_entries,
+    load_odometer_history, load_vehicle_index, maintenance_entry_key, open_ndjson, other_expense_key, vehicle_key,
+)
+from .models import ImportReport
+from .reports import ImportErrorCollector, ImportFieldError
+from .validation import validate_vehicle_payloads
+
+# Field mapping: JSON camelCase -> model snake_case
+VEHICLE_FIELD_MAPPING = {
+    'year': 'year',
+    'make': 'make',
+    'model': 'model',
+    'color': 'color',
+    'vinNumber': 'vin_number',
+    'licensePlateNumber': 'license_plate_number',
+    'registrationNumber': 'registration_number',
+    'state': 'state',
+    'purchasedDate': 'purchased_date',
+    'purchasedPrice': 'purchased_price',
+    'purchasedOdometer': 'purchased_odometer',
+    'dealerName': 'dealer_name',
+    'soldDate': 'sold_date',
+    'soldPrice': 'sold_price',
+    'soldOdometer': 'sold_odometer',
+    'currentValue': 'current_value',
+    'currentValueDate': 'current_value_date',
+    'fuelType': 'fuel_type',
+    'financingType': 'financing_type',
+    'downPayment': 'down_payment',
+}
+
+LOAN_FIELD_MAPPING = {
+    'loanStartDate': 'loan_start_date',
+    'loanAmount': 'loan_amount',
+    'loanInterestRate': 'loan_interest_rate',
+    'loanTermMonths': 'loan_term_months',
+    'loanPaymentDay': 'loan_payment_day',
+    'loanAutoPayment': 'loan_auto_payment',
+}
+
+LEASE_FIELD_MAPPING = {
+    'leaseStartDate': 'lease_start_date',
+    'leasePaymentAmount': 'lease_payment_amount',
+    'leaseTermMonths': 'lease_term_months',
+    'leasePaymentDay': 'lease_payment_day',
+    'leaseAutoPayment': 'lease_auto_payment',
+}
 
 
 @login_required
@@ -19,6 +77,129 @@ def conversion(request):
     return render(request, "conversion/conversion.html")
 
 
+def record_import_errors(request, errors, import_type, validate_only=False, **log_fields):
+    """
+    Store collected import errors server-side and add a single summary message.
+    Returns the saved ImportReport, or None if there were no errors.
+    """
+    report = errors.save(request.user, import_type)
+    if report is None:
+        return None
+
+    outcome = 'failed validation' if validate_only else 'could not be imported'
+    messages.error(
+        request,
+        f'{report.error_count} record(s) {outcome}. '
+        f'See the error report for details.'
+    )
+    log_event(
+        request=request,
+        event="Import had errors",
+        level="WARNING",
+        import_type=import_type,
+        report_id=report.id,
+        error_count=report.error_count,
+        error_counts=report.error_counts,
+        validate_only=validate_only,
+        **log_fields
+    )
+    return report
+
+
+def render_validation_result(request, template, errors, stats, import_type, context):
+    """
+    Render the outcome of a validate-only import: what would be created, updated or
+    skipped, plus the error report. Nothing has been written at this point.
+    """
+    would_create = [
+        f'{stats[f"{record}_created"]} {label}'
+        for record, label in IMPORT_RECORD_LABELS
+        if stats[f'{record}_created'] > 0
+    ]
+    would_update = [
+        f'{stats[f"{record}_updated"]} {label}'
+        for record, label in IMPORT_RECORD_LABELS
+        if stats[f'{record}_updated'] > 0
+    ]
+    unchanged_count = sum(stats[f'{record}_unchanged'] for record, _ in IMPORT_RECORD_LABELS)
+
+    messages.info(request, 'Validation only - nothing was imported.')
+    if would_create:
+        messages.info(request, f'Would import: {", ".join(would_create)}.')
+    if would_update:
+        messages.info(request, f'Would update: {", ".join(would_update)}.')
+    if unchanged_count:
+        messages.info(request, f'Would skip {unchanged_count} record(s) that already exist unchanged.')
+    if not errors:
+        messages.success(request, 'No validation errors found.')
+
+    report = record_import_errors(request, errors, import_type, validate_only=True)
+    log_event(
+        request=request,
+        event="Import validated",
+        level="INFO",
+        import_type=import_type,
+        error_count=len(errors),
+        would_create=sum(stats[f'{record}_created'] for record, _ in IMPORT_RECORD_LABELS),
+        would_update=sum(stats[f'{record}_updated'] for record, _ in IMPORT_RECORD_LABELS),
+        unchanged=unchanged_count
+    )
+    return render(request, template, {
+        **context,
+        'validate_only': True,
+        'report': report,
+        'error_display_limit': settings.IMPORT_ERROR_DISPLAY_LIMIT,
+    })
+
+
+@login_required
+def import_report_detail(request, pk):
+    """Show a capped summary of an import error report"""
+    report = get_object_or_404(ImportReport, pk=pk, user=request.user)
+
+    log_event(
+        request=request,
+        event="Import report viewed",
+        level="DEBUG",
+        report_id=report.id
+    )
+    return render(request, "conversion/import_report.html", {
+        'report': report,
+        'error_display_limit': settings.IMPORT_ERROR_DISPLAY_LIMIT,
+    })
+
+
+@login_required
+def import_report_download(request, pk):
+    """Download the full import error report as CSV"""
+    report = get_object_or_404(ImportReport, pk=pk, user=request.user)
+
+    response = HttpResponse(content_type='text/csv')
+    filename = f'jautolog_import_errors_{report.created_at.strftime("%Y%m%d_%H%M%S")}.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    writer = csv.writer(response)
+    writer.writerow(['vehicle', 'record', 'row', 'field', 'error_type', 'reason'])
+    for error in report.errors:
+        writer.writerow([
+            error.get('vehicle') or '',
+            error.get('record') or '',
+            error.get('row') or '',
+            error.get('field') or '',
+            error.get('code') or '',
+            error.get('reason') or '',
+        ])
+
+    log_event(
+        request=request,
+        event="Import report downloaded",
+        level="INFO",
+        report_id=report.id,
+        error_count=report.error_count
+    )
+    return response
+
+
 @login_required
 def vehicle_import(request):
     if request.method == 'POST':
@@ -26,149 +207,136 @@ def vehicle_import(request):
         json_file = request.FILES.get('json_file')
         json_text = request.POST.get('json_data', '').strip()
 
-        if json_file:
-            # Read from uploaded file
-            try:
-                json_text = json_file.read().decode('utf-8')
-            except Exception as e:
-                messages.error(request, f'Error reading file: {e}')
-                return render(request, "conversion/vehicle_import.html")
-        elif not json_text:
-            messages.error(request, 'Please upload a file or provide JSON data.')
-            return render(request, "conversion/vehicle_import.html")
+        errors = ImportErrorCollector()
 
-        try:
-            data = json.loads(json_text)
-        except json.JSONDecodeError as e:
-            messages.error(request, f'Invalid JSON format: {e}')
-            log_event(
-                request=request,
-                event="Vehicle import failed - invalid JSON",
-                level="WARNING",
-                error=str(e)
-            )
-            # Don't populate text box if file was uploaded (confusing to user)
-            return render(request, "conversion/vehicle_import.html", {
-                'json_data': json_text if not json_file else ''
-            })
-
-        # Handle different import formats
-        # Format 1: Export format with "vehicles" array: {"exportDate": "...", "vehicles": [...]}
-        # Format 2: Array of vehicles: [{"year": 2023, ...}, ...]
-        # Format 3: Single vehicle object: {"year": 2023, ...}
-
-        if isinstance(data, dict) and 'vehicles' in data:
-            # Export format
-            vehicles_data = data['vehicles']
-        elif isinstance(data, dict):
-            # Single vehicle object
-            vehicles_data = [data]
-        elif isinstance(data, list):
-            # Array of vehicles
-            vehicles_data = data
+        if json_file and is_ndjson_upload(json_file):
+            # NDJSON export (optionally gzipped): vehicles are read line by line as they are imported
+            vehicles_data = iter_ndjson_vehicles(open_ndjson(json_file), errors)
         else:
-            messages.error(request, 'JSON must be an object or array of objects.')
-            # Don't populate text box if file was uploaded (confusing to user)
-            return render(request, "conversion/vehicle_import.html", {
-                'json_data': json_text if not json_file else ''
-            })
-
-        created_count = 0
-        fuel_count = 0
-        maintenance_count = 0
-        expense_count = 0
-        errors = []
+            if json_file:
+                # Read from uploaded file
+                try:
+                    json_text = json_file.read().decode('utf-8')
+                except Exception as e:
+                    messages.error(request, f'Error reading file: {e}')
+                    return render(request, "conversion/vehicle_import.html")
+            elif not json_text:
+                messages.error(request, 'Please upload a file or provide JSON data.')
+                return render(request, "conversion/vehicle_import.html")
 
-        for idx, vehicle_data in enumerate(vehicles_data):
             try:
-                # Import vehicle
-                vehicle = create_vehicle_from_json(vehicle_data, request.user)
-                vehicle.save()
-                created_count += 1
-
-                # Import fuel entries if present
-                if 'fuelEntries' in vehicle_data and vehicle_data['fuelEntries']:
-                    for fuel_data in vehicle_data['fuelEntries']:
-                        try:
-                            fuel_entry = create_fuel_entry_from_json(fuel_data, vehicle)
-                            fuel_entry.save()
-                            fuel_count += 1
-                        except Exception as e:
-                            errors.append(f"Vehicle {idx + 1} - Fuel entry error: {e}")
-
-                # Import maintenance entries if present
-                if 'maintenanceEntries' in vehicle_data and vehicle_data['maintenanceEntries']:
-                    for maint_data in vehicle_data['maintenanceEntries']:
-                        try:
-                            # Extract category from data
-                            category = maint_data.get('category')
-                            if not category:
-                                raise ValueError("Missing category in maintenance entry")
-                            maint_entry = create_maintenance_entry_from_json(maint_data, vehicle, category)
-                            maint_entry.save()
-                            maintenance_count += 1
-                        except Exception as e:
-                            errors.append(f"Vehicle {idx + 1} - Maintenance entry error: {e}")
-
-                # Import other expenses if present
-                if 'otherExpenses' in vehicle_data and vehicle_data['otherExpenses']:
-                    for expense_data in vehicle_data['otherExpenses']:
-                        try:
-                            # Extract expense type from data
-                            expense_type = expense_data.get('expenseType')
-                            if not expense_type:
-                                raise ValueError("Missing expenseType in expense entry")
-                            expense = create_other_expense_from_json(expense_data, vehicle, expense_type)
-                            expense.save()
-                            expense_count += 1
-                        except Exception as e:
-                            errors.append(f"Vehicle {idx + 1} - Expense error: {e}")
-
-            except ValueError as e:
-                errors.append(f"Vehicle {idx + 1}: {e}")
-            except Exception as e:
-                errors.append(f"Vehicle {idx + 1}: Unexpected error - {e}")
+                data = json.loads(json_text)
+            except json.JSONDecodeError as e:
+                messages.error(request, f'Invalid JSON format: {e}')
+                log_event(
+                    request=request,
+                    event="Vehicle import failed - invalid JSON",
+                    level="WARNING",
+                    error=str(e)
+                )
+                # Don't populate text box if file was uploaded (confusing to user)
+                return render(request, "conversion/vehicle_import.html", {
+                    'json_data': json_text if not json_file else ''
+                })
+
+            # Handle different import formats
+            # Format 1: Export format with "vehicles" array: {"exportDate": "...", "vehicles": [...]}
+            # Format 2: Array of vehicles: [{"year": 2023, ...}, ...]
+            # Format 3: Single vehicle object: {"year": 2023, ...}
+
+            if isinstance(data, dict) and 'vehicles' in data:
+                # Export format
+                vehicles_data = data['vehicles']
+            elif isinstance(data, dict):
+                # Single vehicle object
+                vehicles_data = [data]
+            elif isinstance(data, list):
+                # Array of vehicles
+                vehicles_data = data
+            else:
+                messages.error(request, 'JSON must be an object or array of objects.')
+                # Don't populate text box if file was uploaded (confusing to user)
+                return render(request, "conversion/vehicle_import.html", {
+                    'json_data': json_text if not json_file else ''
+                })
+
+        upsert = request.POST.get('upsert') == 'on'
+        validate_only = request.POST.get('validate_only') == 'on'
+        vehicle_index = load_vehicle_index(request.user) if upsert else None
+        stats = Counter()
+
+        if validate_only:
+            try:
+                validate_vehicle_payloads(vehicles_data, request.user, errors, stats, vehicle_index)
+            except (OSError, EOFError, ValueError) as e:
+                # Corrupt or non-UTF-8 NDJSON uploads fail part way through the stream
+                errors.add(f'Error reading file: {e}', record='file')
+            return render_validation_result(
+                request, "conversion/vehicle_import.html", errors, stats, 'vehicles',
+                {'json_data': json_text if not json_file else '', 'upsert': upsert},
+            )
+
+        try:
+            for idx, vehicle_data in enumerate(vehicles_data):
+                try:
+                    import_vehicle_payload(vehicle_data, request.user, idx + 1, errors, stats, vehicle_index)
+                except Exception as e:
+                    errors.add_exception(e, row=idx + 1, record='vehicle', vehicle=idx + 1)
+        except (OSError, EOFError, ValueError) as e:
+            # Corrupt or non-UTF-8 NDJSON uploads fail part way through; earlier vehicles are kept
+            errors.add(f'Error reading file: {e}', record='file')
 
         # Build success message
-        success_parts = []
-        if created_count > 0:
-            success_parts.append(f'{created_count} vehicle(s)')
-        if fuel_count > 0:
-            success_parts.append(f'{fuel_count} fuel entry(ies)')
-        if maintenance_count > 0:
-            success_parts.append(f'{maintenance_count} maintenance entry(ies)')
-        if expense_count > 0:
-            success_parts.append(f'{expense_count} expense(s)')
+        success_parts = [
+            f'{stats[f"{record}_created"]} {label}'
+            for record, label in IMPORT_RECORD_LABELS
+            if stats[f'{record}_created'] > 0
+        ]
+        updated_parts = [
+            f'{stats[f"{record}_updated"]} {label}'
+            for record, label in IMPORT_RECORD_LABELS
+            if stats[f'{record}_updated'] > 0
+        ]
+        unchanged_count = sum(stats[f'{record}_unchanged'] for record, _ in IMPORT_RECORD_LABELS)
 
         if success_parts:
             messages.success(request, f'Successfully imported: {", ".join(success_parts)}.')
+        if updated_parts:
+            messages.success(request, f'Updated: {", ".join(updated_parts)}.')
+        if unchanged_count:
+            messages.info(request, f'Skipped {unchanged_count} record(s) that already exist unchanged.')
+
+        if success_parts or updated_parts:
             log_event(
                 request=request,
                 event="Data imported",
                 level="INFO",
-                vehicles=created_count,
-                fuel_entries=fuel_count,
-                maintenance_entries=maintenance_count,
-                expenses=expense_count
+                upsert=upsert,
+                vehicles=stats['vehicle_created'],
+                fuel_entries=stats['fuel_created'],
+                maintenance_entries=stats['maintenance_created'],
+                expenses=stats['expense_created'],
+                vehicles_updated=stats['vehicle_updated'],
+                fuel_entries_updated=stats['fuel_updated'],
+                maintenance_entries_updated=stats['maintenance_updated'],
+                expenses_updated=stats['expense_updated'],
+                unchanged=unchanged_count
             )
 
-        if errors:
-            for error in errors:
-                messages.error(request, error)
-            log_event(
-                request=request,
-                event="Import had errors",
-                level="WARNING",
-                error_count=len(errors)
-            )
+        report = record_import_errors(request, errors, 'vehicles')
 
-        # Always redirect to vehicle list if any vehicles were created to prevent re-import
-        if created_count > 0:
+        # Always redirect if any vehicles were created or matched to prevent re-import
+        if stats['vehicle_created'] or stats['vehicle_updated'] or stats['vehicle_unchanged']:
+            if report:
+                return redirect('import_report_detail', pk=report.pk)
             return redirect('vehicle_list')
 
         # Only show the form again with data if nothing was imported and it was text input
         return render(request, "conversion/vehicle_import.html", {
-            'json_data': json_text if not json_file else ''
+            'json_data': json_text if not json_file else '',
+            'upsert': upsert,
+            'report': report,
+            'error_display_limit': settings.IMPORT_ERROR_DISPLAY_LIMIT,
         })
 
     log_event(
@@ -179,33 +347,273 @@ def vehicle_import(request):
     return render(request, "conversion/vehicle_import.html")
 
 
-def create_vehicle_from_json(data, user):
-    """Create a Vehicle instance from JSON data with camelCase field names."""
+# (record key, label) pairs used for import counts, in display order
+IMPORT_RECORD_LABELS = [
+    ('vehicle', 'vehicle(s)'),
+    ('fuel', 'fuel entry(ies)'),
+    ('maintenance', 'maintenance entry(ies)'),
+    ('expense', 'expense(s)'),
+]
+
+# Fields compared to decide whether an existing entry changed
+FUEL_COMPARE_FIELDS = ['gallons', 'cost']
+ELECTRIC_FUEL_COMPARE_FIELDS = ['kwh_per_mile', 'cost_per_kwh', 'cost_per_gallon_reference']
+FUEL_CALCULATED_FIELDS = ['cost', 'mpg', 'mpge']
+MAINTENANCE_COMPARE_FIELDS = ['odometer', 'notes']
+EXPENSE_COMPARE_FIELDS = ['notes']
+
+IMPORT_BATCH_SIZE = 500
+
+
+def changed_fields(source, target, fields):
+    """Return the fields whose values differ between two instances"""
+    return [field for field in fields if getattr(source, field) != getattr(target, field)]
+
+
+def vehicle_import_fields(data):
+    """Model fields populated by create_vehicle_from_json for this payload"""
+    fields = list(VEHICLE_FIELD_MAPPING.values())
+    if data.get('loanInfo'):
+        fields += LOAN_FIELD_MAPPING.values()
+    if data.get('leaseInfo'):
+        fields += LEASE_FIELD_MAPPING.values()
+    return fields
+
+
+def resolve_vehicle(vehicle_data, user, vehicle_index=None):
+    """
+    Build the Vehicle for a payload and, in upsert mode, find the existing vehicle it
+    matches on natural key. Returns (vehicle, existing_vehicle or None).
+    """
+    vehicle = create_vehicle_from_json(vehicle_data, user)
+    existing_vehicle = None
+    if vehicle_index is not None:
+        existing_vehicle = vehicle_index.get(vehicle_key(vehicle))
+    return vehicle, existing_vehicle
+
+
+def load_entry_snapshot(vehicle, vehicle_data):
+    """Load the existing entries a payload can match against, once per table"""
+    snapshot = {}
+    if vehicle_data.get('fuelEntries'):
+        snapshot['fuel'] = load_existing_entries(vehicle.fuel_entries.all(), fuel_entry_key)
+    if vehicle_data.get('maintenanceEntries'):
+        snapshot['maintenance'] = load_existing_entries(vehicle.maintenance_entries.all(), maintenance_entry_key)
+    if vehicle_data.get('otherExpenses'):
+        snapshot['expense'] = load_existing_entries(vehicle.other_expenses.all(), other_expense_key)
+    return snapshot
+
+
+def import_vehicle_payload(vehicle_data, user, vehicle_idx, errors, stats, vehicle_index=None):
+    """
+    Import one vehicle and its fuel, maintenance and expense entries.
+
+    When `vehicle_index` (from load_vehicle_index) is given the import runs in upsert
+    mode: a vehicle matching on natural key is updated in place instead of duplicated,
+    and only entries that are new or changed are written.
+    """
+    vehicle, existing_vehicle = resolve_vehicle(vehicle_data, user, vehicle_index)
+
+    with transaction.atomic():
+        if existing_vehicle is not None:
+            fields = changed_fields(vehicle, existing_vehicle, vehicle_import_fields(vehicle_data))
+            if fields:
+                for field in fields:
+                    setattr(existing_vehicle, field, getattr(vehicle, field))
+                existing_vehicle.save(update_fields=fields + ['updated_at'])
+                stats['vehicle_updated'] += 1
+            else:
+                stats['vehicle_unchanged'] += 1
+            vehicle = existing_vehicle
+            snapshot = load_entry_snapshot(vehicle, vehicle_data)
+        else:
+            vehicle.save()
+            stats['vehicle_created'] += 1
+            if vehicle_index is not None:
+                vehicle_index[vehicle_key(vehicle)] = vehicle
+            # A vehicle created by this import has no entries to match against
+            snapshot = {}
+
+        upsert = vehicle_index is not None
+        for plan in plan_vehicle_entries(vehicle, vehicle_data, vehicle_idx, errors, stats, snapshot, upsert):
+            write_entries(plan, stats)
+
+    return vehicle
+
+
+def plan_vehicle_entries(vehicle, vehicle_data, vehicle_idx, errors, stats, snapshot, upsert=False):
+    """
+    Run every entry check for one vehicle and work out which rows to create or update,
+    without touching the database. `snapshot` comes from load_entry_snapshot.
+    """
+    plans = []
+
+    if vehicle_data.get('fuelEntries'):
+        plans.append(plan_fuel_entries(
+            vehicle, vehicle_data['fuelEntries'], errors, stats, vehicle_idx, snapshot.get('fuel', {}),
+            upsert=upsert,
+        ))
+
+    if vehicle_data.get('maintenanceEntries'):
+        plans.append(plan_keyed_entries(
+            vehicle, vehicle_data['maintenanceEntries'], errors, stats, vehicle_idx, snapshot.get('maintenance', {}),
+            stat='maintenance',
+            model=MaintenanceEntry,
+            build=build_maintenance_entry,
+            key_func=maintenance_entry_key,
+            compare_fields=MAINTENANCE_COMPARE_FIELDS,
+            upsert=upsert,
+        ))
+
+    if vehicle_data.get('otherExpenses'):
+        plans.append(plan_keyed_entries(
+            vehicle, vehicle_data['otherExpenses'], errors, stats, vehicle_idx, snapshot.get('expense', {}),
+            stat='expense',
+            model=OtherExpense,
+            build=build_other_expense,
+            key_func=other_expense_key,
+            compare_fields=EXPENSE_COMPARE_FIELDS,
+            upsert=upsert,
+        ))
+
+    return plans
+
+
+def build_maintenance_entry(data, vehicle):
+    """Create a MaintenanceEntry from a nested export entry, which carries its own category"""
+    category = data.get('category')
+    if not category:
+        raise ImportFieldError("Missing category in maintenance entry", field='category', code='missing_field')
+    if category not in dict(MaintenanceEntry.CATEGORY_CHOICES):
+        raise ImportFieldError(f"Unknown category: {category}", field='category', code='invalid_choice')
+    return create_maintenance_entry_from_json(data, vehicle, category)
+
+
+def build_other_expense(data, vehicle):
+    """Create an OtherExpense from a nested export entry, which carries its own expense type"""
+    expense_type = data.get('expenseType')
+    if not expense_type:
+        raise ImportFieldError("Missing expenseType in expense entry", field='expenseType', code='missing_field')
+    if expense_type not in dict(OtherExpense.EXPENSE_TYPE_CHOICES):
+        raise ImportFieldError(f"Unknown expense type: {expense_type}", field='expenseType', code='invalid_choice')
+    return create_other_expense_from_json(data, vehicle, expense_type)
+
+
+def plan_fuel_entries(vehicle, entries_data, errors, stats, vehicle_idx, existing, first_row=1, upsert=False,
+                      history=None):
+    """
+    Validate fuel entries against an in-memory odometer history, by default the readings
+    in `existing`. In upsert mode entries are matched on (date, odometer) against
+    `existing`, and new ones are added to it; unchanged ones are skipped. Otherwise every
+    valid entry is created.
+    """
+    if history is None:
+        history = OdometerHistory(existing.keys())
+    compare_fields = ELECTRIC_FUEL_COMPARE_FIELDS if vehicle.fuel_type == 'electric' else FUEL_COMPARE_FIELDS
+    to_create = []
+    to_update = {}
+
+    for row, data in enumerate(entries_data, first_row):
+        try:
+            raise_invalid_cells(data)
+            entry = parse_fuel_entry_json(data, vehicle)
+            key = fuel_entry_key(entry)
+            current = existing.get(key)
+
+            if current is not None:
+                if not changed_fields(entry, current, compare_fields):
+                    stats['fuel_unchanged'] += 1
+                    continue
+                validate_fuel_entry(entry, vehicle, history)
+                for field in compare_fields + FUEL_CALCULATED_FIELDS:
+                    setattr(current, field, getattr(entry, field))
+                if current.pk:
+                    to_update[current.pk] = current
+                continue
 
-    # Field mapping: JSON camelCase -> model snake_case
-    field_mapping = {
-        'year': 'year',
-        'make': 'make',
-        'model': 'model',
-        'color': 'color',
-        'vinNumber': 'vin_number',
-        'licensePlateNumber': 'license_plate_number',
-        'registrationNumber': 'registration_number',
-        'state': 'state',
-        'purchasedDate': 'purchased_date',
-        'purchasedPrice': 'purchased_price',
-        'purchasedOdometer': 'purchased_odometer',
-        'dealerName': 'dealer_name',
-        'soldDate': 'sold_date',
-        'soldPrice': 'sold_price',
-        'soldOdometer': 'sold_odometer',
-        'currentValue': 'current_value',
-        'currentValueDate': 'current_value_date',
-        'fuelType': 'fuel_type',
-        'financingType': 'financing_type',
-        'downPayment': 'down_payment',
+            validate_fuel_entry(entry, vehicle, history)
+            history.add(entry.date, entry.odometer)
+            if upsert:
+                existing[key] = entry
+            to_create.append(entry)
+        except Exception as e:
+            errors.add_exception(e, row=row, record='fuel', vehicle=vehicle_idx)
+
+    return {
+        'stat': 'fuel',
+        'model': FuelEntry,
+        'create': to_create,
+        'update': list(to_update.values()),
+        'fields': compare_fields + FUEL_CALCULATED_FIELDS,
     }
 
+
+def plan_keyed_entries(vehicle, entries_data, errors, stats, vehicle_idx, existing, *,
+                       stat, model, build, key_func, compare_fields, record=None, first_row=1, upsert=False):
+    """
+    Build entries and, in upsert mode, match them on natural key against `existing`;
+    unchanged ones are skipped. Without upsert every valid entry is created, so identical
+    rows (two car washes on the same day) stay separate entries.
+    """
+    to_create = []
+    to_update = {}
+
+    for row, data in enumerate(entries_data, first_row):
+        try:
+            raise_invalid_cells(data)
+            entry = build(data, vehicle)
+            key = key_func(entry)
+            current = existing.get(key)
+
+            if current is not None:
+                fields = changed_fields(entry, current, compare_fields)
+                if not fields:
+                    stats[f'{stat}_unchanged'] += 1
+                    continue
+                for field in fields:
+                    setattr(current, field, getattr(entry, field))
+                if current.pk:
+                    to_update[current.pk] = current
+                continue
+
+            if upsert:
+                existing[key] = entry
+            to_create.append(entry)
+        except Exception as e:
+            errors.add_exception(e, row=row, record=record or stat, vehicle=vehicle_idx)
+
+    return {
+        'stat': stat,
+        'model': model,
+        'create': to_create,
+        'update': list(to_update.values()),
+        'fields': compare_fields,
+    }
+
+
+def tally_plan(plan, stats):
+    """Count the rows a plan creates and updates"""
+    stats[f"{plan['stat']}_created"] += len(plan['create'])
+    stats[f"{plan['stat']}_updated"] += len(plan['update'])
+
+
+def write_entries(plan, stats):
+    """Write only the new and changed rows of a plan, in batches"""
+    model = plan['model']
+    if plan['create']:
+        model.objects.bulk_create(plan['create'], batch_size=IMPORT_BATCH_SIZE)
+    if plan['update']:
+        # bulk_update() bypasses auto_now, so stamp updated_at explicitly
+        now = timezone.now()
+        for entry in plan['update']:
+            entry.updated_at = now
+        model.objects.bulk_update(plan['update'], list(plan['fields']) + ['updated_at'], batch_size=IMPORT_BATCH_SIZE)
+    tally_plan(plan, stats)
+
+
+def create_vehicle_from_json(data, user):
+    """Create a Vehicle instance from JSON data with camelCase field names."""
+
     # Valid fuel types
     valid_fuel_types = ['gasoline', 'diesel', 'electric', 'hybrid']
 
@@ -215,11 +623,11 @@ def create_vehicle_from_json(data, user):
     # Check required fields
     for field in required_fields:
         if field not in data or not data[field]:
-            raise ValueError(f"Missing required field: {field}")
+            raise ImportFieldError(f"Missing required field: {field}", field=field, code='missing_field')
 
     vehicle_data = {'user': user}
 
-    for json_key, model_key in field_mapping.items():
+    for json_key, model_key in VEHICLE_FIELD_MAPPING.items():
         if json_key in data and data[json_key] not in (None, ''):
             value = data[json_key]
 
@@ -229,43 +637,37 @@ def create_vehicle_from_json(data, user):
                     try:
                         value = datetime.strptime(value, '%Y-%m-%d').date()
                     except ValueError:
-                        raise ValueError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.")
+                        raise ImportFieldError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.", field=json_key, code='invalid_date')
 
             # Handle decimal fields
             elif model_key in ('purchased_price', 'sold_price', 'current_value', 'down_payment'):
                 try:
                     value = Decimal(str(value))
                 except (InvalidOperation, ValueError):
-                    raise ValueError(f"Invalid price format for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid price format for {json_key}: {value}", field=json_key, code='invalid_number')
 
             # Handle integer fields
             elif model_key in ('year', 'purchased_odometer', 'sold_odometer'):
                 try:
                     value = int(value)
                 except (ValueError, TypeError):
-                    raise ValueError(f"Invalid integer for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid integer for {json_key}: {value}", field=json_key, code='invalid_number')
 
             # Handle fuel type
             elif model_key == 'fuel_type':
                 value = str(value).lower()
                 if value not in valid_fuel_types:
-                    raise ValueError(f"Invalid fuel type: {value}. Must be one of: {', '.join(valid_fuel_types)}")
+                    raise ImportFieldError(
+                        f"Invalid fuel type: {value}. Must be one of: {', '.join(valid_fuel_types)}",
+                        field=json_key, code='invalid_choice'
+                    )
 
             vehicle_data[model_key] = value
 
     # Handle loan info if present
     if 'loanInfo' in data and data['loanInfo']:
         loan_info = data['loanInfo']
-        loan_mapping = {
-            'loanStartDate': 'loan_start_date',
-            'loanAmount': 'loan_amount',
-            'loanInterestRate': 'loan_interest_rate',
-            'loanTermMonths': 'loan_term_months',
-            'loanPaymentDay': 'loan_payment_day',
-            'loanAutoPayment': 'loan_auto_payment',
-        }
-
-        for json_key, model_key in loan_mapping.items():
+        for json_key, model_key in LOAN_FIELD_MAPPING.items():
             if json_key in loan_info and loan_info[json_key] not in (None, ''):
                 value = loan_info[json_key]
 
@@ -291,15 +693,7 @@ def create_vehicle_from_json(data, user):
     # Handle lease info if present
     if 'leaseInfo' in data and data['leaseInfo']:
         lease_info = data['leaseInfo']
-        lease_mapping = {
-            'leaseStartDate': 'lease_start_date',
-            'leasePaymentAmount': 'lease_payment_amount',
-            'leaseTermMonths': 'lease_term_months',
-            'leasePaymentDay': 'lease_payment_day',
-            'leaseAutoPayment': 'lease_auto_payment',
-        }
-
-        for json_key, model_key in lease_mapping.items():
+        for json_key, model_key in LEASE_FIELD_MAPPING.items():
             if json_key in lease_info and lease_info[json_key] not in (None, ''):
                 value = lease_info[json_key]
 
@@ -365,46 +759,58 @@ def fuel_entry_import(request, vehicle_pk):
                 'json_data': json_text
             })
 
-        created_count = 0
-        errors = []
+        upsert = request.POST.get('upsert') == 'on'
+        validate_only = request.POST.get('validate_only') == 'on'
+        stats = Counter()
+        errors = ImportErrorCollector()
 
-        for idx, entry_data in enumerate(entries_data):
-            try:
-                fuel_entry = create_fuel_entry_from_json(entry_data, vehicle)
-                fuel_entry.save()
-                created_count += 1
-            except ValueError as e:
-                errors.append(f"Entry {idx + 1}: {e}")
-            except Exception as e:
-                errors.append(f"Entry {idx + 1}: Unexpected error - {e}")
+        # Entries are only matched when upserting; the odometer check always needs the readings
+        existing = load_existing_entries(vehicle.fuel_entries.all(), fuel_entry_key) if upsert else {}
+        plan = plan_fuel_entries(
+            vehicle, entries_data, errors, stats, None, existing,
+            upsert=upsert, history=load_odometer_history(vehicle.fuel_entries.all()),
+        )
+
+        if validate_only:
+            tally_plan(plan, stats)
+            return render_validation_result(
+                request, "conversion/fuel_entry_import.html", errors, stats, 'fuel',
+                {'vehicle': vehicle, 'json_data': json_text, 'upsert': upsert},
+            )
+
+        with transaction.atomic():
+            write_entries(plan, stats)
+        created_count = stats['fuel_created']
+        updated_count = stats['fuel_updated']
 
         if created_count > 0:
             messages.success(request, f'Successfully imported {created_count} fuel entry(ies) for {vehicle}.')
+        if updated_count > 0:
+            messages.success(request, f'Updated {updated_count} fuel entry(ies) for {vehicle}.')
+        if stats['fuel_unchanged']:
+            messages.info(request, f'Skipped {stats["fuel_unchanged"]} fuel entry(ies) that already exist unchanged.')
+        if created_count > 0 or updated_count > 0:
             log_event(
                 request=request,
                 event="Fuel entries imported",
                 level="INFO",
                 vehicle_id=vehicle.id,
-                count=created_count
+                count=created_count,
+                updated=updated_count,
+                unchanged=stats['fuel_unchanged']
             )
 
-        if errors:
-            for error in errors:
-                messages.error(request, error)
-            log_event(
-                request=request,
-                event="Fuel entry import had errors",
-                level="WARNING",
-                vehicle_id=vehicle.id,
-                error_count=len(errors)
-            )
+        report = record_import_errors(request, errors, 'fuel', vehicle_id=vehicle.id)
 
-        if created_count > 0 and not errors:
+        if (created_count > 0 or updated_count > 0) and not errors:
             return redirect('vehicle_detail', pk=vehicle.pk)
 
         return render(request, "conversion/fuel_entry_import.html", {
             'vehicle': vehicle,
-            'json_data': json_text
+            'json_data': json_text,
+            'upsert': upsert,
+            'report': report,
+            'error_display_limit': settings.IMPORT_ERROR_DISPLAY_LIMIT,
         })
 
     log_event(
@@ -416,8 +822,21 @@ def fuel_entry_import(request, vehicle_pk):
     return render(request, "conversion/fuel_entry_import.html", {'vehicle': vehicle})
 
 
-def create_fuel_entry_from_json(data, vehicle):
-    """Create a FuelEntry instance from JSON data with camelCase field names."""
+def create_fuel_entry_from_json(data, vehicle, history=None):
+    """
+    Create a FuelEntry instance from JSON data with camelCase field names.
+
+    If `history` (an OdometerHistory) is given, the previous odometer reading is
+    taken from it instead of the database, so a batch can be validated before
+    any of it is written.
+    """
+    fuel_entry = parse_fuel_entry_json(data, vehicle)
+    validate_fuel_entry(fuel_entry, vehicle, history)
+    return fuel_entry
+
+
+def parse_fuel_entry_json(data, vehicle):
+    """Parse and type-convert fuel entry JSON into an unvalidated FuelEntry."""
 
     is_electric = vehicle.fuel_type == 'electric'
 
@@ -450,7 +869,7 @@ def create_fuel_entry_from_json(data, vehicle):
     # Check required fields
     for field in required_fields:
         if field not in data or data[field] in (None, ''):
-            raise ValueError(f"Missing required field: {field}")
+            raise ImportFieldError(f"Missing required field: {field}", field=field, code='missing_field')
 
     entry_data = {'vehicle': vehicle}
 
@@ -464,62 +883,76 @@ def create_fuel_entry_from_json(data, vehicle):
                     try:
                         value = datetime.strptime(value, '%Y-%m-%d').date()
                     except ValueError:
-                        raise ValueError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.")
+                        raise ImportFieldError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.", field=json_key, code='invalid_date')
 
             # Handle decimal fields
             elif model_key in ('gallons', 'cost', 'kwh_per_mile', 'cost_per_kwh', 'cost_per_gallon_reference'):
                 try:
-                    value = Decimal(str(value))
+                    value = value if isinstance(value, Decimal) else Decimal(str(value))
                 except (InvalidOperation, ValueError):
-                    raise ValueError(f"Invalid decimal format for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid decimal format for {json_key}: {value}", field=json_key, code='invalid_number')
 
             # Handle integer fields
             elif model_key == 'odometer':
                 try:
                     value = int(value)
                 except (ValueError, TypeError):
-                    raise ValueError(f"Invalid integer for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid integer for {json_key}: {value}", field=json_key, code='invalid_number')
 
             entry_data[model_key] = value
 
     # Create the fuel entry
-    fuel_entry = FuelEntry(**entry_data)
+    return FuelEntry(**entry_data)
+
+
+def validate_fuel_entry(fuel_entry, vehicle, history=None):
+    """Validate odometer and MPG/MPGe ranges, and fill in the calculated fields."""
+
+    is_electric = vehicle.fuel_type == 'electric'
 
     # Validate odometer - get entry immediately before this one
     # Consider both earlier dates AND same date with lower odometer
-    from django.db.models import Q
-    prev_entry = vehicle.fuel_entries.filter(
-        Q(date__lt=fuel_entry.date) |
-        Q(date=fuel_entry.date, odometer__lt=fuel_entry.odometer)
-    ).order_by('-date', '-odometer').first()
-
-    if prev_entry:
-        prev_odometer = prev_entry.odometer
+    if history is not None:
+        prev_reading = history.previous(fuel_entry.date, fuel_entry.odometer)
+    else:
+        from django.db.models import Q
+        prev_entry = vehicle.fuel_entries.filter(
+            Q(date__lt=fuel_entry.date) |
+            Q(date=fuel_entry.date, odometer__lt=fuel_entry.odometer)
+        ).order_by('-date', '-odometer').first()
+        prev_reading = prev_entry.odometer if prev_entry else None
+
+    if prev_reading is not None:
+        prev_odometer = prev_reading
     elif vehicle.purchased_odometer:
         prev_odometer = vehicle.purchased_odometer
     else:
         prev_odometer = 0
     if fuel_entry.odometer <= prev_odometer:
-        raise ValueError(f"Odometer ({fuel_entry.odometer}) must be greater than previous ({prev_odometer})")
+        raise ImportFieldError(
+            f"Odometer ({fuel_entry.odometer}) must be greater than previous ({prev_odometer})",
+            field='odometer', code='odometer'
+        )
 
     max_diff = 10000 if is_electric else 1000
     if fuel_entry.odometer > prev_odometer + max_diff:
-        raise ValueError(
+        raise ImportFieldError(
             f"Odometer ({fuel_entry.odometer}) cannot be more than {max_diff} miles "
-            f"greater than previous ({prev_odometer})"
+            f"greater than previous ({prev_odometer})",
+            field='odometer', code='odometer'
         )
 
     # Calculate and validate MPG/MPGe
     if is_electric:
         # Validate electric-specific fields
         if fuel_entry.kwh_per_mile < 0.100 or fuel_entry.kwh_per_mile > 0.500:
-            raise ValueError(f"KWH per mile must be between 0.100 and 0.500")
+            raise ImportFieldError(f"KWH per mile must be between 0.100 and 0.500", field='kwhPerMile', code='out_of_range')
 
         if fuel_entry.cost_per_kwh < 0.050 or fuel_entry.cost_per_kwh > 0.500:
-            raise ValueError(f"Cost per KWH must be between $0.050 and $0.500")
+            raise ImportFieldError(f"Cost per KWH must be between $0.050 and $0.500", field='costPerKwh', code='out_of_range')
 
         if fuel_entry.cost_per_gallon_reference < 0.50 or fuel_entry.cost_per_gallon_reference > 20.00:
-            raise ValueError(f"Reference gas price must be between $0.50 and $20.00")
+            raise ImportFieldError(f"Reference gas price must be between $0.50 and $20.00", field='costPerGallonReference', code='out_of_range')
 
         # Calculate MPGe
         mpge = float(fuel_entry.cost_per_gallon_reference) / (
@@ -534,20 +967,20 @@ def create_fuel_entry_from_json(data, vehicle):
     else:
         # Validate gasoline-specific fields
         if fuel_entry.gallons > 100:
-            raise ValueError(f"Gallons cannot exceed 100")
+            raise ImportFieldError(f"Gallons cannot exceed 100", field='gallons', code='out_of_range')
 
         if fuel_entry.cost > 500:
-            raise ValueError(f"Cost cannot exceed $500")
+            raise ImportFieldError(f"Cost cannot exceed $500", field='cost', code='out_of_range')
 
         # Calculate MPG
         miles_driven = fuel_entry.odometer - prev_odometer
         mpg = miles_driven / float(fuel_entry.gallons)
 
         if mpg < 4.0:
-            raise ValueError(f"Calculated MPG ({mpg:.2f}) is too low. Please verify odometer and gallons.")
+            raise ImportFieldError(f"Calculated MPG ({mpg:.2f}) is too low. Please verify odometer and gallons.", field='gallons', code='out_of_range')
 
         if mpg > 100.0:
-            raise ValueError(f"Calculated MPG ({mpg:.2f}) is too high. Please verify odometer and gallons.")
+            raise ImportFieldError(f"Calculated MPG ({mpg:.2f}) is too high. Please verify odometer and gallons.", field='gallons', code='out_of_range')
 
         fuel_entry.mpg = round(mpg, 2)
 
@@ -598,8 +1031,12 @@ def maintenance_entry_import(request, vehicle_pk):
                 'json_data': json_text
             })
 
-        created_count = 0
-        errors = []
+        upsert = request.POST.get('upsert') == 'on'
+        validate_only = request.POST.get('validate_only') == 'on'
+        stats = Counter()
+        errors = ImportErrorCollector()
+        existing = load_existing_entries(vehicle.maintenance_entries.all(), maintenance_entry_key) if upsert else {}
+        plans = []
 
         # Valid categories
         valid_categories = ['oil', 'repairs', 'tires', 'wash', 'accessories']
@@ -607,51 +1044,67 @@ def maintenance_entry_import(request, vehicle_pk):
         # Process each category
         for category, entries in maintenance_data.items():
             if category not in valid_categories:
-                errors.append(f"Unknown category: {category}")
+                errors.add(f"Unknown category: {category}", record=category, field='category', code='invalid_choice')
                 continue
 
             if not isinstance(entries, list):
-                errors.append(f"Category '{category}' must contain an array of entries")
+                errors.add(f"Category '{category}' must contain an array of entries", record=category)
                 continue
 
             # Process each entry in this category
-            for idx, entry_data in enumerate(entries):
-                try:
-                    entry = create_maintenance_entry_from_json(entry_data, vehicle, category)
-                    entry.save()
-                    created_count += 1
-                except ValueError as e:
-                    errors.append(f"{category.capitalize()} entry {idx + 1}: {e}")
-                except Exception as e:
-                    errors.append(f"{category.capitalize()} entry {idx + 1}: Unexpected error - {e}")
+            plans.append(plan_keyed_entries(
+                vehicle, entries, errors, stats, None, existing,
+                stat='maintenance',
+                record=category,
+                model=MaintenanceEntry,
+                build=lambda data, vehicle, category=category: create_maintenance_entry_from_json(data, vehicle, category),
+                key_func=maintenance_entry_key,
+                compare_fields=MAINTENANCE_COMPARE_FIELDS,
+                upsert=upsert,
+            ))
+
+        if validate_only:
+            for plan in plans:
+                tally_plan(plan, stats)
+            return render_validation_result(
+                request, "conversion/maintenance_entry_import.html", errors, stats, 'maintenance',
+                {'vehicle': vehicle, 'json_data': json_text, 'upsert': upsert},
+            )
+
+        with transaction.atomic():
+            for plan in plans:
+                write_entries(plan, stats)
+        created_count = stats['maintenance_created']
+        updated_count = stats['maintenance_updated']
 
         if created_count > 0:
             messages.success(request, f'Successfully imported {created_count} maintenance entry(ies) for {vehicle}.')
+        if updated_count > 0:
+            messages.success(request, f'Updated {updated_count} maintenance entry(ies) for {vehicle}.')
+        if stats['maintenance_unchanged']:
+            messages.info(request, f'Skipped {stats["maintenance_unchanged"]} maintenance entry(ies) that already exist unchanged.')
+        if created_count > 0 or updated_count > 0:
             log_event(
                 request=request,
                 event="Maintenance entries imported",
                 level="INFO",
                 vehicle_id=vehicle.id,
-                count=created_count
+                count=created_count,
+                updated=updated_count,
+                unchanged=stats['maintenance_unchanged']
             )
 
-        if errors:
-            for error in errors:
-                messages.error(request, error)
-            log_event(
-                request=request,
-                event="Maintenance entry import had errors",
-                level="WARNING",
-                vehicle_id=vehicle.id,
-                error_count=len(errors)
-            )
+        report = record_import_errors(request, errors, 'maintenance', vehicle_id=vehicle.id)
 
-        if created_count > 0 and not errors:
+        if (created_count > 0 or updated_count > 0) and not errors:
             return redirect('maintenance_entry_list', vehicle_pk=vehicle.pk)
 
         return render(request, "conversion/maintenance_entry_import.html", {
             'vehicle': vehicle,
-            'json_data': json_text
+            'json_data': json_text,
+            'upsert': upsert,
+            'report': report,
+            'error_display_limit': settings.IMPORT_ERROR_DISPLAY_LIMIT,
         })
 
     log_event(
@@ -680,7 +1133,7 @@ def create_maintenance_entry_from_json(data, vehicle, category):
     # Validate required fields
     for field in required_fields:
         if field not in data or data[field] in (None, ''):
-            raise ValueError(f"Missing required field: {field}")
+            raise ImportFieldError(f"Missing required field: {field}", field=field, code='missing_field')
 
     entry_data = {'vehicle': vehicle, 'category': category}
 
@@ -695,21 +1148,21 @@ def create_maintenance_entry_from_json(data, vehicle, category):
                     try:
                         value = datetime.strptime(value, '%Y-%m-%d').date()
                     except ValueError:
-                        raise ValueError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.")
+                        raise ImportFieldError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.", field=json_key, code='invalid_date')
 
             # Decimal conversion
             elif model_key == 'cost':
                 try:
-                    value = Decimal(str(value))
+                    value = value if isinstance(value, Decimal) else Decimal(str(value))
                 except (InvalidOperation, ValueError):
-                    raise ValueError(f"Invalid cost format for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid cost format for {json_key}: {value}", field=json_key, code='invalid_number')
 
             # Integer conversion
             elif model_key == 'odometer':
                 try:
                     value = int(value)
                 except (ValueError, TypeError):
-                    raise ValueError(f"Invalid integer for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid integer for {json_key}: {value}", field=json_key, code='invalid_number')
 
             # Notes: convert None to empty string
             elif model_key == 'notes' and value is None:
@@ -726,17 +1179,17 @@ def create_maintenance_entry_from_json(data, vehicle, category):
 
     # Basic validation (no previous odometer check per user request)
     if entry.odometer < 0:
-        raise ValueError(f"Odometer cannot be negative")
+        raise ImportFieldError(f"Odometer cannot be negative", field='odometer', code='out_of_range')
 
     if entry.odometer > 1000000:
-        raise ValueError(f"Odometer cannot exceed 1,000,000 miles")
+        raise ImportFieldError(f"Odometer cannot exceed 1,000,000 miles", field='odometer', code='out_of_range')
 
     # Validate cost
     if entry.cost > 50000:
-        raise ValueError(f"Cost cannot exceed $50,000")
+        raise ImportFieldError(f"Cost cannot exceed $50,000", field='cost', code='out_of_range')
 
     if entry.cost < 0:
-        raise ValueError(f"Cost cannot be negative")
+        raise ImportFieldError(f"Cost cannot be negative", field='cost', code='out_of_range')
 
     return entry
 
@@ -777,8 +1230,12 @@ def other_expense_import(request, vehicle_pk):
                 'json_data': json_text
             })
 
-        created_count = 0
-        errors = []
+        upsert = request.POST.get('upsert') == 'on'
+        validate_only = request.POST.get('validate_only') == 'on'
+        stats = Counter()
+        errors = ImportErrorCollector()
+        existing = load_existing_entries(vehicle.other_expenses.all(), other_expense_key) if upsert else {}
+        plans = []
 
         # Valid expense types
         valid_types = ['insurance', 'registration', 'loan']
@@ -786,51 +1243,67 @@ def other_expense_import(request, vehicle_pk):
         # Process each expense type
         for expense_type, entries in data.items():
             if expense_type not in valid_types:
-                errors.append(f"Unknown expense type: {expense_type}")
+                errors.add(f"Unknown expense type: {expense_type}", record=expense_type, field='expenseType', code='invalid_choice')
                 continue
 
             if not isinstance(entries, list):
-                errors.append(f"Type '{expense_type}' must contain an array of entries")
+                errors.add(f"Type '{expense_type}' must contain an array of entries", record=expense_type)
                 continue
 
             # Process each entry in this type
-            for idx, entry_data in enumerate(entries):
-                try:
-                    expense = create_other_expense_from_json(entry_data, vehicle, expense_type)
-                    expense.save()
-                    created_count += 1
-                except ValueError as e:
-                    errors.append(f"{expense_type.capitalize()} entry {idx + 1}: {e}")
-                except Exception as e:
-                    errors.append(f"{expense_type.capitalize()} entry {idx + 1}: Unexpected error - {e}")
+            plans.append(plan_keyed_entries(
+                vehicle, entries, errors, stats, None, existing,
+                stat='expense',
+                record=expense_type,
+                model=OtherExpense,
+                build=lambda data, vehicle, expense_type=expense_type: create_other_expense_from_json(data, vehicle, expense_type),
+                key_func=other_expense_key,
+                compare_fields=EXPENSE_COMPARE_FIELDS,
+                upsert=upsert,
+            ))
+
+        if validate_only:
+            for plan in plans:
+                tally_plan(plan, stats)
+            return render_validation_result(
+                request, "conversion/other_expense_import.html", errors, stats, 'expenses',
+                {'vehicle': vehicle, 'json_data': json_text, 'upsert': upsert},
+            )
+
+        with transaction.atomic():
+            for plan in plans:
+                write_entries(plan, stats)
+        created_count = stats['expense_created']
+        updated_count = stats['expense_updated']
 
         if created_count > 0:
             messages.success(request, f'Successfully imported {created_count} expense entry(ies) for {vehicle}.')
+        if updated_count > 0:
+            messages.success(request, f'Updated {updated_count} expense entry(ies) for {vehicle}.')
+        if stats['expense_unchanged']:
+            messages.info(request, f'Skipped {stats["expense_unchanged"]} expense entry(ies) that already exist unchanged.')
+        if created_count > 0 or updated_count > 0:
             log_event(
                 request=request,
                 event="Other expenses imported",
                 level="INFO",
                 vehicle_id=vehicle.id,
-                count=created_count
+                count=created_count,
+                updated=updated_count,
+                unchanged=stats['expense_unchanged']
             )
 
-        if errors:
-            for error in errors:
-                messages.error(request, error)
-            log_event(
-                request=request,
-                event="Other expense import had errors",
-                level="WARNING",
-                vehicle_id=vehicle.id,
-                error_count=len(errors)
-            )
+        report = record_import_errors(request, errors, 'expenses', vehicle_id=vehicle.id)
 
-        if created_count > 0 and not errors:
+        if (created_count > 0 or updated_count > 0) and not errors:
             return redirect('other_expense_list', vehicle_pk=vehicle.pk)
 
         return render(request, "conversion/other_expense_import.html", {
             'vehicle': vehicle,
-            'json_data': json_text
+            'json_data': json_text,
+            'upsert': upsert,
+            'report': report,
+            'error_display_limit': settings.IMPORT_ERROR_DISPLAY_LIMIT,
         })
 
     log_event(
@@ -858,7 +1331,7 @@ def create_other_expense_from_json(data, vehicle, expense_type):
     # Validate required fields
     for field in required_fields:
         if field not in data or data[field] in (None, ''):
-            raise ValueError(f"Missing required field: {field}")
+            raise ImportFieldError(f"Missing required field: {field}", field=field, code='missing_field')
 
     entry_data = {'vehicle': vehicle, 'expense_type': expense_type}
 
@@ -873,14 +1346,14 @@ def create_other_expense_from_json(data, vehicle, expense_type):
                     try:
                         value = datetime.strptime(value, '%Y-%m-%d').date()
                     except ValueError:
-                        raise ValueError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.")
+                        raise ImportFieldError(f"Invalid date format for {json_key}: {value}. Use YYYY-MM-DD.", field=json_key, code='invalid_date')
 
             # Decimal conversion
             elif model_key == 'cost':
                 try:
-                    value = Decimal(str(value))
+                    value = value if isinstance(value, Decimal) else Decimal(str(value))
                 except (InvalidOperation, ValueError):
-                    raise ValueError(f"Invalid cost format for {json_key}: {value}")
+                    raise ImportFieldError(f"Invalid cost format for {json_key}: {value}", field=json_key, code='invalid_number')
 
             # Notes: convert None to empty string
             elif model_key == 'notes' and value is None:
@@ -897,9 +1370,177 @@ def create_other_expense_from_json(data, vehicle, expense_type):
 
     # Validate cost
     if expense.cost > 50000:
-        raise ValueError(f"Cost cannot exceed $50,000")
+        raise ImportFieldError(f"Cost cannot exceed $50,000", field='cost', code='out_of_range')
 
     if expense.cost < 0:
-        raise ValueError(f"Cost cannot be negative")
+        raise ImportFieldError(f"Cost cannot be negative", field='cost', code='out_of_range')
+
+    return expense
+
+
+CSV_RECORD_TYPES = [
+    ('fuel', 'Fuel Entries'),
+    ('maintenance', 'Maintenance Entries'),
+    ('expenses', 'Other Expenses'),
+]
+
+
+@login_required
+def csv_import(request, vehicle_pk):
+    """
+    Import fuel, maintenance or expense entries for a vehicle from a CSV file.
+
+    Columns are matched to import fields by header name or an explicit mapping. The file
+    is streamed in chunks; each chunk is parsed column by column and fed through the same
+    plan and bulk-write path as the JSON importers.
+    """
+    vehicle = get_object_or_404(Vehicle, pk=vehicle_pk, user=request.user)
+    context = {
+        'vehicle': vehicle,
+        'record_types': CSV_RECORD_TYPES,
+        'date_formats': CSV_DATE_FORMATS,
+        'categories': MaintenanceEntry.CATEGORY_CHOICES,
+        'expense_types': OtherExpense.EXPENSE_TYPE_CHOICES,
+        'fields': {record_type: csv_record_fields(record_type, vehicle) for record_type, _ in CSV_RECORD_TYPES},
+    }
+
+    if request.method == 'POST':
+        record_type = request.POST.get('record_type', 'fuel')
+        date_format = request.POST.get('date_format', CSV_DATE_FORMATS[0][0])
+        upsert = request.POST.get('upsert') == 'on'
+        validate_only = request.POST.get('validate_only') == 'on'
+        csv_file = request.FILES.get('csv_file')
+        context.update({
+            'upsert': upsert,
+            'record_type': record_type,
+            'date_format': date_format,
+            'column_mapping': request.POST.get('column_mapping', ''),
+            'default_category': request.POST.get('default_category', ''),
+            'default_expense_type': request.POST.get('default_expense_type', ''),
+        })
+
+        if record_type not in dict(CSV_RECORD_TYPES) or date_format not in dict(CSV_DATE_FORMATS):
+            messages.error(request, 'Please choose a record type and date format.')
+            return render(request, "conversion/csv_import.html", context)
+        if not csv_file:
+            messages.error(request, 'Please upload a CSV file.')
+            return render(request, "conversion/csv_import.html", context)
+
+        defaults = {
+            'category': context['default_category'],
+            'expenseType': context['default_expense_type'],
+        }
+        try:
+            reader, headers = open_csv(csv_file)
+            mapping = parse_column_mapping(context['column_mapping'])
+            columns = resolve_column_mapping(headers, csv_record_fields(record_type, vehicle), mapping, defaults)
+        except (ValueError, csv.Error) as e:
+            messages.error(request, f'Error reading CSV: {e}')
+            log_event(
+                request=request,
+                event="CSV import failed - unreadable file",
+                level="WARNING",
+                vehicle_id=vehicle.id,
+                record_type=record_type,
+                error=str(e)
+            )
+            return render(request, "conversion/csv_import.html", context)
+
+        stats = Counter()
+        errors = ImportErrorCollector()
+        chunks = iter_csv_chunks(reader, columns, date_format, settings.IMPORT_CSV_CHUNK_SIZE, defaults)
+
+        try:
+            with transaction.atomic():
+                for plan in plan_csv_chunks(vehicle, record_type, chunks, errors, stats, upsert):
+                    if validate_only:
+                        tally_plan(plan, stats)
+                    else:
+                        write_entries(plan, stats)
+        except (ValueError, csv.Error) as e:
+            # Decoding and CSV syntax errors surface mid-stream; nothing has been written
+            messages.error(request, f'Error reading CSV: {e}')
+            return render(request, "conversion/csv_import.html", context)
+
+        stat = {'fuel': 'fuel', 'maintenance': 'maintenance', 'expenses': 'expense'}[record_type]
+
+        if validate_only:
+            return render_validation_result(
+                request, "conversion/csv_import.html", errors, stats, record_type, context
+            )
+
+        created_count = stats[f'{stat}_created']
+        updated_count = stats[f'{stat}_updated']
+        label = dict(CSV_RECORD_TYPES)[record_type].lower()
+
+        if created_count > 0:
+            messages.success(request, f'Successfully imported {created_count} {label} for {vehicle}.')
+        if updated_count > 0:
+            messages.success(request, f'Updated {updated_count} {label} for {vehicle}.')
+        if stats[f'{stat}_unchanged']:
+            messages.info(request, f'Skipped {stats[f"{stat}_unchanged"]} {label} that already exist unchanged.')
+        if created_count > 0 or updated_count > 0:
+            log_event(
+                request=request,
+                event="CSV entries imported",
+                level="INFO",
+                vehicle_id=vehicle.id,
+                record_type=record_type,
+                count=created_count,
+                updated=updated_count,
+                unchanged=stats[f'{stat}_unchanged']
+            )
+
+        context['report'] = record_import_errors(request, errors, record_type, vehicle_id=vehicle.id)
+        context['error_display_limit'] = settings.IMPORT_ERROR_DISPLAY_LIMIT
+
+        if (created_count > 0 or updated_count > 0) and not errors:
+            return redirect('vehicle_detail', pk=vehicle.pk)
+
+        return render(request, "conversion/csv_import.html", context)
+
+    log_event(
+        request=request,
+        event="CSV import page accessed",
+        level="DEBUG",
+        vehicle_id=vehicle.id
+    )
+    return render(request, "conversion/csv_import.html", context)
+
+
+def plan_csv_chunks(vehicle, record_type, chunks, errors, stats, upsert=False):
+    """
+    Plan each parsed CSV chunk, yielding one plan per chunk. Rows are matched against the
+    vehicle's existing entries only in upsert mode.
+    """
+    if record_type == 'fuel':
+        existing = load_existing_entries(vehicle.fuel_entries.all(), fuel_entry_key) if upsert else {}
+        # One history across chunks, so later chunks are checked against earlier rows
+        history = load_odometer_history(vehicle.fuel_entries.all())
+        for first_row, entries in chunks:
+            yield plan_fuel_entries(
+                vehicle, entries, errors, stats, None, existing, first_row=first_row, upsert=upsert, history=history
+            )
+        return
+
+    if record_type == 'maintenance':
+        existing = load_existing_entries(vehicle.maintenance_entries.all(), maintenance_entry_key) if upsert else {}
+        options = {
+            'stat': 'maintenance',
+            'model': MaintenanceEntry,
+            'build': build_maintenance_entry,
+            'key_func': maintenance_entry_key,
+            'compare_fields': MAINTENANCE_COMPARE_FIELDS,
+        }
+    else:
+        existing = load_existing_entries(vehicle.other_expenses.all(), other_expense_key) if upsert else {}
+        options = {
+            'stat': 'expense',
+            'model': OtherExpense,
+            'build': build_other_expense,
+            'key_func': other_expense_key,
+            'compare_fields': EXPENSE_COMPARE_FIELDS,
+        }
 
-    return expense
\ No newline at end of file
+    for first_row, entries in chunks:
+        yield plan_keyed_entries(vehicle, entries, errors, stats, None, existing, first_row=first_row, upsert=upsert, **options)